@@ -0,0 +1,64 @@
+"""
+Measures the throughput of interpreted (TRITON_INTERPRET=1) kernel launches, in
+launches per second including their execution, with the per-function setup of
+the interpreter cached across launches (`cached`) or redone at every launch
+(`uncached`). Every measurement runs in a fresh interpreter process, on CPU
+tensors.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import torch
+import triton
+import triton.language as tl
+
+
+@triton.jit
+def add_kernel(x_ptr, y_ptr, out_ptr, n, BLOCK: tl.constexpr):
+    offsets = tl.program_id(0) * BLOCK + tl.arange(0, BLOCK)
+    mask = offsets < n
+    x = tl.load(x_ptr + offsets, mask=mask)
+    y = tl.load(y_ptr + offsets, mask=mask)
+    tl.store(out_ptr + offsets, x + y, mask=mask)
+
+
+def launches_per_second(num_programs, provider, num_launches=200):
+    from triton.runtime import interpreter
+    n = num_programs * 64
+    x, y, out = torch.rand(n), torch.rand(n), torch.empty(n)
+    add_kernel[(num_programs, )](x, y, out, n, BLOCK=64)
+    start = time.perf_counter_ns()
+    for _ in range(num_launches):
+        if provider == 'uncached':
+            interpreter.GridExecutor.fn_info.clear()
+            interpreter._patched_fns.clear()
+            interpreter.InterpretedFunction.rewritten_fn.clear()
+        add_kernel[(num_programs, )](x, y, out, n, BLOCK=64)
+    return num_launches / ((time.perf_counter_ns() - start) * 1e-9)
+
+
+@triton.testing.perf_report(
+    triton.testing.Benchmark(
+        x_names=['num_programs'],
+        x_vals=[1, 16],
+        line_arg='provider',
+        line_vals=['cached', 'uncached'],
+        line_names=['Cached setup', 'Setup at every launch'],
+        styles=[('blue', '-'), ('green', '-')],
+        ylabel='launches/s',
+        plot_name='interpreter-launch-rate',
+        args={},
+    ))
+def benchmark(num_programs, provider):
+    result = subprocess.run([sys.executable, __file__, str(num_programs), provider],
+                            env={**os.environ, 'TRITON_INTERPRET': '1'}, check=True, capture_output=True, text=True)
+    return float(result.stdout.split()[-1])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        print(launches_per_second(int(sys.argv[1]), sys.argv[2]))
+    else:
+        benchmark.run(print_data=True)
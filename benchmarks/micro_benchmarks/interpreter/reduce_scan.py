@@ -0,0 +1,115 @@
+"""
+Measures the time, in milliseconds, of interpreting (TRITON_INTERPRET=1) a
+launch of the reductions and scans with a custom combine function of
+`test_core.py`, with the combine function applied to whole slices at once in a
+tree (`tree`) or to one pair of elements at a time (`elements`). Every
+measurement runs in a fresh interpreter process, on CPU tensors.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import torch
+import triton
+import triton.language as tl
+
+
+@triton.jit
+def _welford_combine(mean_1, m2_1, weight_1, mean_2, m2_2, weight_2):
+    delta = mean_2 - mean_1
+    new_weight = weight_1 + weight_2
+    w2_over_w = weight_2 / new_weight
+    return (
+        mean_1 + delta * w2_over_w,
+        m2_1 + m2_2 + delta * delta * weight_1 * w2_over_w,
+        new_weight,
+    )
+
+
+@triton.jit
+def linear_recurrence(a1, b1, a2, b2):
+    return a1 * a2, b1 * a2 + b2
+
+
+@triton.jit
+def cummax(v0, i0, v1, i1):
+    gt = v0 > v1
+    return tl.where(gt, v0, v1), tl.where(gt, i0, i1)
+
+
+@triton.jit
+def roll(a1, b1_last, b1_cur, a2, b2_last, b2_cur):
+    return a1 + a2, tl.where(a2 == 1, b1_cur, 0) + b2_last, b2_cur
+
+
+@triton.jit
+def welford_kernel(X, MEAN, VAR, BLOCK: tl.constexpr):
+    x = tl.load(X + tl.arange(0, BLOCK))
+    mean, m2, weight = tl.reduce((x, tl.zeros_like(x), tl.full(x.shape, 1, x.dtype)), 0, _welford_combine)
+    tl.store(MEAN, mean)
+    tl.store(VAR, m2 / weight)
+
+
+@triton.jit
+def scan_kernel(X, Y, Z, BLOCK_M: tl.constexpr, BLOCK_N: tl.constexpr, OP: tl.constexpr):
+    offsets = tl.arange(0, BLOCK_M)[:, None] * BLOCK_N + tl.arange(0, BLOCK_N)[None, :]
+    x = tl.load(X + offsets)
+    y = tl.load(Y + offsets)
+    if OP == 'linear_recurrence':
+        _, z = tl.associative_scan((x, y), 1, linear_recurrence)
+    elif OP == 'cummax':
+        index = tl.broadcast_to(tl.arange(0, BLOCK_N)[None, :].to(tl.int64), [BLOCK_M, BLOCK_N])
+        _, z = tl.associative_scan((x, index), 1, cummax)
+    else:
+        _, z, _ = tl.associative_scan((1 + 0 * x, 0 * x, x), 1, roll)
+    tl.store(Z + offsets, z)
+
+
+def launch(op):
+    if op == 'welford':
+        x = torch.rand(512)
+        welford_kernel[(1, )](x, torch.empty(()), torch.empty(()), BLOCK=512)
+    else:
+        x, y = torch.rand((32, 32)), torch.rand((32, 32))
+        scan_kernel[(1, )](x, y, torch.empty_like(x), BLOCK_M=32, BLOCK_N=32, OP=op)
+
+
+def launch_ms(op, provider, repeats=5):
+    from triton.runtime import interpreter
+    if provider == 'elements':
+        interpreter.ReduceOps.generic_reduce = interpreter.ReduceOps.generic_reduce_elements
+        interpreter.ScanOps.generic_scan = interpreter.ScanOps.generic_scan_elements
+    launch(op)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        launch(op)
+        times.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(times)
+
+
+@triton.testing.perf_report(
+    triton.testing.Benchmark(
+        x_names=['op'],
+        x_vals=['welford', 'linear_recurrence', 'cummax', 'roll'],
+        line_arg='provider',
+        line_vals=['tree', 'elements'],
+        line_names=['Tree combine', 'Element-wise combine'],
+        styles=[('blue', '-'), ('green', '-')],
+        ylabel='ms',
+        plot_name='interpreter-reduce-scan',
+        args={},
+    ))
+def benchmark(op, provider):
+    result = subprocess.run([sys.executable, __file__, op, provider], env={**os.environ, 'TRITON_INTERPRET': '1'},
+                            check=True, capture_output=True, text=True)
+    return float(result.stdout.split()[-1])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        print(launch_ms(*sys.argv[1:]))
+    else:
+        benchmark.run(print_data=True)
@@ -0,0 +1 @@
+from .launch_overhead import benchmark  # type: ignore # noqa: F401
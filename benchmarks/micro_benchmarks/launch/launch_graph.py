@@ -0,0 +1,49 @@
+"""
+Compares launching a sequence of empty kernels one by one with replaying them
+from a `LaunchGraph`, in microseconds of host time per kernel.
+"""
+import torch
+import triton
+from triton.backends.intel.driver import LaunchGraph
+
+from .launch_overhead import KERNELS, host_overhead_us
+
+
+@triton.testing.perf_report(
+    triton.testing.Benchmark(
+        x_names=['num_kernels'],
+        x_vals=[1, 8, 32, 128],
+        line_arg='provider',
+        line_vals=['jit', 'graph'],
+        line_names=['JITFunction.run', 'LaunchGraph.replay'],
+        styles=[('blue', '-'), ('green', '-')],
+        ylabel='us/kernel',
+        plot_name='launch-graph',
+        args={},
+    ))
+def benchmark(num_kernels, provider):
+    kernel = KERNELS[4]
+    n_elements = 1024
+    args = [torch.empty(n_elements, dtype=torch.float32, device='xpu') for _ in range(4)]
+    grid = (1, )
+
+    def launch_all():
+        for _ in range(num_kernels):
+            kernel[grid](*args, n_elements, BLOCK_SIZE=1024)
+
+    if provider == 'jit':
+        launch = launch_all
+    elif provider == 'graph':
+        launch_all()
+        graph = LaunchGraph()
+        with graph.capture():
+            launch_all()
+        launch = graph.replay
+    else:
+        raise NotImplementedError(f'Unsupported provider {provider}')
+
+    return host_overhead_us(launch, num_launches=max(5000 // num_kernels, 10)) / num_kernels
+
+
+if __name__ == '__main__':
+    benchmark.run(print_data=True)
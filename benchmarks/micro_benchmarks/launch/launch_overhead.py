@@ -0,0 +1,74 @@
+"""
+Measures the host-side overhead of launching an empty kernel, in microseconds
+per launch, for kernels with a growing number of tensor arguments.
+"""
+import time
+
+import torch
+import triton
+import triton.language as tl
+
+
+@triton.jit
+def empty_kernel_1(a0, n_elements, BLOCK_SIZE: tl.constexpr):
+    pass
+
+
+@triton.jit
+def empty_kernel_4(a0, a1, a2, a3, n_elements, BLOCK_SIZE: tl.constexpr):
+    pass
+
+
+@triton.jit
+def empty_kernel_16(a0, a1, a2, a3, a4, a5, a6, a7, a8, a9, a10, a11, a12, a13, a14, a15, n_elements,
+                    BLOCK_SIZE: tl.constexpr):
+    pass
+
+
+KERNELS = {1: empty_kernel_1, 4: empty_kernel_4, 16: empty_kernel_16}
+
+
+def host_overhead_us(launch, num_launches=5000):
+    """Returns the average host time, in microseconds, spent in `launch`."""
+    for _ in range(100):
+        launch()
+    torch.xpu.synchronize()
+    start = time.perf_counter_ns()
+    for _ in range(num_launches):
+        launch()
+    end = time.perf_counter_ns()
+    torch.xpu.synchronize()
+    return (end - start) * 1e-3 / num_launches
+
+
+@triton.testing.perf_report(
+    triton.testing.Benchmark(
+        x_names=['num_args'],
+        x_vals=list(KERNELS.keys()),
+        line_arg='provider',
+        line_vals=['jit', 'launch_plan'],
+        line_names=['JITFunction.run', 'LaunchPlan'],
+        styles=[('blue', '-'), ('green', '-')],
+        ylabel='us/launch',
+        plot_name='launch-overhead',
+        args={},
+    ))
+def benchmark(num_args, provider):
+    kernel = KERNELS[num_args]
+    n_elements = 1024
+    args = [torch.empty(n_elements, dtype=torch.float32, device='xpu') for _ in range(num_args)]
+    grid = (1, )
+
+    if provider == 'jit':
+        launch = lambda: kernel[grid](*args, n_elements, BLOCK_SIZE=1024)
+    elif provider == 'launch_plan':
+        plan = kernel.bind(*args, n_elements, BLOCK_SIZE=1024)
+        launch = lambda: plan[grid](*args, n_elements)
+    else:
+        raise NotImplementedError(f'Unsupported provider {provider}')
+
+    return host_overhead_us(launch)
+
+
+if __name__ == '__main__':
+    benchmark.run(print_data=True)
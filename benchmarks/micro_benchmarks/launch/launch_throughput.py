@@ -0,0 +1,64 @@
+"""
+Measures the throughput of empty kernel launches, in thousands of launches per
+second including their execution, with and without the launch counters
+(TRITON_LAUNCH_COUNTERS=1). With the counters, the average time spent in each
+phase of the launches is printed as well.
+"""
+import time
+
+import torch
+import triton
+from triton import knobs
+from triton.runtime import launch_counters
+
+from .launch_overhead import KERNELS
+
+
+def launches_per_second(launch, num_launches=10000):
+    for _ in range(100):
+        launch()
+    torch.xpu.synchronize()
+    start = time.perf_counter_ns()
+    for _ in range(num_launches):
+        launch()
+    torch.xpu.synchronize()
+    return num_launches / ((time.perf_counter_ns() - start) * 1e-9)
+
+
+def print_phases(counters):
+    for name, phases in counters.items():
+        print(f'{name}: ' + ', '.join(f'{phase} {ns / count:.0f}ns' for phase, (ns, count) in phases.items()))
+
+
+@triton.testing.perf_report(
+    triton.testing.Benchmark(
+        x_names=['num_args'],
+        x_vals=list(KERNELS.keys()),
+        line_arg='provider',
+        line_vals=['default', 'counters'],
+        line_names=['Default', 'Launch counters'],
+        styles=[('blue', '-'), ('green', '-')],
+        ylabel='klaunches/s',
+        plot_name='launch-throughput',
+        args={},
+    ))
+def benchmark(num_args, provider):
+    kernel = KERNELS[num_args]
+    n_elements = 1024
+    args = [torch.empty(n_elements, dtype=torch.float32, device='xpu') for _ in range(num_args)]
+    grid = (1, )
+
+    with knobs.runtime.scope():
+        knobs.runtime.launch_counters = provider == 'counters'
+        # Launchers are created with the kernels, drop the ones created with other knobs.
+        kernel.device_caches.clear()
+        launch_counters.reset_counters()
+        with launch_counters.scope(f'launch-throughput-{num_args}') as scope:
+            throughput = launches_per_second(lambda: kernel[grid](*args, n_elements, BLOCK_SIZE=1024))
+    if provider == 'counters':
+        print_phases(scope.counters)
+    return throughput * 1e-3
+
+
+if __name__ == '__main__':
+    benchmark.run(print_data=True)
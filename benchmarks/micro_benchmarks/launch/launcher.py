@@ -0,0 +1,67 @@
+"""
+Compares the generic XPU launcher with the launchers generated for each kernel
+signature (TRITON_XPU_SPECIALIZED_LAUNCHER=1): the time to create the launcher
+of a new signature with an empty cache, in milliseconds, and the host overhead
+of the launcher itself, in microseconds per launch.
+"""
+import tempfile
+import time
+
+import torch
+import triton
+from triton import knobs
+from triton.backends.intel.driver import generic_launcher
+
+from .launch_overhead import KERNELS, host_overhead_us
+
+
+def compile_kernel(num_args):
+    n_elements = 1024
+    args = [torch.empty(n_elements, dtype=torch.float32, device='xpu') for _ in range(num_args)]
+    compiled = KERNELS[num_args].warmup(*args, n_elements, BLOCK_SIZE=1024, grid=(1, ))
+    return compiled, args + [n_elements]
+
+
+def make_launcher(compiled, specialized):
+    with knobs.intel.scope():
+        knobs.intel.specialized_launcher = specialized
+        return triton.runtime.driver.active.launcher_cls(compiled.src, compiled.metadata)
+
+
+@triton.testing.perf_report([
+    triton.testing.Benchmark(
+        x_names=['num_args'],
+        x_vals=list(KERNELS.keys()),
+        line_arg='provider',
+        line_vals=['generic', 'specialized'],
+        line_names=['Generic launcher', 'Specialized launcher'],
+        styles=[('blue', '-'), ('green', '-')],
+        ylabel=ylabel,
+        plot_name=plot_name,
+        args={'metric': metric},
+    ) for metric, ylabel, plot_name in (
+        ('cold_start', 'ms', 'launcher-cold-start'),
+        ('overhead', 'us/launch', 'launcher-overhead'),
+    )
+])
+def benchmark(num_args, provider, metric):
+    specialized = provider == 'specialized'
+    compiled, args = compile_kernel(num_args)
+
+    if metric == 'cold_start':
+        with knobs.cache.scope(), tempfile.TemporaryDirectory() as cache_dir:
+            knobs.cache.dir = cache_dir
+            generic_launcher.cache_clear()
+            start = time.perf_counter()
+            make_launcher(compiled, specialized)
+            return (time.perf_counter() - start) * 1e3
+
+    launcher = make_launcher(compiled, specialized)
+    compiled._init_handles()
+    stream = triton.runtime.driver.active.get_current_stream(torch.xpu.current_device())
+    launch_args = (1, 1, 1, stream, compiled.function, compiled.packed_metadata, None, None, None, *args)
+    return host_overhead_us(lambda: launcher(*launch_args))
+
+
+if __name__ == '__main__':
+    benchmark.run(print_data=True)
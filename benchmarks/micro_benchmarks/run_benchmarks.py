@@ -2,6 +2,9 @@ import argparse
 
 from conversion import float_conversion
 from core_ops import dot_scaled
+from interpreter import launch_rate, reduce_scan
+from launch import launch_graph, launch_overhead, launch_throughput, launcher
+from startup import import_time
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -14,3 +17,10 @@ if __name__ == '__main__':
     args = parser.parse_args()
     float_conversion.benchmark.run(print_data=True, save_path=args.reports)
     dot_scaled.benchmark.run(print_data=True, save_path=args.reports)
+    launch_overhead.benchmark.run(print_data=True, save_path=args.reports)
+    launcher.benchmark.run(print_data=True, save_path=args.reports)
+    launch_throughput.benchmark.run(print_data=True, save_path=args.reports)
+    launch_graph.benchmark.run(print_data=True, save_path=args.reports)
+    import_time.benchmark.run(print_data=True, save_path=args.reports)
+    reduce_scan.benchmark.run(print_data=True, save_path=args.reports)
+    launch_rate.benchmark.run(print_data=True, save_path=args.reports)
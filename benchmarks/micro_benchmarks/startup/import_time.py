@@ -0,0 +1,49 @@
+"""
+Measures the wall time, in milliseconds, of starting a Python interpreter that
+imports triton, and optionally initializes the active driver or builds the
+backend of the current target, relative to an interpreter that only starts.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+import triton
+
+STATEMENTS = {
+    'import':
+    'import triton',
+    'driver':
+    'import triton; triton.runtime.driver.active.get_current_device()',
+    'backend': ('import triton; from triton.compiler import make_backend; '
+                'make_backend(triton.runtime.driver.active.get_current_target())'),
+}
+
+
+def startup_ms(statement, repeats=10):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True)
+        times.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(times)
+
+
+@triton.testing.perf_report(
+    triton.testing.Benchmark(
+        x_names=['stage'],
+        x_vals=list(STATEMENTS.keys()),
+        line_arg='provider',
+        line_vals=['triton'],
+        line_names=['Triton'],
+        styles=[('blue', '-')],
+        ylabel='ms',
+        plot_name='import-time',
+        args={},
+    ))
+def benchmark(stage, provider):
+    return startup_ms(STATEMENTS[stage]) - startup_ms('pass')
+
+
+if __name__ == '__main__':
+    benchmark.run(print_data=True)
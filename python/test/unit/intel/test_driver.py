@@ -4,6 +4,15 @@ import subprocess
 import sys
 import os
 
+import pytest
+import torch
+
+import triton
+import triton.language as tl
+from triton.compiler import make_backend
+from triton.backends.compiler import GPUTarget
+from triton.backends.intel.driver import LaunchGraph, arg_descriptor, build_modules_from_src, generic_launcher
+
 
 def test_auto_grf():
 
@@ -50,3 +59,178 @@ test_auto_grf("xpu")
         assert re.search(r"recompiling the kernel using large GRF mode", outs[0])
         # The spill size of returned kernel should be same kernel as the one compiled with large GRF mode.
         assert re.findall(r"\d+\.?\d*", outs[1])[0] == re.findall(r"\d+\.?\d*", outs[2])[0]
+
+
+@pytest.mark.parametrize("specialized", [False, True])
+def test_launcher(specialized, device, fresh_knobs_except_libraries):
+    fresh_knobs_except_libraries.intel.specialized_launcher = specialized
+
+    @triton.jit
+    def _kernel(out_ptr, pair, scale, offset, n: tl.int64, BLOCK: tl.constexpr):
+        offs = tl.arange(0, BLOCK)
+        mask = offs < n
+        x = tl.load(pair[0] + offs, mask=mask)
+        y = tl.load(pair[1] + offs, mask=mask)
+        tl.store(out_ptr + offs, (x + y) * scale + offset, mask=mask)
+
+    n = 100
+    x = torch.randn(n, device=device)
+    y = torch.randn(n, device=device)
+    out = torch.empty(n, device=device)
+    compiled = _kernel[(1, )](out, (x, y), 2.0, 3, n, BLOCK=128)
+    torch.testing.assert_close(out, (x + y) * 2.0 + 3)
+
+    assert arg_descriptor(compiled.src.signature) == b"P(PP)fiL-"
+    # All signatures share the generic launcher.
+    assert (compiled.run.mod is generic_launcher()) != specialized
+
+
+def test_batch_build(tmp_path, fresh_knobs_except_libraries, monkeypatch):
+    from triton.backends.intel import driver
+    builds = []
+
+    def build_so(name, src_paths, tmpdir):
+        builds.append(sorted(os.path.basename(path) for path in src_paths))
+        return b"shared object"
+
+    fresh_knobs_except_libraries.cache.dir = str(tmp_path)
+    monkeypatch.setattr(driver, "_build_so", build_so)
+    sources = {"first": "int first() { return 1; }", "second": "int second() { return 2; }"}
+    build_modules_from_src(sources)
+    # A single compiler invocation builds both modules, which are then cached.
+    assert builds == [["first.cpp", "second.cpp"]]
+    build_modules_from_src(sources)
+    assert len(builds) == 1
+
+    # A custom build implementation is left to build each module on its own.
+    fresh_knobs_except_libraries.build.impl = lambda *args: pytest.fail("build.impl must not be called")
+    build_modules_from_src({"third": "int third() { return 3; }", "fourth": "int fourth() { return 4; }"})
+    assert len(builds) == 1
+
+
+def test_dump_kernel_args(device, tmp_path, fresh_knobs_except_libraries, monkeypatch):
+    import collections
+    import json
+    from triton.backends.intel import driver
+
+    @triton.jit
+    def _scale(out_ptr, x_ptr, x_stride, scale, BLOCK: tl.constexpr):
+        offs = tl.arange(0, BLOCK)
+        tl.store(out_ptr + offs, tl.load(x_ptr + offs * x_stride) * scale)
+
+    @triton.jit
+    def _ignored(x_ptr):
+        pass
+
+    monkeypatch.setattr(driver, "_dumped_launches", collections.defaultdict(int))
+    fresh_knobs_except_libraries.intel.dump_spirv_kernel_args = str(tmp_path)
+    # Launches are counted per kernel: the second launch of _ignored is captured, then overwritten.
+    fresh_knobs_except_libraries.intel.dump_spirv_kernel_args_filter = "_scale|_ignored"
+    fresh_knobs_except_libraries.intel.dump_spirv_kernel_args_launch = 1
+    # Strided views are dumped in their actual layout.
+    inputs = [torch.randn(128, device=device)[::2] for _ in range(3)]
+    out = torch.empty(64, device=device)
+    for i, x in enumerate(inputs):
+        _ignored[(1, )](x)
+        _scale[(1, )](out, x, x.stride(0), float(i), BLOCK=64)
+    driver._dump_executor().shutdown(wait=True)
+    driver._dump_executor.cache_clear()
+
+    # Only the second launch of _scale is captured.
+    with open(tmp_path / "args_data.json") as f:
+        args = json.load(f)
+    assert args["launch"] == 1
+    assert args["kernel_name"] == "_scale"
+    tensor_args = [arg for arg in args["argument_list"] if arg["type"] == "tensor"]
+    assert [arg["shape"] for arg in tensor_args] == [[64], [64]]
+    assert [arg["strides"] for arg in tensor_args] == [[1], [2]]
+    assert [arg["storage_size"] for arg in tensor_args] == [64, 127]
+    assert [arg["value"] for arg in args["argument_list"] if arg["type"] == "scalar"] == [2, 1.0]
+    x = torch.from_file(str(tmp_path / tensor_args[1]["file"]), size=tensor_args[1]["storage_size"],
+                        dtype=torch.float32)
+    torch.testing.assert_close(x[::2], inputs[1].cpu())
+
+
+def test_launch_graph(device):
+
+    @triton.jit
+    def scale_kernel(x_ptr, out_ptr, scale, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.arange(0, BLOCK_SIZE)
+        tl.store(out_ptr + offsets, tl.load(x_ptr + offsets) * scale)
+
+    x = torch.randn(128, device=device)
+    tmp = torch.empty_like(x)
+    out = torch.zeros_like(x)
+    # Compile outside of the capture.
+    scale_kernel[(1, )](x, tmp, 2.0, BLOCK_SIZE=128)
+
+    graph = LaunchGraph()
+    with graph.capture():
+        scale_kernel[(1, )](x, tmp, 2.0, BLOCK_SIZE=128)
+        scale_kernel[(1, )](tmp, out, 3.0, BLOCK_SIZE=128)
+    assert len(graph) == 2
+    torch.xpu.synchronize()
+    # Launches are recorded instead of being submitted.
+    assert torch.count_nonzero(out) == 0
+
+    graph.replay()
+    torch.testing.assert_close(out, x * 6)
+
+    x2 = torch.randn_like(x)
+    out2 = torch.zeros_like(x)
+    graph.update({x: x2, out: out2})
+    graph.replay()
+    torch.testing.assert_close(out2, x2 * 6)
+    torch.testing.assert_close(out, x * 6)
+
+    # Further captures append to the graph.
+    with graph.capture():
+        scale_kernel[(1, )](out2, out2, 0.5, BLOCK_SIZE=128)
+    graph.replay()
+    torch.testing.assert_close(out2, x2 * 3)
+
+
+def test_target_cache(device):
+    active = triton.runtime.driver.active
+    target = active.get_current_target()
+    assert active.get_current_target() is target
+    device = active.get_current_device()
+    properties = active.utils.get_device_properties(device)
+    assert active.utils.get_device_properties(device) is properties
+    # Backends are shared by equal targets.
+    backend = make_backend(target)
+    assert make_backend(GPUTarget(target.backend, dict(target.arch), target.warp_size)) is backend
+
+
+def test_binary_registry(device):
+    from triton.runtime import binary_registry
+
+    @triton.jit
+    def add_one_kernel(x_ptr, out_ptr, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.arange(0, BLOCK_SIZE)
+        tl.store(out_ptr + offsets, tl.load(x_ptr + offsets) + 1)
+
+    x = torch.randn(128, device=device)
+    out = torch.empty_like(x)
+    device = triton.runtime.driver.active.get_current_device()
+    binary_registry.reset_load_stats()
+    kernels = triton.runtime.warmup_kernels([(add_one_kernel, (x, out), {"BLOCK_SIZE": 128})], devices=[device])
+    kernels[0].load_async(device).result()
+    stats = binary_registry.get_load_stats()
+    assert stats["loads"] == 1
+    assert stats["devices"][device][0] == 1
+
+    # Another kernel compiled to the same binary shares it, and its module handles.
+    compiled = kernels[0]
+    compiled._init_handles()
+    add_one_kernel.device_caches.clear()
+    add_one_kernel[(1, )](x, out, BLOCK_SIZE=128)
+    torch.testing.assert_close(out, x + 1)
+    (other, ) = add_one_kernel.device_caches[device][0].values()
+    assert other is not compiled
+    assert other.kernel is compiled.kernel
+    assert other.function is compiled.function
+    stats = binary_registry.get_load_stats()
+    assert stats["binary_hits"] == 1
+    assert stats["loads"] == 1
+    assert stats["load_hits"] == 2
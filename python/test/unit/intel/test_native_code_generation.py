@@ -1,3 +1,7 @@
+import sys
+
+import pytest
+
 import triton
 import triton.language as tl
 
@@ -13,3 +17,97 @@ def test_empty_kernel(device):
 
     x = to_triton(numpy_random(SIZE, dtype_str="bfloat16"), device=device, dst_type="bfloat16")
     kernel[(1, )](x, SIZE=SIZE, num_warps=4, generate_native_code=True)
+
+
+FAKE_OCLOC = """#!{python}
+import sys
+
+args = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+with open(args["-file"], "rb") as f:
+    spirv = f.read()
+flags = sys.argv[-1]
+with open({calls!r}, "a") as f:
+    f.write(flags + "\\n")
+with open(args["-o"], "wb") as f:
+    f.write(spirv + b":" + flags.encode())
+if b"spill" in spirv and "-cl-intel-256-GRF-per-thread" not in flags:
+    print("warning: kernel kernel compiled SIMD16 allocated 128 regs and spilled around 217")
+"""
+
+
+@pytest.mark.parametrize("speculative", [False, True])
+def test_ocloc_cache(speculative, tmp_path, fresh_knobs_except_libraries):
+    from triton.backends.intel.compiler import LARGE_GRF_FLAG, _ocloc_executor, generate_native_code
+
+    calls = tmp_path / "calls.txt"
+    ocloc = tmp_path / "ocloc"
+    ocloc.write_text(FAKE_OCLOC.format(python=sys.executable, calls=str(calls)))
+    ocloc.chmod(0o755)
+    fresh_knobs_except_libraries.intel.ocloc = str(ocloc)
+    fresh_knobs_except_libraries.intel.speculative_large_grf = speculative
+    fresh_knobs_except_libraries.cache.dir = str(tmp_path / "cache")
+    small_flags = "-cl-intel-128-GRF-per-thread"
+    large_flags = f"{small_flags} {LARGE_GRF_FLAG}"
+
+    def compiled_flags():
+        return sorted(calls.read_text().splitlines()) if calls.exists() else []
+
+    assert generate_native_code(b"fits", small_flags) == (b"fits:" + small_flags.encode(), small_flags, 0)
+    assert generate_native_code(b"spill", small_flags) == (b"spill:" + large_flags.encode(), large_flags, 0)
+    # Without speculation, the large GRF variant is only compiled for the kernel that spills.
+    expected = [small_flags] * 2 + [large_flags] * (2 if speculative else 1)
+    # Wait for the speculative compilations that weren't needed.
+    _ocloc_executor().shutdown(wait=True)
+    _ocloc_executor.cache_clear()
+    assert compiled_flags() == expected
+
+    # Results are cached, keyed on the SPIR-V and the build flags.
+    assert generate_native_code(b"spill", small_flags) == (b"spill:" + large_flags.encode(), large_flags, 0)
+    assert generate_native_code(b"spill", large_flags) == (b"spill:" + large_flags.encode(), large_flags, 0)
+    assert compiled_flags() == expected
+
+
+LLIR = """
+define spir_kernel void @kernel(ptr addrspace(1) %0) {
+  %2 = load <16 x float>, ptr addrspace(1) %0, align 4
+  %3 = load <16 x float>, ptr addrspace(1) %0, align 4
+  %4 = fadd <16 x float> %2, %3
+  %5 = icmp eq i32 0, 0
+  %6 = extractelement <16 x float> %4, i32 0
+  store float %6, ptr addrspace(1) %0, align 4
+  ret void
+}
+"""
+
+
+def test_register_pressure():
+    from triton.backends.intel.compiler import estimate_register_pressure, ocloc_spills
+
+    # %2, %3 and %4 (64 bytes each) are live at the same time.
+    assert estimate_register_pressure(LLIR, threads_per_warp=16) == 3 * 64 * 16 // 64
+    assert estimate_register_pressure(LLIR, threads_per_warp=32) == 3 * 64 * 32 // 64
+    assert ocloc_spills("warning: kernel kernel compiled SIMD16 allocated 128 regs and spilled around 217") == 217
+    assert ocloc_spills("") == 0
+
+
+@pytest.mark.parametrize("grf_mode", ["pressure", "large"])
+def test_grf_mode_metadata(grf_mode, device):
+
+    @triton.jit
+    def kernel(X, SIZE: tl.constexpr):
+        offsets = tl.arange(0, SIZE)
+        tl.store(X + offsets, tl.load(X + offsets) + 1)
+
+    x = to_triton(numpy_random(128, dtype_str="float32"), device=device)
+    compiled = kernel[(1, )](x, SIZE=128, grf_mode=grf_mode)
+    metadata = compiled.metadata
+    if grf_mode == "pressure":
+        # A small kernel fits in the small GRF mode.
+        assert metadata.register_pressure > 0
+        assert metadata.selected_grf_mode == "default"
+        assert metadata.grf_mode_reason.startswith("estimated register pressure")
+    else:
+        # The register pressure is only estimated to select the GRF mode.
+        assert metadata.register_pressure is None
+        assert metadata.selected_grf_mode == "large"
+        assert metadata.grf_mode_reason == "grf_mode option"
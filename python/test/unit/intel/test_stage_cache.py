@@ -0,0 +1,35 @@
+import triton
+import triton.language as tl
+from triton.compiler import ASTSource
+
+
+@triton.jit
+def add_kernel(x_ptr, y_ptr, out_ptr, BLOCK: tl.constexpr):
+    offs = tl.arange(0, BLOCK)
+    tl.store(out_ptr + offs, tl.load(x_ptr + offs) + tl.load(y_ptr + offs))
+
+
+def test_grf_mode_reuses_llir(tmp_path, fresh_knobs_except_libraries):
+    lowered_stages = []
+
+    def compile_listener(src, metadata, metadata_group, times, cache_hit):
+        lowered_stages.append([stage for stage, _ in times.lowering_stages])
+
+    fresh_knobs_except_libraries.cache.dir = str(tmp_path)
+    fresh_knobs_except_libraries.compilation.listener = compile_listener
+
+    target = triton.runtime.driver.active.get_current_target()
+    src = ASTSource(fn=add_kernel,
+                    signature={"x_ptr": "*fp32", "y_ptr": "*fp32", "out_ptr": "*fp32", "BLOCK":
+                               "constexpr"}, constexprs={"BLOCK": 128})
+    small = triton.compile(src, target=target, options={"grf_mode": "small"})
+    large = triton.compile(src, target=target, options={"grf_mode": "large"})
+
+    # Only the SPIR-V generation depends on the GRF mode.
+    assert lowered_stages == [["ttir", "ttgir", "llir", "spv"], ["spv"]]
+    assert small.hash != large.hash
+    assert small.asm["llir"] == large.asm["llir"]
+    assert small.asm["ttgir"] == large.asm["ttgir"]
+    assert small.metadata.build_flags != large.metadata.build_flags
+    assert small.metadata.shared == large.metadata.shared
+    assert small.metadata.name == large.metadata.name
@@ -0,0 +1,232 @@
+import pytest
+import torch
+
+import triton
+import triton.language as tl
+from triton._internal_testing import is_interpreter
+from triton.runtime import interpreter
+
+pytestmark = pytest.mark.skipif(not is_interpreter(), reason="interpreter only")
+
+
+@pytest.fixture
+def grid_batch(request):
+    with triton.knobs.runtime.scope():
+        triton.knobs.runtime.interpret_grid_batch = request.param
+        yield request.param
+
+
+@pytest.fixture
+def workers(request):
+    with triton.knobs.runtime.scope():
+        triton.knobs.runtime.interpret_workers = request.param
+        yield request.param
+
+
+@pytest.fixture
+def programs_run_alone(monkeypatch):
+    """
+    Counts the programs that ran one at a time, instead of in a batch.
+    """
+    calls = []
+    set_grid_idx = interpreter.interpreter_builder.set_grid_idx
+    monkeypatch.setattr(interpreter.interpreter_builder, "set_grid_idx",
+                        lambda *idx: calls.append(idx) or set_grid_idx(*idx))
+    return calls
+
+
+@triton.jit
+def matmul_kernel(a_ptr, b_ptr, c_ptr, row_sum_ptr, M, N, K, BLOCK_M: tl.constexpr, BLOCK_N: tl.constexpr,
+                  BLOCK_K: tl.constexpr):
+    pid_m = tl.program_id(0)
+    pid_n = tl.program_id(1)
+    rm = pid_m * BLOCK_M + tl.arange(0, BLOCK_M)
+    rn = pid_n * BLOCK_N + tl.arange(0, BLOCK_N)
+    rk = tl.arange(0, BLOCK_K)
+    acc = tl.zeros((BLOCK_M, BLOCK_N), dtype=tl.float32)
+    for k in range(0, K, BLOCK_K):
+        a_mask = (rm[:, None] < M) & (k + rk[None, :] < K)
+        b_mask = (k + rk[:, None] < K) & (rn[None, :] < N)
+        a = tl.load(a_ptr + rm[:, None] * K + k + rk[None, :], mask=a_mask, other=0.0)
+        b = tl.load(b_ptr + (k + rk[:, None]) * N + rn[None, :], mask=b_mask, other=0.0)
+        acc += tl.dot(a, b)
+    c_mask = (rm[:, None] < M) & (rn[None, :] < N)
+    tl.store(c_ptr + rm[:, None] * N + rn[None, :], acc, mask=c_mask)
+    tl.store(row_sum_ptr + pid_n * M + rm, tl.sum(acc, axis=1), mask=rm < M)
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("grid_batch", [5, 64], indirect=True)
+def test_grid_batch(grid_batch, programs_run_alone, device):
+    M, N, K = 37, 45, 29
+    a = torch.randn((M, K), device=device)
+    b = torch.randn((K, N), device=device)
+    c = torch.empty((M, N), device=device)
+    row_sum = torch.empty((3, M), device=device)
+    matmul_kernel[(3, 3)](a, b, c, row_sum, M, N, K, BLOCK_M=16, BLOCK_N=16, BLOCK_K=8)
+    torch.testing.assert_close(c, a @ b, rtol=1e-4, atol=1e-4)
+    expected = torch.stack([c[:, n:n + 16].sum(dim=1) for n in range(0, 48, 16)])
+    torch.testing.assert_close(row_sum, expected, rtol=1e-4, atol=1e-4)
+    assert programs_run_alone == []
+
+
+@triton.jit
+def divergent_kernel(out_ptr, counter_ptr, USE_ATOMICS: tl.constexpr):
+    pid = tl.program_id(0)
+    tl.store(out_ptr + pid, pid)
+    if USE_ATOMICS:
+        tl.atomic_add(counter_ptr, 1)
+    elif pid % 2 == 0:
+        tl.store(out_ptr + pid, -pid)
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("grid_batch", [4], indirect=True)
+@pytest.mark.parametrize("use_atomics", [False, True])
+def test_grid_batch_fallback(grid_batch, programs_run_alone, use_atomics, device):
+    # Kernels that can't run in batches run one program at a time, after
+    # undoing the stores of the failed batch.
+    out = torch.full((10, ), 100, dtype=torch.int32, device=device)
+    counter = torch.zeros((1, ), dtype=torch.int32, device=device)
+    divergent_kernel[(10, )](out, counter, USE_ATOMICS=use_atomics)
+    pids = torch.arange(10, dtype=torch.int32, device=device)
+    if use_atomics:
+        assert counter.item() == 10
+        torch.testing.assert_close(out, pids)
+    else:
+        torch.testing.assert_close(out, torch.where(pids % 2 == 0, -pids, pids))
+    assert len(programs_run_alone) == 10
+
+
+@triton.jit
+def histogram_kernel(x_ptr, counts_ptr, out_ptr, BLOCK: tl.constexpr):
+    offsets = tl.program_id(0) * BLOCK + tl.arange(0, BLOCK)
+    x = tl.load(x_ptr + offsets)
+    tl.atomic_add(counts_ptr + x, 1)
+    tl.store(out_ptr + offsets, x * 2)
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("workers", [4], indirect=True)
+@pytest.mark.parametrize("grid_batch", [0, 8], indirect=True)
+def test_workers(workers, grid_batch, device):
+    # The atomics of the worker processes are serialized.
+    x = torch.randint(0, 8, (64 * 32, ), dtype=torch.int32, device=device)
+    counts = torch.zeros((8, ), dtype=torch.int32, device=device)
+    out = torch.empty_like(x)
+    histogram_kernel[(64, )](x, counts, out, BLOCK=32)
+    torch.testing.assert_close(counts, torch.bincount(x, minlength=8).to(torch.int32))
+    torch.testing.assert_close(out, x * 2)
+
+
+@triton.jit
+def _welford_combine(mean_1, m2_1, weight_1, mean_2, m2_2, weight_2):
+    delta = mean_2 - mean_1
+    new_weight = weight_1 + weight_2
+    w2_over_w = weight_2 / new_weight
+    return mean_1 + delta * w2_over_w, m2_1 + m2_2 + delta * delta * weight_1 * w2_over_w, new_weight
+
+
+@triton.jit
+def _linear_recurrence(a1, b1, a2, b2):
+    return a1 * a2, b1 * a2 + b2
+
+
+@triton.jit
+def _branchy_max(a, b):
+    if a > b:
+        ret = a
+    else:
+        ret = b
+    return ret
+
+
+@triton.jit
+def custom_combine_kernel(x_ptr, y_ptr, mean_ptr, var_ptr, max_ptr, scan_ptr, BLOCK_N: tl.constexpr,
+                          BRANCHES: tl.constexpr):
+    row = tl.program_id(0)
+    offsets = row * BLOCK_N + tl.arange(0, BLOCK_N)
+    x = tl.load(x_ptr + offsets)
+    y = tl.load(y_ptr + offsets)
+    mean, m2, weight = tl.reduce((x, tl.zeros_like(x), tl.full(x.shape, 1, x.dtype)), 0, _welford_combine)
+    tl.store(mean_ptr + row, mean)
+    tl.store(var_ptr + row, m2 / weight)
+    _, z = tl.associative_scan((x, y), 0, _linear_recurrence, reverse=True)
+    tl.store(scan_ptr + offsets, z)
+    if BRANCHES:
+        tl.store(max_ptr + row, tl.reduce(x, 0, _branchy_max))
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("grid_batch", [0, 4], indirect=True)
+@pytest.mark.parametrize("branches", [False, True])
+def test_custom_combine(grid_batch, branches, programs_run_alone, device):
+    # Combine functions that branch on their operands run one pair of
+    # elements at a time, and their programs one at a time.
+    M, N = 6, 64
+    x = torch.rand((M, N), device=device)
+    y = torch.rand((M, N), device=device)
+    mean, var, row_max = (torch.empty((M, ), device=device) for _ in range(3))
+    scan = torch.empty_like(x)
+    custom_combine_kernel[(M, )](x, y, mean, var, row_max, scan, BLOCK_N=N, BRANCHES=branches)
+    expected_var, expected_mean = torch.var_mean(x, dim=1, correction=0)
+    torch.testing.assert_close(mean, expected_mean)
+    torch.testing.assert_close(var, expected_var)
+    expected_scan = torch.empty_like(x)
+    expected_scan[:, -1] = y[:, -1]
+    for n in range(N - 2, -1, -1):
+        expected_scan[:, n] = expected_scan[:, n + 1] * x[:, n] + y[:, n]
+    torch.testing.assert_close(scan, expected_scan)
+    if branches:
+        torch.testing.assert_close(row_max, x.max(dim=1).values)
+    assert len(programs_run_alone) == (M if branches or not grid_batch else 0)
+
+
+@triton.jit
+def copy_kernel(x_ptr, out_ptr, n, BLOCK: tl.constexpr):
+    offsets = tl.program_id(0) * BLOCK + tl.arange(0, BLOCK)
+    tl.store(out_ptr + offsets, tl.load(x_ptr + offsets, mask=offsets < n), mask=offsets < n)
+
+
+@pytest.mark.interpreter
+def test_copy_back_stored_args(device):
+    # Only the arguments stored to are copied back, and CPU tensors aren't copied at all.
+    x = torch.rand((100, ), device=device)
+    out = torch.zeros((100, ), device=device)
+    copy_kernel[(4, )](x, out, 100, BLOCK=32)
+    torch.testing.assert_close(out, x)
+    num_copies = 0 if x.device.type == "cpu" else 2
+    assert len(interpreter.interpreter_builder.tracked_ranges) == num_copies
+    assert len(interpreter.interpreter_builder.stored_ranges) == num_copies // 2
+
+
+def _store_one():
+
+    def store_value(out_ptr):
+        tl.store(out_ptr, 1)
+
+    return store_value
+
+
+def _store_two():
+
+    def store_value(out_ptr):
+        tl.store(out_ptr, 2)
+
+    return store_value
+
+
+@pytest.mark.interpreter
+def test_rewrite_cache(device):
+    # Launches reuse the rewritten function until the code of the function changes.
+    kernel = triton.jit(_store_one())
+    out = torch.zeros((1, ), dtype=torch.int32, device=device)
+    kernel[(1, )](out)
+    rewritten = kernel.rewrite()
+    kernel[(1, )](out)
+    assert kernel.rewrite() is rewritten
+    assert out.item() == 1
+    kernel.fn.__code__ = _store_two().__code__
+    kernel[(1, )](out)
+    assert kernel.rewrite() is not rewritten
+    assert out.item() == 2
@@ -62,6 +62,176 @@ def test_no_do_bench(device: str):
     assert len(_kernel.cache) == 1
 
 
+def test_warmup_kernels(device: str):
+    configs = [triton.Config(kwargs={'BLOCK_SIZE_M': 32}), triton.Config(kwargs={'BLOCK_SIZE_M': 128})]
+
+    @triton.autotune(configs=configs, key=["M"])
+    @triton.jit
+    def _kernel(dst, src, stride_m: tl.constexpr, M, BLOCK_SIZE_N: tl.constexpr, BLOCK_SIZE_M: tl.constexpr):
+        offsets_m = tl.program_id(0) * stride_m + tl.arange(0, BLOCK_SIZE_M)
+        offsets_n = tl.arange(0, BLOCK_SIZE_N)
+        x = tl.load(src + offsets_m[:, None] * BLOCK_SIZE_N + offsets_n[None, :])
+        tl.store(dst + offsets_m[:, None] * BLOCK_SIZE_N + offsets_n[None, :], x)
+
+    M, N = 1024, 16
+    kernels = triton.runtime.warmup_kernels([(_kernel, (torch.float32, torch.float32, N, M, N))])
+    assert len(kernels) == len(configs)
+    device_idx = getattr(torch, device).current_device()
+    assert len(_kernel.fn.device_caches[device_idx][0]) == len(configs)
+
+    src = torch.randn(M * N, device=device)
+    dst = torch.empty(M * N, device=device)
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE_M']), )
+    _kernel[grid](dst, src, N, M, N)
+    assert len(_kernel.fn.device_caches[device_idx][0]) == len(configs)
+
+
+@pytest.mark.parametrize('compile_workers', [1, 2])
+def test_parallel_compile(compile_workers: int, device: str, fresh_knobs_except_libraries, capsys):
+    fresh_knobs_except_libraries.autotuning.compile_workers = compile_workers
+    fresh_knobs_except_libraries.autotuning.print = True
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': block_size}) for block_size in (32, 64, 128)]
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=do_bench)
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    torch.testing.assert_close(dst, src)
+
+    # Configs are compiled up front only when several workers are allowed.
+    assert len(_kernel.configs_compile_times) == (len(configs) if compile_workers > 1 else 0)
+    assert all(t > 0 for t in _kernel.configs_compile_times.values())
+    assert set(_kernel.configs_bench_times) == set(configs)
+    assert 0 <= _kernel.compile_time <= _kernel.bench_time
+    out = capsys.readouterr().out
+    assert out.count("benchmarked in") == len(configs)
+
+
+def test_autotuning_db(device: str, tmp_path: pathlib.Path, fresh_knobs_except_libraries):
+    from triton.runtime.autotuning_db import main
+
+    fresh_knobs_except_libraries.autotuning.db = str(tmp_path / "tuning.db")
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    bench_calls = 0
+
+    def counting_do_bench(kernel_call, quantiles):
+        nonlocal bench_calls
+        bench_calls += 1
+        return do_bench(kernel_call, quantiles)
+
+    def pre_hook(nargs):
+        nargs['dst'].zero_()
+
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': 32}), triton.Config(kwargs={'BLOCK_SIZE': 128}, pre_hook=pre_hook)]
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=counting_do_bench)
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    assert bench_calls == len(configs)
+    best_config = _kernel.best_config
+
+    # A fresh autotuner (e.g. in a new process) finds the result in the
+    # database, with its pre_hook, and doesn't benchmark.
+    _kernel.cache.clear()
+    _kernel.db_records.clear()
+    _kernel[grid](dst, src, N)
+    assert bench_calls == len(configs)
+    assert _kernel.best_config is best_config
+    torch.testing.assert_close(dst, src)
+
+    # Results can be shipped to another database.
+    assert main(["export", str(tmp_path / "tuning.db"), str(tmp_path / "tuning.json")]) == 0
+    assert main(["import", str(tmp_path / "shipped.db"), str(tmp_path / "tuning.json")]) == 0
+    fresh_knobs_except_libraries.autotuning.db = str(tmp_path / "shipped.db")
+    _kernel.cache.clear()
+    _kernel.db_records.clear()
+    _kernel[grid](dst, src, N)
+    assert bench_calls == len(configs)
+    assert _kernel.best_config is best_config
+
+
+def test_successive_halving(device: str):
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    reps = []
+
+    def budgeted_do_bench(kernel_call, quantiles, warmup=10, rep=90):
+        reps.append(rep)
+        return triton.testing.do_bench(kernel_call, quantiles=quantiles, warmup=1, rep=1)
+
+    configs = [
+        triton.Config(kwargs={'BLOCK_SIZE': block_size}, num_warps=num_warps)
+        for block_size in (32, 64, 128)
+        for num_warps in (1, 2, 4)
+    ]
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=budgeted_do_bench,
+                     search_strategy=triton.runtime.SuccessiveHalving(reduction_factor=3))
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    torch.testing.assert_close(dst, src)
+
+    # 9 configs run with 1/9 of the budget, the fastest 3 with 1/3, and the fastest one with all of it.
+    assert reps == pytest.approx([10] * 9 + [30] * 3 + [90])
+    assert list(_kernel.configs_timings) == [_kernel.best_config]
+    assert set(_kernel.configs_bench_times) == set(configs)
+
+
+def test_prune_spilling(device: str, fresh_knobs_except_libraries, monkeypatch):
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    fresh_knobs_except_libraries.autotuning.prune_spilling = True
+    # Pretend that the kernels with 4 warps spill.
+    monkeypatch.setattr(triton.runtime.autotuner, "_kernel_spills", lambda kernel: 64
+                        if kernel.metadata.num_warps == 4 else 0)
+
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': 128}, num_warps=num_warps) for num_warps in (1, 2, 4)]
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=do_bench)
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    grid = lambda META: (triton.cdiv(META['N'], META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    torch.testing.assert_close(dst, src)
+    assert set(_kernel.configs_timings) == set(configs[:2])
+
+    # Configs are kept when they all spill.
+    monkeypatch.setattr(triton.runtime.autotuner, "_kernel_spills", lambda kernel: 64)
+    src = torch.randn(2 * N, device=device)
+    dst = torch.empty(2 * N, device=device)
+    _kernel[grid](dst, src, 2 * N)
+    torch.testing.assert_close(dst, src)
+    assert set(_kernel.configs_timings) == set(configs)
+
+
 @pytest.mark.parametrize('pass_kwargs_to_kernel', [False, True])
 def test_restore(pass_kwargs_to_kernel, device):
     N = 1024
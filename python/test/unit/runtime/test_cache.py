@@ -1,7 +1,10 @@
 import importlib.util
 import itertools
+import json
 import os
 import pathlib
+import shutil
+import threading
 
 import pytest
 import torch
@@ -406,6 +409,192 @@ def test_jit_warmup_cache(device) -> None:
     assert len(kernel_add.device_caches[device][0]) == 1
 
 
+def test_warmup_kernels(device) -> None:
+
+    @triton.jit
+    def kernel_add(a, b, o, N: tl.constexpr):
+        idx = tl.arange(0, N)
+        tl.store(o + idx, tl.load(a + idx) + tl.load(b + idx))
+
+    specs = [(kernel_add, (torch.float32, torch.float32, torch.float32, N)) for N in (16, 32, 64)]
+    specs.append((kernel_add, (torch.float16, torch.float16, torch.float16), {"N": 32}))
+    device = getattr(torch, device).current_device()
+    kernels = triton.runtime.warmup_kernels(specs, max_workers=2)
+    assert len(kernels) == 4
+    assert len(kernel_add.device_caches[device][0]) == 4
+    assert list(kernel_add.device_caches[device][0].values()) == kernels
+    # Already warmed-up specializations are not compiled again.
+    assert triton.runtime.warmup_kernels(specs) == kernels
+    kernel_add.warmup(torch.float32, torch.float32, torch.float32, 32, grid=(1, ))
+    assert len(kernel_add.device_caches[device][0]) == 4
+
+
+def test_async_compile(device, fresh_triton_cache) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+    from triton.runtime import AsyncCompileMode, FutureKernel
+
+    @triton.jit
+    def kernel_add(a, b, o, n, N: tl.constexpr):
+        idx = tl.arange(0, N)
+        mask = idx < n
+        tl.store(o + idx, tl.load(a + idx, mask=mask) + tl.load(b + idx, mask=mask), mask=mask)
+
+    a = torch.randn(33, device=device)
+    b = torch.randn(33, device=device)
+    o = torch.empty(33, device=device)
+    device_idx = getattr(torch, device).current_device()
+
+    with AsyncCompileMode(ThreadPoolExecutor(2)):
+        future = kernel_add.warmup(a, b, o, 32, 32, grid=(1, ))
+        assert isinstance(future, FutureKernel)
+        # Another request for the same specialization shares the compilation.
+        assert kernel_add.warmup(a, b, o, 32, 32, grid=(1, )) is future
+        # Launches without a fallback wait for the compilation.
+        kernel_add[(1, )](a, b, o, 32, 32)
+        torch.testing.assert_close(o[:32], a[:32] + b[:32])
+        assert len(kernel_add.device_caches[device_idx][0]) == 1
+
+    # A specialization for unaligned pointers and sizes can run any arguments,
+    # so it can stand in for the others while they compile.
+    fallback_kernel = kernel_add.warmup(a[1:], b[1:], o[1:], 31, 32, grid=(1, ))
+    fallback_calls = []
+
+    def fallback(fn, bound_args):
+        fallback_calls.append(fn)
+        return fallback_kernel
+
+    # Keep the executor busy, so that the launch happens while the kernel is compiling.
+    executor = ThreadPoolExecutor(1)
+    compiling = threading.Event()
+    executor.submit(compiling.wait)
+    with AsyncCompileMode(executor, fallback=fallback):
+        kernel_add[(1, )](a, b, o, 31, 32)
+        compiling.set()
+    assert fallback_calls == [kernel_add]
+    torch.testing.assert_close(o[:31], a[:31] + b[:31])
+    assert len(kernel_add.device_caches[device_idx][0]) == 3
+
+
+def test_in_memory_cache(tmp_path: pathlib.Path) -> None:
+
+    @triton.jit
+    def kernel_mul(a, o, N: tl.constexpr):
+        idx = tl.arange(0, N)
+        tl.store(o + idx, tl.load(a + idx) * 2)
+
+    from triton.compiler import ASTSource
+    from triton.compiler.compiler import kernel_metadata_cache
+
+    target = triton.runtime.driver.active.get_current_target()
+    src = ASTSource(fn=kernel_mul, signature={'a': "*fp32", 'o': "*fp32", 'N': 'constexpr'}, constexprs={'N': 32})
+    with triton.knobs.cache.scope():
+        triton.knobs.cache.dir = str(tmp_path)
+        k1 = triton.compile(src, target=target)
+        assert (str(tmp_path), k1.hash) in kernel_metadata_cache
+        k2 = triton.compile(src, target=target)
+        # The parsed metadata is shared and intermediate IRs are only read on access.
+        assert k2.metadata is k1.metadata
+        assert "ttir" in k2.asm and not dict.__contains__(k2.asm, "ttir")
+        assert k2.asm["ttir"] == k1.asm["ttir"]
+
+        kernel_metadata_cache.clear()
+        k3 = triton.compile(src, target=target)
+        assert k3.metadata is not k1.metadata
+        assert k3.metadata == k1.metadata
+
+        # Removing the on-disk cache invalidates the in-memory entry: the kernel
+        # is compiled, and its files written, again.
+        for path in tmp_path.iterdir():
+            shutil.rmtree(path)
+        cache_hits = []
+        with triton.knobs.compilation.scope():
+            triton.knobs.compilation.listener = lambda cache_hit, **kwargs: cache_hits.append(cache_hit)
+            k4 = triton.compile(src, target=target)
+        assert cache_hits == [False]
+        assert any(tmp_path.iterdir())
+        assert k4.kernel == k1.kernel
+
+
+def test_content_addressed_cache(tmp_path: pathlib.Path, capsys) -> None:
+    from triton.runtime.cache import ContentAddressedCacheIndex, ContentAddressedCacheManager, main
+
+    with triton.knobs.cache.scope():
+        triton.knobs.cache.dir = str(tmp_path)
+        m1 = ContentAddressedCacheManager("key1")
+        m2 = ContentAddressedCacheManager("key2")
+        # Identical contents are stored once, whatever the key.
+        spv = m1.put(b"\x07" * 64, "kernel.spv")
+        assert m2.put(b"\x07" * 64, "kernel.spv") == spv
+        assert spv.endswith(".spv")
+        meta = m1.put(json.dumps({"name": "kernel"}), "kernel.json", binary=False)
+        assert m1.get_group("kernel.json") is None
+        m1.put_group("kernel.json", {"kernel.spv": spv, "kernel.json": meta})
+        assert m1.get_group("kernel.json") == {"kernel.spv": spv, "kernel.json": meta}
+        assert m2.get_file("kernel.json") is None
+
+        stats = ContentAddressedCacheIndex.for_dir(str(tmp_path)).stats()
+        assert stats["blobs"] == 2
+        assert stats["logical_size"] == stats["size"] + 64
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+        # Writing past the size cap evicts the least recently used blobs,
+        # which invalidates the groups that reference them.
+        triton.knobs.cache.max_size = 100
+        other = m2.put(b"\x08" * 64, "other.spv")
+        assert m1.get_group("kernel.json") is None
+        assert m2.get_file("other.spv") == other
+
+        assert main(["gc"]) == 0
+        assert main(["stats"]) == 0
+        out = capsys.readouterr().out
+        assert "stale kernels" in out and "hit rate" in out
+        assert ContentAddressedCacheIndex.for_dir(str(tmp_path)).stats()["kernels"] == 0
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_remote_cache_round_trips(tmp_path: pathlib.Path, compress: bool) -> None:
+    from triton.runtime.cache import FileRemoteCacheBackend, InProcessRemoteCacheBackend, RemoteCacheManager
+
+    InProcessRemoteCacheBackend.store.clear()
+    InProcessRemoteCacheBackend.round_trips = 0
+    with triton.knobs.cache.scope():
+        triton.knobs.cache.dir = str(tmp_path / "local")
+        triton.knobs.cache.remote_manager_class = InProcessRemoteCacheBackend
+        triton.knobs.cache.remote_compress = compress
+        writer = RemoteCacheManager("key")
+        writer.begin_group("kernel.json")
+        group = {
+            "kernel.spv": writer.put(b"\x07" * 1024, "kernel.spv"),
+            "kernel.ttir": writer.put("module {}", "kernel.ttir", binary=False),
+            "kernel.json": writer.put(json.dumps({"name": "kernel"}), "kernel.json", binary=False),
+        }
+        # Children are buffered and sent along with the group.
+        assert InProcessRemoteCacheBackend.round_trips == 0
+        writer.put_group("kernel.json", group)
+        assert InProcessRemoteCacheBackend.round_trips == 1
+
+        triton.knobs.cache.dir = str(tmp_path / "other_node")
+        reader = RemoteCacheManager("key")
+        paths = reader.get_group("kernel.json")
+        assert InProcessRemoteCacheBackend.round_trips == 2
+        assert sorted(paths) == sorted(group)
+        assert pathlib.Path(paths["kernel.spv"]).read_bytes() == b"\x07" * 1024
+        assert pathlib.Path(paths["kernel.ttir"]).read_text() == "module {}"
+
+        # Files outside of a group are sent right away.
+        standalone = RemoteCacheManager("standalone")
+        standalone.put(b"\x01", "launcher.so")
+        assert InProcessRemoteCacheBackend.round_trips == 3
+        assert RemoteCacheManager("standalone").get_file("launcher.so") is not None
+
+        triton.knobs.cache.remote_manager_class = FileRemoteCacheBackend
+        triton.knobs.cache.remote_dir = str(tmp_path / "remote")
+        writer = RemoteCacheManager("key")
+        writer.put_group("kernel.json", {"kernel.json": writer.put("{}", "kernel.json", binary=False)})
+        triton.knobs.cache.dir = str(tmp_path / "third_node")
+        assert list(RemoteCacheManager("key").get_group("kernel.json")) == ["kernel.json"]
+
+
 def test_jit_debug(device) -> None:
 
     @triton.jit
@@ -1,3 +1,4 @@
+import subprocess
 import sys
 from concurrent.futures import ThreadPoolExecutor
 import torch
@@ -39,3 +40,21 @@ def test_kernel_in_thread(device):
     with ThreadPoolExecutor(1) as pool:
         future = pool.submit(call_triton)
         future.result()
+
+
+def test_backends_are_lazy():
+    # Backend modules are imported when needed, not when importing triton.
+    code = """
+import subprocess
+import sys
+import triton
+
+def backend_modules(name):
+    return [m for m in sys.modules if m.startswith("triton.backends.") and m.count(".") == 3 and m.endswith(name)]
+
+assert backend_modules(".compiler") == [] and backend_modules(".driver") == [], list(sys.modules)
+triton.runtime.driver.active.get_current_device()
+assert backend_modules(".driver") != []
+assert backend_modules(".compiler") == []
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -71,6 +71,74 @@ def test_memory_leak(device) -> None:
         tracemalloc.stop()
 
 
+def test_launch_plan(device) -> None:
+
+    @triton.jit
+    def add_kernel(x_ptr, y_ptr, out_ptr, n_elements, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        mask = offsets < n_elements
+        tl.store(out_ptr + offsets,
+                 tl.load(x_ptr + offsets, mask=mask) + tl.load(y_ptr + offsets, mask=mask), mask=mask)
+
+    n_elements = 1000
+    x = torch.randn(n_elements, device=device)
+    y = torch.randn(n_elements, device=device)
+    out = torch.empty(n_elements, device=device)
+    plan = add_kernel.bind(x, y, out, n_elements, BLOCK_SIZE=128)
+    assert len(add_kernel.device_caches[getattr(torch, device).current_device()][0]) == 1
+
+    # Omitted trailing arguments take the values they were bound with.
+    plan[(triton.cdiv(n_elements, 128), )](x, y, out, n_elements)
+    torch.testing.assert_close(out, x + y)
+
+    x2 = torch.randn(n_elements, device=device)
+    plan[lambda meta: (triton.cdiv(meta["n_elements"], meta["BLOCK_SIZE"]), )](x2, y, out, n_elements, 128)
+    torch.testing.assert_close(out, x2 + y)
+
+    # The launch hooks are still honored.
+    used_hook = False
+
+    def hook(launch_metadata):
+        nonlocal used_hook
+        used_hook = True
+
+    triton.knobs.runtime.launch_enter_hook = hook
+    try:
+        plan[(triton.cdiv(n_elements, 128), )](x, y, out, n_elements)
+    finally:
+        triton.knobs.runtime.launch_enter_hook = None
+    assert used_hook
+
+
+def test_launch_counters(device, fresh_knobs_except_libraries) -> None:
+    from triton.runtime import launch_counters
+
+    @triton.jit
+    def counted_kernel(x_ptr):
+        tl.store(x_ptr, 1)
+
+    x = torch.zeros(1, device=device)
+    triton.knobs.runtime.launch_counters = True
+    launch_counters.reset_counters()
+    # The phases of `JITFunction.run` aren't counted for the launch compiling the kernel.
+    counted_kernel[(1, )](x)
+    assert "bind" not in launch_counters.get_counters().get("counted_kernel", {})
+    launch_counters.reset_counters()
+
+    with launch_counters.scope("counted") as scope:
+        for _ in range(3):
+            counted_kernel[(1, )](x)
+    phases = scope.counters["counted_kernel"]
+    for phase in ("bind", "launch_metadata", "launch"):
+        ns, count = phases[phase]
+        assert count == 3 and ns > 0
+    assert launch_counters.get_counters() == scope.counters
+
+    with launch_counters.scope("empty") as scope:
+        pass
+    assert scope.counters == {}
+
+
 # LATENCY_THRESHOLD_US = 46
 
 # def test_kernel_launch_latency() -> None:
@@ -1,8 +1,7 @@
 import importlib
 import inspect
 import sys
-from dataclasses import dataclass
-from typing import Type, TypeVar, Union
+from typing import Optional, Type, TypeVar, Union
 from types import ModuleType
 from .driver import DriverBase
 from .compiler import BaseBackend
@@ -28,20 +27,38 @@ def _find_concrete_subclasses(module: ModuleType, base_class: Type[T]) -> Type[T
     return ret[0]
 
 
-@dataclass(frozen=True)
 class Backend:
-    compiler: Type[BaseBackend]
-    driver: Type[DriverBase]
+    """
+    A compiler (`BaseBackend`) and driver (`DriverBase`) pair. Backends
+    registered through the `triton.backends` entry points only import their
+    `compiler` and `driver` modules when the matching attribute is first
+    accessed, so that importing triton doesn't import every installed backend.
+    """
+
+    def __init__(self, compiler: Optional[Type[BaseBackend]] = None, driver: Optional[Type[DriverBase]] = None,
+                 module: Optional[str] = None) -> None:
+        assert module is not None or (compiler is not None and driver is not None)
+        self.module = module
+        self._compiler = compiler
+        self._driver = driver
+
+    @property
+    def compiler(self) -> Type[BaseBackend]:
+        if self._compiler is None:
+            module = importlib.import_module(f"{self.module}.compiler")
+            self._compiler = _find_concrete_subclasses(module, BaseBackend)  # type: ignore
+        return self._compiler
+
+    @property
+    def driver(self) -> Type[DriverBase]:
+        if self._driver is None:
+            module = importlib.import_module(f"{self.module}.driver")
+            self._driver = _find_concrete_subclasses(module, DriverBase)  # type: ignore
+        return self._driver
 
 
 def _discover_backends() -> dict[str, Backend]:
-    backends = dict()
-    for ep in entry_points().select(group="triton.backends"):
-        compiler = importlib.import_module(f"{ep.value}.compiler")
-        driver = importlib.import_module(f"{ep.value}.driver")
-        backends[ep.name] = Backend(_find_concrete_subclasses(compiler, BaseBackend),  # type: ignore
-                                    _find_concrete_subclasses(driver, DriverBase))  # type: ignore
-    return backends
+    return {ep.name: Backend(module=ep.value) for ep in entry_points().select(group="triton.backends")}
 
 
 backends: dict[str, Backend] = _discover_backends()
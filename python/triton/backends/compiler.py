@@ -1,7 +1,7 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Union
+from typing import Dict, Tuple, Union
 from types import ModuleType
 
 
@@ -56,6 +56,15 @@ class BaseBackend(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def get_late_options(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Returns a map from stage names to the options that are not used before
+        that stage. Intermediate modules produced before such a stage are cached
+        without these options in their key, so that changing them only reruns
+        the stages that use them.
+        """
+        return {}
+
     @abstractmethod
     def load_dialects(self, context):
         """
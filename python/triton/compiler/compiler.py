@@ -6,8 +6,9 @@ from ..backends import backends
 from ..backends.compiler import Language
 from ..backends.compiler import BaseBackend, GPUTarget
 from .. import __version__, knobs
+from ..runtime import binary_registry
 from ..runtime.autotuner import OutOfResources
-from ..runtime.cache import get_cache_manager, get_dump_manager, get_override_manager
+from ..runtime.cache import InMemoryCache, get_cache_manager, get_dump_manager, get_override_manager
 from ..runtime.driver import driver
 from ..tools.disasm import get_sass, get_spvdis
 # TODO: this shouldn't be here
@@ -261,6 +262,61 @@ class CompileTimer:
         )
 
 
+# Maps (cache directory, compilation hash) to the (metadata_group, metadata) of
+# kernels that were already compiled or loaded by this process.
+kernel_metadata_cache = InMemoryCache()
+
+
+def _stage_hashes(key, options, stage_names, late_options):
+    """
+    Returns the cache keys of the intermediate modules worth caching on their
+    own, i.e. the outputs of the stages after which some options that were
+    not consumed yet are first used. Each key covers the options consumed by
+    the stage that produced the module and the ones before it.
+    """
+    hashes = {}
+    pending_options = set()
+    for i in reversed(range(len(stage_names) - 1)):
+        later_options = set(late_options.get(stage_names[i + 1], ()))
+        if later_options - pending_options:
+            pending_options |= later_options
+            options_key = '_'.join(
+                [f'{name}-{val}' for name, val in options.__dict__.items() if name not in pending_options])
+            hashes[stage_names[i]] = hashlib.sha256(f"{key}-{options_key}".encode("utf-8")).hexdigest()
+    return dict(reversed(hashes.items()))
+
+
+def _put_stage(hash, module_filename, module, earlier_files, metadata_filename, metadata):
+    """
+    Caches the intermediate `module` under `hash`. The modules of the earlier
+    stages aren't copied: `earlier_files` maps their file names to their paths
+    in the cache of the kernel being compiled.
+    """
+    stage_cache_manager = get_cache_manager(hash)
+    stage_cache_manager.begin_group(metadata_filename)
+    stage = {"metadata": metadata, "earlier_files": earlier_files}
+    group = {
+        module_filename: stage_cache_manager.put(module, module_filename),
+        metadata_filename: stage_cache_manager.put(json.dumps(stage, default=vars), metadata_filename, binary=False),
+    }
+    stage_cache_manager.put_group(metadata_filename, group)
+
+
+def _get_stage(hash, module_filename, metadata_filename):
+    """
+    Returns the path of the intermediate module cached under `hash` and its
+    stage data, or None if it isn't cached or the modules of the earlier
+    stages were removed from the cache since.
+    """
+    stage_group = get_cache_manager(hash).get_group(metadata_filename) or {}
+    if module_filename not in stage_group or metadata_filename not in stage_group:
+        return None
+    stage = json.loads(Path(stage_group[metadata_filename]).read_text())
+    if not all(os.path.exists(path) for path in stage["earlier_files"].values()):
+        return None
+    return stage_group[module_filename], stage
+
+
 def compile(src, target=None, options=None):
     compilation_listener = knobs.compilation.listener
     if compilation_listener:
@@ -283,26 +339,32 @@ def compile(src, target=None, options=None):
     env_vars = get_cache_invalidating_env_vars()
     key = f"{triton_key()}-{src.hash()}-{backend.hash()}-{options.hash()}-{str(sorted(env_vars.items()))}"
     hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
-    fn_cache_manager = get_cache_manager(hash)
-    # For dumping/overriding only hash the source as we want it to be independent of triton
-    # core changes to make it easier to track kernels by hash.
-    enable_override = knobs.compilation.override
-    enable_ir_dump = knobs.compilation.dump_ir
-    store_only_binary = knobs.compilation.store_binary_only
-    fn_override_manager = get_override_manager(src.hash()) if enable_override else None
-    fn_dump_manager = get_dump_manager(src.hash()) if enable_ir_dump else None
     # Pre-truncate the file name here to avoid hitting the 255 character limit on common platforms.
     # The final file name in the cache will have a format of f"{filename}.{ext}.tmp.pid_{pid}_{uuid}".
     # A PID string can be 5-character long. A UUID string has typically 36 characters. Let's truncate
     # the file name to 150 characters to be safe.
     file_name = src.name[:150]
     metadata_filename = f"{file_name}.json"
-    metadata_group = fn_cache_manager.get_group(metadata_filename) or {}
-    metadata_path = metadata_group.get(metadata_filename)
     always_compile = knobs.compilation.always_compile
-    if not always_compile and metadata_path is not None:
+    res = None
+    metadata_cache_key = (knobs.cache.dir, hash)
+    # Kernels already seen by this process skip the cache manager lookup and metadata parsing.
+    if not always_compile and (entry := kernel_metadata_cache.get(metadata_cache_key)) is not None:
+        metadata_group, kernel_metadata = entry
+        if all(os.path.exists(path) for path in metadata_group.values()):
+            res = CompiledKernel(src, metadata_group, hash, kernel_metadata)
+        else:
+            # The cached files were removed (or evicted) behind our back; look them up again.
+            kernel_metadata_cache.pop(metadata_cache_key)
+    if res is None:
+        fn_cache_manager = get_cache_manager(hash)
+        metadata_group = fn_cache_manager.get_group(metadata_filename) or {}
+        metadata_path = metadata_group.get(metadata_filename)
+        if not always_compile and metadata_path is not None:
+            res = CompiledKernel(src, metadata_group, hash)
+            kernel_metadata_cache.put(metadata_cache_key, (dict(metadata_group), res.metadata))
+    if res is not None:
         # cache hit!
-        res = CompiledKernel(src, metadata_group, hash)
         if compilation_listener:
             compilation_listener(
                 src=src,
@@ -313,6 +375,16 @@ def compile(src, target=None, options=None):
             )
         return res
 
+    # For dumping/overriding only hash the source as we want it to be independent of triton
+    # core changes to make it easier to track kernels by hash.
+    enable_override = knobs.compilation.override
+    enable_ir_dump = knobs.compilation.dump_ir
+    store_only_binary = knobs.compilation.store_binary_only
+    fn_override_manager = get_override_manager(src.hash()) if enable_override else None
+    fn_dump_manager = get_dump_manager(src.hash()) if enable_ir_dump else None
+    # The files written below are stored as a group once the kernel is compiled.
+    fn_cache_manager.begin_group(metadata_filename)
+
     # initialize metadata
     metadata = {
         "hash": hash,
@@ -336,25 +408,48 @@ def compile(src, target=None, options=None):
         ir.load_dialects(context)
         backend.load_dialects(context)
 
-    codegen_fns = backend.get_codegen_implementation(options)
-    module_map = backend.get_module_map()
-    try:
-        module = src.make_ir(options, codegen_fns, module_map, context)
-    except Exception as e:
-        filter_traceback(e)
-        raise
-
-    if ir_source:
-        ir_filename = f"{file_name}.{src.ext}"
-        metadata_group[ir_filename] = fn_cache_manager.put(module, ir_filename)
-    else:
-        ir_filename = f"{file_name}.source"
-        metadata_group[ir_filename] = fn_cache_manager.put(module, ir_filename)
-
     use_ir_loc = knobs.compilation.use_ir_loc
-    if ir_source and use_ir_loc:
-        module.create_location_snapshot(src.path)
-        print(f"Creating new locations for {src.path}")
+    # Intermediate modules are cached separately when some options only affect later stages.
+    stage_cache_enabled = not (always_compile or store_only_binary or enable_override or enable_ir_dump or use_ir_loc
+                               or metadata.get("ir_override", None))
+    stage_hashes = _stage_hashes(f"{triton_key()}-{src.hash()}-{backend.hash()}-{str(sorted(env_vars.items()))}",
+                                 options,
+                                 list(stages.keys())[first_stage:], backend.get_late_options())
+    stage_metadata_filename = f"{file_name}.stage.json"
+    initial_metadata = dict(metadata)
+    stage_files = {}
+
+    # Resume from the last intermediate module that is already cached, if any.
+    module = None
+    if stage_cache_enabled:
+        for ext in reversed(stage_hashes):
+            module_filename = f"{file_name}.{ext}"
+            if (cached_stage := _get_stage(stage_hashes[ext], module_filename, stage_metadata_filename)) is None:
+                continue
+            module_path, stage = cached_stage
+            for filename, path in [*stage["earlier_files"].items(), (module_filename, module_path)]:
+                metadata_group[filename] = fn_cache_manager.put(Path(path).read_bytes(), filename)
+            metadata.update(stage["metadata"])
+            module = parse(metadata_group[module_filename], ext, context)
+            first_stage = list(stages.keys()).index(ext) + 1
+            break
+
+    if module is None:
+        codegen_fns = backend.get_codegen_implementation(options)
+        module_map = backend.get_module_map()
+        try:
+            module = src.make_ir(options, codegen_fns, module_map, context)
+        except Exception as e:
+            filter_traceback(e)
+            raise
+
+        ir_filename = f"{file_name}.{src.ext}" if ir_source else f"{file_name}.source"
+        stage_files[ir_filename] = str(module)
+        metadata_group[ir_filename] = fn_cache_manager.put(stage_files[ir_filename], ir_filename)
+
+        if ir_source and use_ir_loc:
+            module.create_location_snapshot(src.path)
+            print(f"Creating new locations for {src.path}")
 
     if compilation_listener:
         timer.finished_ir_initialization()
@@ -369,9 +464,11 @@ def compile(src, target=None, options=None):
         elif full_name := fn_override_manager.get_file(ir_filename):
             print(f"\nOverriding kernel with file {full_name}")
             next_module = parse(full_name, ext, context)
+        if stage_cache_enabled:
+            stage_files[ir_filename] = next_module if isinstance(next_module, bytes) else str(next_module)
         # If TRITON_STORE_BINARY_ONLY is 1, only store cubin/hsaco/json
         if (not store_only_binary) or (ext in ("cubin", "hsaco", "json", "spv")):
-            metadata_group[ir_filename] = fn_cache_manager.put(next_module, ir_filename)
+            metadata_group[ir_filename] = fn_cache_manager.put(stage_files.get(ir_filename, next_module), ir_filename)
         if fn_dump_manager is not None:
             fn_dump_manager.put(next_module, ir_filename)
         # use an env variable to parse ir from file
@@ -379,6 +476,15 @@ def compile(src, target=None, options=None):
             ir_full_name = fn_cache_manager.get_file(ir_filename)
             next_module.create_location_snapshot(ir_full_name)
             print(f"Creating new locations for {ir_full_name}")
+        if stage_cache_enabled and ext in stage_hashes:
+            stage_metadata = {
+                k: v
+                for k, v in metadata.items()
+                if k not in initial_metadata or initial_metadata[k] != v
+            }
+            earlier_files = {filename: path for filename, path in metadata_group.items() if filename != ir_filename}
+            _put_stage(stage_hashes[ext], ir_filename, stage_files[ir_filename], earlier_files, stage_metadata_filename,
+                       stage_metadata)
         module = next_module
         if compilation_listener:
             timer.stage_finished(ext)
@@ -403,15 +509,35 @@ def compile(src, target=None, options=None):
         compilation_listener(src=src, metadata=metadata, metadata_group=metadata_group, times=timer.end(),
                              cache_hit=False)
     # return handle to compiled kernel
-    return CompiledKernel(src, metadata_group, hash)
+    res = CompiledKernel(src, metadata_group, hash)
+    kernel_metadata_cache.put(metadata_cache_key, (dict(metadata_group), res.metadata))
+    return res
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_freeze, value))
+    return value
+
+
+# Backends are created once per target, keyed on a hashable version of the
+# target: the arch of some targets (e.g. XPU) is a dict of device properties.
+_backends_by_target: dict[tuple, BaseBackend] = {}
 
 
 def make_backend(target: GPUTarget) -> BaseBackend:
+    key = (target.backend, _freeze(target.arch), target.warp_size)
+    backend = _backends_by_target.get(key)
+    if backend is not None:
+        return backend
     actives = [x.compiler for x in backends.values() if x.compiler.supports_target(target)]
     if len(actives) != 1:
         raise RuntimeError(
             f"{len(actives)} compatible backends for target ({target.backend}) ({actives}). There should only be one.")
-    return actives[0](target)
+    backend = _backends_by_target[key] = actives[0](target)
+    return backend
 
 
 class LazyDict:
@@ -431,12 +557,29 @@ class LazyDict:
 
 
 class AsmDict(dict):
+    """
+    Maps IR names to the text of each level of IR generated during
+    compilation. Files are only read from disk the first time they are
+    accessed.
+    """
+
+    def __init__(self, paths, binary_ext):
+        super().__init__()
+        self._paths = paths
+        self._binary_ext = binary_ext
 
     def __missing__(self, key):
 
-        if key == "sass":
+        if key in self._paths:
+            path = self._paths[key]
+            try:
+                value = path.read_bytes() if key == self._binary_ext else path.read_text()
+            except FileNotFoundError as e:
+                raise RuntimeError(f"The {key} of this kernel was removed from the cache ({path}); "
+                                   "recompile the kernel to access it") from e
+        elif key == "sass":
             value = get_sass(self["cubin"])
-        if key == "spvdis":
+        elif key == "spvdis":
             value = get_spvdis(self["spv"])
         else:
             raise KeyError("Unknown key: '%s'" % key)
@@ -444,38 +587,76 @@ class AsmDict(dict):
         self[key] = value
         return value
 
+    def _load_all(self):
+        for key in self._paths:
+            self[key]
+
+    def __contains__(self, key):
+        return key in self._paths or super().__contains__(key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def keys(self):
+        return list(dict.fromkeys([*self._paths, *super().keys()]))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        self._load_all()
+        return super().items()
+
+    def values(self):
+        self._load_all()
+        return super().values()
+
 
 class CompiledKernel:
 
-    def __init__(self, src, metadata_group, hash):
-        from collections import namedtuple
-        metadata_path = next((Path(p) for c, p in metadata_group.items() if c.endswith(".json")))
-        metadata = json.loads(metadata_path.read_text())
-        metadata['cluster_dims'] = tuple(metadata['cluster_dims'])
-        # JSON serialization dumps the target as a dict. Restore it to a GPUTarget.
-        target = metadata['target']
-        metadata['target'] = GPUTarget(target['backend'], target['arch'], target['warp_size'])
-        KernelMetadata = namedtuple('KernelMetadata', sorted(list(metadata.keys())))
-        self.metadata = KernelMetadata(**metadata)
-        backend = make_backend(self.metadata.target)
-        self.packed_metadata = backend.pack_metadata(self.metadata)
+    def __init__(self, src, metadata_group, hash, metadata=None):
+        # The kernels of every device cache compiled to this hash share the
+        # same metadata, binary and per-device module handles.
+        self._binary = binary_registry.get_binary(hash, lambda: self._read_binary(metadata_group, hash, metadata))
+        self.metadata = self._binary.metadata
+        self.packed_metadata = self._binary.packed_metadata
         self.src = src
         self.hash = hash
         self.name = self.metadata.name
         # stores the text of each level of IR that was generated during compilation
-        asm_files = [Path(p) for c, p in metadata_group.items() if not c.endswith(".json")]
-        binary_ext = backend.binary_ext
-        self.asm = AsmDict({
-            file.suffix[1:]: file.read_bytes() if file.suffix[1:] == binary_ext else file.read_text()
-            for file in asm_files
-        })
-        self.kernel = self.asm[binary_ext]
+        self.asm = self._binary.asm
+        self.kernel = self._binary.kernel
         # binaries are lazily initialized
         # because it involves doing runtime things
         # (e.g., checking amount of shared memory on current device)
         self.module = None
         self.function = None
 
+    @classmethod
+    def _read_binary(cls, metadata_group, hash, metadata=None):
+        if metadata is None:
+            metadata = cls._parse_metadata(metadata_group)
+        backend = make_backend(metadata.target)
+        asm_files = [Path(p) for c, p in metadata_group.items() if not c.endswith(".json")]
+        binary_ext = backend.binary_ext
+        asm = AsmDict({file.suffix[1:]: file for file in asm_files}, binary_ext)
+        return binary_registry.KernelBinary(hash, metadata, backend.pack_metadata(metadata), asm, asm[binary_ext])
+
+    @staticmethod
+    def _parse_metadata(metadata_group):
+        from collections import namedtuple
+        metadata_path = next((Path(p) for c, p in metadata_group.items() if c.endswith(".json")))
+        metadata = json.loads(metadata_path.read_text())
+        metadata['cluster_dims'] = tuple(metadata['cluster_dims'])
+        # JSON serialization dumps the target as a dict. Restore it to a GPUTarget.
+        target = metadata['target']
+        metadata['target'] = GPUTarget(target['backend'], target['arch'], target['warp_size'])
+        KernelMetadata = namedtuple('KernelMetadata', sorted(list(metadata.keys())))
+        return KernelMetadata(**metadata)
+
     def _init_handles(self):
         if self.module is not None:
             return
@@ -492,9 +673,8 @@ class CompiledKernel:
             if self.metadata.tmem_size > max_tmem_size:
                 raise OutOfResources(self.metadata.tmem_size, max_tmem_size, "tensor memory")
         # TODO: n_regs, n_spills should be metadata generated when calling `ptxas`
-        self.module, self.function, self.n_regs, self.n_spills, self.n_max_threads = driver.active.utils.load_binary(
-            self.name, self.kernel, self.metadata.shared, self.metadata.build_flags,
-            not self.metadata.generate_native_code, device)
+        self.module, self.function, self.n_regs, self.n_spills, self.n_max_threads = self._binary.handles(
+            device, self._load_binary)
         if hasattr(self.metadata, "threads_per_warp"):
             warp_size = self.metadata.threads_per_warp
         else:
@@ -502,6 +682,19 @@ class CompiledKernel:
         if self.metadata.num_warps * warp_size > self.n_max_threads:
             raise OutOfResources(self.metadata.num_warps * warp_size, self.n_max_threads, "threads")
 
+    def _load_binary(self, device):
+        return driver.active.utils.load_binary(self.name, self.kernel, self.metadata.shared, self.metadata.build_flags,
+                                               not self.metadata.generate_native_code, device)
+
+    def load_async(self, device):
+        """
+        Starts loading the binary on `device` in a background thread, so that
+        the first launch on the device doesn't wait for the driver to build it.
+        The module handles are shared with the kernels of other device caches
+        compiled to the same binary.
+        """
+        return self._binary.load_async(device, self._load_binary)
+
     def __getattribute__(self, name):
         if name == 'run':
             self._init_handles()
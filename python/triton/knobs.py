@@ -125,6 +125,21 @@ class env_bool(env_base[bool, bool]):
         return val.lower() in ("1", "true", "yes", "on", "y")
 
 
+class env_launch_counters(env_bool):
+    # Launches check `triton.runtime.launch_counters.enabled` rather than the
+    # knob, so refresh it whenever the knob is set.
+
+    def __set__(self, obj: object, value: Union[bool, Env]) -> None:
+        super().__set__(obj, value)
+        from .runtime import launch_counters
+        launch_counters.refresh()
+
+    def __delete__(self, obj: object) -> None:
+        super().__delete__(obj)
+        from .runtime import launch_counters
+        launch_counters.refresh()
+
+
 class env_int(env_base[int, int]):
 
     def __init__(self, key: str, default: Union[int, Callable[[], int]] = 0) -> None:
@@ -395,6 +410,14 @@ class cache_knobs(base_knobs):
 
     manager_class: env_class[CacheManager] = env_class("TRITON_CACHE_MANAGER", "CacheManager")
     remote_manager_class: env_class[RemoteCacheBackend] = env_class("TRITON_REMOTE_CACHE_BACKEND", "RemoteCacheBackend")
+    # Compress files with zlib before sending them to the remote cache backend.
+    remote_compress: env_bool = env_bool("TRITON_REMOTE_CACHE_COMPRESS")
+    # Directory used by `FileRemoteCacheBackend`, e.g. a shared network mount.
+    remote_dir: env_str = env_str("TRITON_REMOTE_CACHE_DIR", lambda: cache.get_triton_dir("remote_cache"))
+    # Number of compiled kernels whose metadata is kept in memory, 0 disables the in-memory cache.
+    in_memory_size: env_int = env_int("TRITON_CACHE_IN_MEMORY_SIZE", 1024)
+    # Maximum size in bytes of the content-addressed cache, 0 means unlimited.
+    max_size: env_int = env_int("TRITON_CACHE_MAX_SIZE", 0)
 
     def get_triton_dir(self, dirname: str) -> str:
         return os.path.join(self.home_dir, ".triton", dirname)
@@ -417,6 +440,13 @@ class compilation_knobs(base_knobs):
 class autotuning_knobs(base_knobs):
     cache: env_bool = env_bool("TRITON_CACHE_AUTOTUNING")
     print: env_bool = env_bool("TRITON_PRINT_AUTOTUNING")
+    # Number of spawned processes compiling the configs before they are benchmarked, 0 means one per CPU.
+    # The default, 1, compiles each config right before benchmarking it.
+    compile_workers: env_int = env_int("TRITON_AUTOTUNE_COMPILE_WORKERS", 1)
+    # Path of a sqlite database of tuned configs, looked up before benchmarking and updated after.
+    db: env_opt_str = env_opt_str("TRITON_AUTOTUNING_DB")
+    # Skip benchmarking the configs whose kernels spill registers, unless they all do.
+    prune_spilling: env_bool = env_bool("TRITON_AUTOTUNE_PRUNE_SPILLING")
 
 
 class LaunchHook(Protocol):
@@ -455,9 +485,18 @@ class JITHook(Protocol):
 
 class runtime_knobs(base_knobs):
     interpret: env_bool = env_bool("TRITON_INTERPRET")
+    # Run up to this many program instances at once in the interpreter, as a single NumPy
+    # computation over a leading program axis. 0 runs them one at a time.
+    interpret_grid_batch: env_int = env_int("TRITON_INTERPRET_GRID_BATCH", 0)
+    # Shard the programs of an interpreted grid across this many forked processes, sharing the
+    # host copies of the arguments. 0 runs them in the launching process.
+    interpret_workers: env_int = env_int("TRITON_INTERPRET_WORKERS", 0)
     debug: env_bool = env_bool("TRITON_DEBUG")
     override_arch: env_opt_str = env_opt_str("TRITON_OVERRIDE_ARCH")
 
+    # Accumulate the time spent in each phase of kernel launches, see triton.runtime.launch_counters.
+    launch_counters: env_launch_counters = env_launch_counters("TRITON_LAUNCH_COUNTERS")
+
     launch_enter_hook: Optional[LaunchHook] = None
     launch_exit_hook: Optional[LaunchHook] = None
 
@@ -488,6 +527,8 @@ class nvidia_knobs(base_knobs):
 
 class intel_knobs(base_knobs):
     spirv_dis: env_intel_tool = env_intel_tool("spirv-dis")
+    # Command used to generate native code from SPIR-V.
+    ocloc: env_str = env_str("TRITON_OCLOC_PATH", "ocloc")
 
     gen_native_code: env_bool = env_bool("TRITON_XPU_GEN_NATIVE_CODE", False)
     tile_load_ll: env_bool = env_bool("TRITON_XPU_ENABLE_TILE_LOAD_LINEAR_LAYOUT", True)
@@ -495,9 +536,23 @@ class intel_knobs(base_knobs):
     opt_reduction_locality: env_bool = env_bool("TRITON_INTEL_OPTIMIZE_REDUCTION_LOCALITY", False)
     reduce_transpose: env_bool = env_bool("TRITON_INTEL_REDUCE_TRANSPOSE", False)
     disable_igc_opt: env_bool = env_bool("TRITON_INTEL_DISABLE_IGC_OPT", False)
+    # Compile the 256 GRF variant of native code in parallel, in case the default one spills.
+    speculative_large_grf: env_bool = env_bool("TRITON_INTEL_SPECULATIVE_LARGE_GRF", False)
+    # Default grf_mode to 'pressure', selecting the large GRF mode for kernels whose estimated register pressure
+    # exceeds the small GRF mode.
+    grf_mode_from_pressure: env_bool = env_bool("TRITON_INTEL_GRF_MODE_FROM_PRESSURE", False)
 
     raise_block_pointer: env_str = env_str("TRITON_INTEL_RAISE_BLOCK_POINTER", "0")
     dump_spirv_kernel_args: env_opt_str = env_opt_str("TRITON_XPU_DUMP_SPIRV_KERNEL_ARGS")
+    # Only dump the arguments of the N-th launch (counting from 0) of each kernel matching the filter, -1 for all.
+    dump_spirv_kernel_args_launch: env_int = env_int("TRITON_XPU_DUMP_SPIRV_KERNEL_ARGS_LAUNCH", -1)
+    # Regular expression selecting the names of the kernels whose arguments are dumped.
+    dump_spirv_kernel_args_filter: env_opt_str = env_opt_str("TRITON_XPU_DUMP_SPIRV_KERNEL_ARGS_FILTER")
+    # Generate and compile a launcher for each kernel signature instead of using the generic one.
+    specialized_launcher: env_bool = env_bool("TRITON_XPU_SPECIALIZED_LAUNCHER", False)
+    # Build the driver utilities, architecture parser and generic launcher with a single compiler invocation.
+    # Ignored when `build.impl` is set, which is called once per module.
+    batch_build: env_bool = env_bool("TRITON_XPU_BATCH_BUILD", True)
 
     libdevice_path: env_opt_str = env_opt_str("TRITON_LIBDEVICE_PATH")
 
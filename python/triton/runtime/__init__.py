@@ -1,14 +1,20 @@
-from .autotuner import (Autotuner, Config, Heuristics, autotune, heuristics)
+from .async_compile import AsyncCompileMode, FutureKernel
+from .autotuner import (Autotuner, Config, ExhaustiveSearch, Heuristics, SearchStrategy, SuccessiveHalving, autotune,
+                        heuristics)
 from .cache import RedisRemoteCacheBackend, RemoteCacheBackend
 from .driver import driver
 from .jit import JITFunction, KernelInterface, MockTensor, TensorWrapper, reinterpret
 from .errors import OutOfResources, InterpreterError
+from .warmup import warmup_kernels
 
 __all__ = [
+    "AsyncCompileMode",
     "autotune",
     "Autotuner",
     "Config",
     "driver",
+    "ExhaustiveSearch",
+    "FutureKernel",
     "Heuristics",
     "heuristics",
     "InterpreterError",
@@ -19,5 +25,8 @@ __all__ = [
     "RedisRemoteCacheBackend",
     "reinterpret",
     "RemoteCacheBackend",
+    "SearchStrategy",
+    "SuccessiveHalving",
     "TensorWrapper",
+    "warmup_kernels",
 ]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, Future, as_completed
+from contextvars import ContextVar, copy_context
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    from ..compiler import CompiledKernel
+    from .jit import JITFunction
+
+active_mode: ContextVar[Optional[AsyncCompileMode]] = ContextVar("async_compile_active_mode", default=None)
+
+
+class FutureKernel:
+    """
+    A kernel that is being compiled in the background. :code:`result()` waits
+    for the compilation to finish, and registers the kernel in the cache of
+    the :code:`JITFunction` it belongs to.
+    """
+
+    def __init__(self, future: Future, finalize_compile: Callable[[CompiledKernel], None]):
+        self.future = future
+        self.finalize_compile = finalize_compile
+        self.kernel = None
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> CompiledKernel:
+        if self.kernel is None:
+            kernel = self.future.result()
+            self.finalize_compile(kernel)
+            self.kernel = kernel
+        return self.kernel
+
+
+class AsyncCompileMode:
+    """
+    Context manager in which :code:`JITFunction.run` compiles new
+    specializations on :code:`executor` instead of in the calling thread:
+
+    .. code-block:: python
+
+        with AsyncCompileMode(ThreadPoolExecutor(4), fallback=pick_fallback):
+            kernel[grid](x, y, n)
+
+    While a specialization is compiling, :code:`kernel.warmup(...)` returns a
+    :code:`FutureKernel` right away. Launches call :code:`fallback(fn, args)`
+    with the :code:`JITFunction` and its bound arguments (a dict mapping names
+    to values); if it returns a previously compiled kernel that accepts the
+    same arguments, that kernel is launched instead of waiting for the new
+    one. Otherwise, or without a fallback, the launch blocks until the
+    compilation is done.
+
+    Leaving the context waits for all outstanding compilations. The mode is
+    stored in a context variable, so it only applies to the thread (or
+    asyncio task) that entered it. Compilations run in a copy of the context
+    that submitted them, without the mode: kernels compiled by the compilation
+    itself, e.g. from compilation hooks, are compiled synchronously, so that
+    they can't wait for an executor they are blocking.
+
+    :param executor: runs the compilations. Compilation mostly happens outside
+        of the interpreter lock (in MLIR and in the backend tools), so a
+        :code:`ThreadPoolExecutor` is usually enough.
+    :param fallback: picks a kernel to launch while the right one is compiling.
+    """
+
+    def __init__(self, executor: Executor, fallback: Optional[Callable[[JITFunction, Dict[str, Any]],
+                                                                       Optional[CompiledKernel]]] = None):
+        self.executor = executor
+        self.fallback = fallback
+        self.future_kernels: Dict[Hashable, FutureKernel] = {}
+
+    def get(self, key: Hashable) -> Optional[FutureKernel]:
+        return self.future_kernels.get(key, None)
+
+    def submit(self, key: Hashable, compile_fn: Callable[[], CompiledKernel],
+               finalize_fn: Callable[[CompiledKernel], None]) -> FutureKernel:
+        future_kernel = self.future_kernels.get(key, None)
+        if future_kernel is None:
+            context = copy_context()
+            context.run(active_mode.set, None)
+            future_kernel = FutureKernel(self.executor.submit(context.run, compile_fn), finalize_fn)
+            self.future_kernels[key] = future_kernel
+        return future_kernel
+
+    def __enter__(self):
+        if active_mode.get() is not None:
+            raise RuntimeError("Another AsyncCompileMode is already active")
+        self._token = active_mode.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            futures = {future_kernel.future: future_kernel for future_kernel in self.future_kernels.values()}
+            for future in as_completed(futures):
+                futures[future].result()
+        finally:
+            active_mode.reset(self._token)
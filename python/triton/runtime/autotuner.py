@@ -6,7 +6,7 @@ import inspect
 import hashlib
 import json
 from functools import cached_property
-from typing import Dict, Tuple, List, Optional
+from typing import Any, Callable, Dict, Tuple, List, Optional
 
 from .. import knobs
 from .jit import KernelInterface
@@ -15,10 +15,12 @@ from .driver import driver
 
 
 class Autotuner(KernelInterface):
+    # Autotuning databases opened by this process, keyed on their path.
+    _dbs: Dict[str, Any] = {}
 
     def __init__(self, fn, arg_names, configs, key, reset_to_zero, restore_value, pre_hook=None, post_hook=None,
                  prune_configs_by: Optional[Dict] = None, warmup=None, rep=None, use_cuda_graph=False, do_bench=None,
-                 cache_results=False):
+                 cache_results=False, search_strategy: Optional[SearchStrategy] = None):
         """
         :param prune_configs_by: a dict of functions that are used to prune configs, fields:
             'perf_model': performance model used to predicate running time with different configs, returns running time
@@ -31,6 +33,9 @@ class Autotuner(KernelInterface):
             self.configs = configs
         self.keys = key
         self.cache: Dict[Tuple, Config] = {}
+        # Records of the autotuning database, keyed on (kernel cache key, device).
+        self.db_records: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        self.configs_timings = None
         self.arg_names = arg_names
         self.cache_results = cache_results or (knobs.autotuning.cache and not knobs.runtime.interpret)
 
@@ -80,6 +85,8 @@ class Autotuner(KernelInterface):
             self.configs_top_k = prune_configs_by.get("top_k", self.configs_top_k)
             self.early_config_prune = prune_configs_by.get("early_config_prune", self.early_config_prune)
 
+        self.search_strategy = search_strategy or ExhaustiveSearch()
+
         self.fn = fn
         self.base_fn = fn
         while not inspect.isfunction(self.base_fn):
@@ -121,7 +128,28 @@ class Autotuner(KernelInterface):
             return driver.active.get_benchmarker()
         return self._do_bench
 
-    def _bench(self, *args, config, **meta):
+    @cached_property
+    def bench_budget(self) -> Optional[Tuple[float, float]]:
+        """
+        The default (warmup, rep) arguments of the benchmark function, used to
+        give it a fraction of its budget, or None if it doesn't take them.
+        """
+        try:
+            params = inspect.signature(self.do_bench).parameters
+        except (TypeError, ValueError):
+            return None
+        defaults = tuple(params[name].default if name in params else None for name in ("warmup", "rep"))
+        if not all(isinstance(default, (int, float)) for default in defaults):
+            return None
+        return defaults
+
+    def _bench_with_budget(self, kernel_call, quantiles, budget=1.0):
+        if budget >= 1.0 or self.bench_budget is None:
+            return self.do_bench(kernel_call, quantiles=quantiles)
+        warmup, rep = self.bench_budget
+        return self.do_bench(kernel_call, quantiles=quantiles, warmup=warmup * budget, rep=rep * budget)
+
+    def _bench(self, *args, config, budget=1.0, **meta):
         from ..compiler.errors import CompileTimeAssertionFailure
 
         verbose = knobs.autotuning.print
@@ -157,12 +185,105 @@ class Autotuner(KernelInterface):
             self.post_hook(full_nargs, exception=None)
 
         try:
-            return self.do_bench(kernel_call, quantiles=(0.5, 0.2, 0.8))
+            return self._bench_with_budget(kernel_call, quantiles=(0.5, 0.2, 0.8), budget=budget)
         except (OutOfResources, CompileTimeAssertionFailure, PTXASError) as e:
             if verbose:
                 print(f"Autotuning failed with {e}")
             return [float("inf"), float("inf"), float("inf")]
 
+    def _precompile(self, args, kwargs, configs) -> Dict[Config, float]:
+        """
+        Compiles all `configs` in parallel ahead of benchmarking them, so that
+        only the timing runs serially on the device. Returns the compile time of
+        each config, in seconds. Compilation errors are ignored here and
+        reported again when the config is benchmarked.
+        """
+        workers = knobs.autotuning.compile_workers
+        if len(configs) <= 1 or workers == 1 or knobs.runtime.interpret:
+            return {}
+        from .warmup import _compile_specs
+        specs = [(self.fn, args, {**kwargs, **config.all_kwargs()}) for config in configs]
+        return {config: compile_time for config, (_, compile_time) in zip(configs, _compile_specs(specs, workers))}
+
+    def _prune_spilling(self, args, kwargs, configs) -> List[Config]:
+        """
+        Drops the configs whose kernels spill registers, unless they all do.
+        The kernels are compiled, and loaded if their metadata doesn't tell
+        whether they spill, before being benchmarked.
+        """
+        if len(configs) <= 1:
+            return configs
+        from ..compiler import CompiledKernel
+        from .warmup import _compile_specs
+        specs = [(self.fn, args, {**kwargs, **config.all_kwargs()}) for config in configs]
+        kept = []
+        for config, (kernels, _) in zip(configs, _compile_specs(specs, knobs.autotuning.compile_workers)):
+            try:
+                spills = any(_kernel_spills(kernel) for kernel in kernels if isinstance(kernel, CompiledKernel))
+            except OutOfResources:
+                # Reported when benchmarking.
+                spills = False
+            if spills and knobs.autotuning.print:
+                print(f"Pruning config {config}, which spills registers")
+            if not spills:
+                kept.append(config)
+        return kept or configs
+
+    def _jit_function(self):
+        from triton.runtime.jit import JITFunction
+
+        fn = self.fn
+        while not isinstance(fn, JITFunction):
+            fn = fn.fn
+        return fn
+
+    def _db_location(self):
+        """
+        Returns the autotuning database and the (cache key, device) of this
+        kernel in it, or None if no database is configured.
+        """
+        if not knobs.autotuning.db or knobs.runtime.interpret:
+            return None
+        from triton.compiler.compiler import make_backend
+        from .autotuning_db import AutotuningDatabase, device_key
+
+        path = knobs.autotuning.db
+        if path not in Autotuner._dbs:
+            Autotuner._dbs[path] = AutotuningDatabase(path)
+        target = driver.active.get_current_target()
+        return Autotuner._dbs[path], self._jit_function().cache_key, device_key(target, make_backend(target))
+
+    def _lookup_db(self, tuning_key):
+        location = self._db_location()
+        if location is None:
+            return None
+        db, cache_key, device = location
+        from .autotuning_db import config_to_dict, tuning_key as serialize_key
+
+        # All the records of this kernel are loaded at once, on first use.
+        if (cache_key, device) not in self.db_records:
+            self.db_records[(cache_key, device)] = db.lookup(cache_key, device)
+        record = self.db_records[(cache_key, device)].get(serialize_key(tuning_key))
+        if record is None:
+            return None
+        # Records only hold the serializable fields of a config; use the
+        # matching config of this autotuner, which may have a pre_hook.
+        return next((config for config in self.configs if config_to_dict(config) == record), None)
+
+    def _store_db(self, tuning_key):
+        location = self._db_location()
+        if location is None:
+            return
+        db, cache_key, device = location
+        from .autotuning_db import config_to_dict, tuning_key as serialize_key
+
+        config = self.cache[tuning_key]
+        timing = self.configs_timings.get(config) if self.configs_timings else None
+        record = config_to_dict(config)
+        db.store(cache_key, device, serialize_key(tuning_key), self.base_fn.__name__, record,
+                 timing[0] if isinstance(timing, list) else timing)
+        self.db_records.setdefault((cache_key, device), {})[serialize_key(tuning_key)] = record
+
     def check_disk_cache(self, tuning_key, configs, bench_fn):
         # We can't serialize prehooks, so just give up and run the benchmarks.
         if not tuning_key or any(cfg.pre_hook for cfg in configs):
@@ -172,11 +293,8 @@ class Autotuner(KernelInterface):
         from triton._C.libtriton import get_cache_invalidating_env_vars
         from triton.compiler.compiler import make_backend, triton_key
         from triton.runtime.cache import get_cache_manager
-        from triton.runtime.jit import JITFunction
 
-        fn = self.fn
-        while not isinstance(fn, JITFunction):
-            fn = fn.fn
+        fn = self._jit_function()
 
         env_vars = get_cache_invalidating_env_vars()
         cache_key = [
@@ -219,13 +337,29 @@ class Autotuner(KernelInterface):
                 if hasattr(arg, "dtype"):
                     key.append(str(arg.dtype))
             key = tuple(key)
+            if key not in self.cache and (db_config := self._lookup_db(key)) is not None:
+                self.cache[key] = db_config
             if key not in self.cache:
                 used_cached_result = False
                 pruned_configs = self.prune_configs(kwargs)
 
                 def benchmark():
                     bench_start = time.time()
-                    timings = {config: self._bench(*args, config=config, **kwargs) for config in pruned_configs}
+                    self.configs_compile_times = self._precompile(args, kwargs, pruned_configs)
+                    configs = pruned_configs
+                    if knobs.autotuning.prune_spilling:
+                        configs = self._prune_spilling(args, kwargs, configs)
+                    self.compile_time = time.time() - bench_start
+                    self.configs_bench_times = {}
+
+                    def bench(config, budget=1.0):
+                        config_start = time.time()
+                        timing = self._bench(*args, config=config, budget=budget, **kwargs)
+                        elapsed = time.time() - config_start
+                        self.configs_bench_times[config] = self.configs_bench_times.get(config, 0.0) + elapsed
+                        return timing
+
+                    timings = self.search_strategy.search(configs, bench)
                     bench_end = time.time()
                     self.bench_time = bench_end - bench_start
                     self.cache[key] = builtins.min(timings, key=timings.get)
@@ -237,6 +371,7 @@ class Autotuner(KernelInterface):
                     used_cached_result = self.check_disk_cache(key, pruned_configs, benchmark)
                 else:
                     benchmark()
+                self._store_db(key)
 
             config = self.cache[key]
         else:
@@ -244,7 +379,8 @@ class Autotuner(KernelInterface):
         self.best_config = config
         if knobs.autotuning.print and not used_cached_result:
             print(f"Triton autotuning for function {self.base_fn.__name__},\nwith key as {key},\n"
-                  f"finished after {self.bench_time:.2f}s,\nbest config selected: {self.best_config};")
+                  f"finished after {self.bench_time:.2f}s (compilation {self.compile_time:.2f}s),\n"
+                  f"best config selected: {self.best_config};")
         if config.pre_hook is not None:
             full_nargs = {**self.nargs, **kwargs, **config.all_kwargs()}
             config.pre_hook(full_nargs)
@@ -292,6 +428,101 @@ class Autotuner(KernelInterface):
         self.nargs = None
         return ret
 
+    def _warmup_specs(self, args, kwargs):
+        self.nargs = dict(zip(self.arg_names, args))
+        try:
+            pruned_configs = self.prune_configs(kwargs)
+        finally:
+            self.nargs = None
+        specs = []
+        for config in pruned_configs:
+            specs += self.fn._warmup_specs(args, {**kwargs, **config.all_kwargs()})
+        return specs
+
+
+def _kernel_spills(kernel) -> int:
+    """
+    Returns the spill size of a compiled kernel, as recorded in its metadata by
+    the backends that know it at compile time, or reported when loading it.
+    """
+    spills = getattr(kernel.metadata, "spills", None)
+    if spills is None:
+        kernel._init_handles()
+        spills = kernel.n_spills
+    return spills
+
+
+class SearchStrategy:
+    """
+    Decides which configs the autotuner benchmarks, and with how much of the
+    benchmarking budget. :code:`search` is called with the pruned configs and
+    a :code:`bench(config, budget=1.0)` function, which runs the benchmark
+    function with a fraction :code:`budget` of its warmup and repetition time
+    and returns the timings of the config. Benchmark functions that don't take
+    :code:`warmup` and :code:`rep` arguments always get their full budget.
+
+    :code:`search` returns the timings of the configs measured with the full
+    budget; the autotuner picks the fastest of them.
+    """
+
+    def search(self, configs: List[Config], bench: Callable[..., List[float]]) -> Dict[Config, List[float]]:
+        raise NotImplementedError
+
+
+def _median(timing):
+    return timing[0] if isinstance(timing, (list, tuple)) else timing
+
+
+class ExhaustiveSearch(SearchStrategy):
+    """
+    Benchmarks every config with the full budget.
+    """
+
+    def search(self, configs, bench):
+        return {config: bench(config) for config in configs}
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Benchmarks all configs with a small budget, keeps the fastest
+    :code:`1 / reduction_factor` of them, and repeats with a budget
+    :code:`reduction_factor` times larger, until the survivors get the full
+    budget. The first round uses :code:`min_budget`, or the budget that reaches
+    a single survivor at full budget if that is larger. Configs that fail to
+    compile or run are dropped in the first round.
+
+    :param reduction_factor: how many times fewer configs survive each round.
+    :type reduction_factor: int
+    :param min_budget: fraction of the full budget spent on each config in the first round.
+    :type min_budget: float
+    :param min_survivors: the number of configs benchmarked with the full budget.
+    :type min_survivors: int
+    """
+
+    def __init__(self, reduction_factor: int = 3, min_budget: float = 0.05, min_survivors: int = 1):
+        if reduction_factor < 2:
+            raise ValueError("reduction_factor must be at least 2")
+        if not 0 < min_budget <= 1:
+            raise ValueError("min_budget must be in (0, 1]")
+        self.reduction_factor = reduction_factor
+        self.min_budget = min_budget
+        self.min_survivors = max(1, min_survivors)
+
+    def search(self, configs, bench):
+        eta = self.reduction_factor
+        rounds = 0
+        while len(configs) > self.min_survivors * eta**rounds:
+            rounds += 1
+        budget = builtins.max(self.min_budget, float(eta)**-rounds)
+        survivors = list(configs)
+        while budget < 1.0 and len(survivors) > self.min_survivors:
+            timings = {config: bench(config, budget=budget) for config in survivors}
+            survivors = [config for config in survivors if _median(timings[config]) != float("inf")] or survivors
+            survivors.sort(key=lambda config: _median(timings[config]))
+            survivors = survivors[:builtins.max(self.min_survivors, -(-len(survivors) // eta))]
+            budget *= eta
+        return {config: bench(config) for config in survivors}
+
 
 class Config:
     """
@@ -374,7 +605,7 @@ class Config:
 
 
 def autotune(configs, key, prune_configs_by=None, reset_to_zero=None, restore_value=None, pre_hook=None, post_hook=None,
-             warmup=None, rep=None, use_cuda_graph=False, do_bench=None, cache_results=False):
+             warmup=None, rep=None, use_cuda_graph=False, do_bench=None, cache_results=False, search_strategy=None):
     """
     Decorator for auto-tuning a :code:`triton.jit`'d function.
 
@@ -430,12 +661,16 @@ def autotune(configs, key, prune_configs_by=None, reset_to_zero=None, restore_va
     :type do_bench: lambda fn, quantiles
     :param cache_results: whether to cache autotune timings to disk.  Defaults to False.
     "type cache_results: bool
+    :param search_strategy: how the pruned configs are benchmarked. Defaults to :code:`ExhaustiveSearch()`, which
+        gives every config the full benchmarking budget; :code:`SuccessiveHalving()` only does so for the fastest ones.
+    :type search_strategy: triton.runtime.SearchStrategy
     """
 
     def decorator(fn):
         return Autotuner(fn, fn.arg_names, configs, key, reset_to_zero, restore_value, pre_hook=pre_hook,
                          post_hook=post_hook, prune_configs_by=prune_configs_by, warmup=warmup, rep=rep,
-                         use_cuda_graph=use_cuda_graph, do_bench=do_bench, cache_results=cache_results)
+                         use_cuda_graph=use_cuda_graph, do_bench=do_bench, cache_results=cache_results,
+                         search_strategy=search_strategy)
 
     return decorator
 
@@ -452,6 +687,12 @@ class Heuristics(KernelInterface):
             kwargs[v] = heur({**dict(zip(self.arg_names, args)), **kwargs})
         return self.fn.run(*args, **kwargs)
 
+    def _warmup_specs(self, args, kwargs):
+        kwargs = dict(kwargs)
+        for v, heur in self.values.items():
+            kwargs[v] = heur({**dict(zip(self.arg_names, args)), **kwargs})
+        return self.fn._warmup_specs(args, kwargs)
+
 
 def heuristics(values):
     """
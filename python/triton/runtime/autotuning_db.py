@@ -0,0 +1,185 @@
+"""
+A persistent database of autotuning results, stored in a sqlite file.
+
+Records are keyed on the cache key of the kernel source, the device they were
+tuned on, and the autotuning key (the values of the `key` arguments followed by
+the dtypes of the tensor arguments). Point `TRITON_AUTOTUNING_DB` at a database
+to make `triton.autotune` look up the best config there before benchmarking,
+and store the configs it benchmarks. Databases can be exported to and imported
+from JSON, and merged, with `python -m triton.runtime.autotuning_db`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    cache_key TEXT NOT NULL,
+    device TEXT NOT NULL,
+    key TEXT NOT NULL,
+    kernel TEXT NOT NULL,
+    config TEXT NOT NULL,
+    timing REAL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (cache_key, device, key)
+);
+"""
+
+COLUMNS = ("cache_key", "device", "key", "kernel", "config", "timing", "timestamp")
+
+
+def config_to_dict(config) -> Dict[str, Any]:
+    """
+    Returns the serializable fields of a `triton.Config`. Pre-hooks can't be
+    stored; configs read back are matched against the configs of the
+    autotuner, which provide them.
+    """
+    return json.loads(
+        json.dumps({
+            "kwargs": config.kwargs,
+            "num_warps": config.num_warps,
+            "num_ctas": config.num_ctas,
+            "num_stages": config.num_stages,
+            "maxnreg": config.maxnreg,
+            "ir_override": config.ir_override,
+        }))
+
+
+def device_key(target, backend) -> str:
+    """
+    Identifies the devices a tuning result applies to: the target architecture,
+    or for targets described by a dict of properties (e.g. XPU), the device
+    name and execution unit count the backend parsed from them.
+    """
+    if not isinstance(target.arch, dict):
+        return f"{target.backend}:{target.arch}"
+    properties = backend.properties
+    return f"{target.backend}:{properties.get('name')}:{properties.get('gpu_eu_count')}"
+
+
+def tuning_key(key: tuple) -> str:
+    return json.dumps(list(key), default=str)
+
+
+class AutotuningDatabase:
+    """
+    A sqlite database of autotuning results. It can be shared by several
+    processes; every write is a separate transaction.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite connections can be shared neither between threads nor across fork().
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            dirname = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(dirname, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60)
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def lookup(self, cache_key: str, device: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the configs tuned for a kernel on a device, keyed on the
+        serialized autotuning key.
+        """
+        rows = self._connect().execute("SELECT key, config FROM records WHERE cache_key = ? AND device = ?",
+                                       (cache_key, device))
+        return {key: json.loads(config) for key, config in rows}
+
+    def store(self, cache_key: str, device: str, key: str, kernel: str, config: Dict[str, Any],
+              timing: Optional[float]):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (cache_key, device, key, kernel, json.dumps(config), timing, time.time()))
+
+    def records(self) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(f"SELECT {', '.join(COLUMNS)} FROM records ORDER BY kernel, device, key")
+        return [dict(zip(COLUMNS, row), config=json.loads(row[4])) for row in rows]
+
+    def merge(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Adds `records` (as returned by `records()`) to the database. When a
+        record already exists for the same kernel, device and key, the one with
+        the lowest timing is kept, or the most recent one if timings are missing.
+
+        :return: the number of records that were added or replaced.
+        """
+        changed = 0
+        with self._connect() as conn:
+            for record in records:
+                existing = conn.execute(
+                    "SELECT timing, timestamp FROM records WHERE cache_key = ? AND device = ? "
+                    "AND key = ?", (record["cache_key"], record["device"], record["key"])).fetchone()
+                if existing is not None:
+                    timing, timestamp = existing
+                    if timing is not None and record["timing"] is not None:
+                        if record["timing"] >= timing:
+                            continue
+                    elif record["timestamp"] <= timestamp:
+                        continue
+                conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             tuple(json.dumps(record[c]) if c == "config" else record[c] for c in COLUMNS))
+                changed += 1
+        return changed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m triton.runtime.autotuning_db",
+                                     description="Inspect, export, import and merge Triton autotuning databases.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="print the records of a database")
+    list_parser.add_argument("db")
+    export_parser = subparsers.add_parser("export", help="write the records of a database to a JSON file")
+    export_parser.add_argument("db")
+    export_parser.add_argument("output", help="JSON file, '-' for stdout")
+    import_parser = subparsers.add_parser("import", help="add the records of JSON files to a database")
+    import_parser.add_argument("db")
+    import_parser.add_argument("inputs", nargs="+")
+    merge_parser = subparsers.add_parser("merge", help="add the records of other databases to a database")
+    merge_parser.add_argument("db")
+    merge_parser.add_argument("others", nargs="+")
+    args = parser.parse_args(argv)
+
+    db = AutotuningDatabase(args.db)
+    if args.command == "list":
+        for record in db.records():
+            timing = "n/a" if record["timing"] is None else f"{record['timing']:.4f}ms"
+            print(f"{record['kernel']} [{record['device']}] key={record['key']}: {record['config']} ({timing})")
+    elif args.command == "export":
+        data = json.dumps(db.records(), indent=2)
+        if args.output == "-":
+            print(data)
+        else:
+            with open(args.output, "w") as f:
+                f.write(data)
+    else:
+        changed = 0
+        for source in (args.inputs if args.command == "import" else args.others):
+            if args.command == "import":
+                with open(source) as f:
+                    records = json.load(f)
+            elif not os.path.exists(source):
+                print(f"No database at {source}", file=sys.stderr)
+                return 1
+            else:
+                records = AutotuningDatabase(source).records()
+            changed += db.merge(records)
+        print(f"{changed} records added or updated in {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Compiled kernel binaries shared across devices.
+
+Every device cache of a `JITFunction` holds its own `CompiledKernel`, but the
+kernels compiled from the same source for the same target have the same hash
+and share a single `KernelBinary`: the parsed metadata, the IRs and binary
+read from the cache, and the module handles loaded on each device. A binary is
+registered for as long as a `CompiledKernel` uses it.
+
+The handles of a device are loaded once per binary, either on the first launch
+on the device or ahead of time, in a background thread, with `load_async`
+(see `warmup_kernels(..., devices=...)`). The number of binaries and loads and
+the time spent loading are read with `get_load_stats()`.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# kernel hash -> KernelBinary, for as long as a CompiledKernel uses it
+_binaries: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+_stats = defaultdict(int)
+# device -> [number of loads, total load time in seconds]
+_device_stats: Dict[int, list] = defaultdict(lambda: [0, 0.0])
+
+
+class KernelBinary:
+    """
+    The metadata and binary of a compiled kernel, and the handles
+    `(module, function, n_regs, n_spills, n_max_threads)` loaded from the
+    binary on each device.
+    """
+
+    def __init__(self, hash: str, metadata, packed_metadata, asm, kernel):
+        self.hash = hash
+        self.metadata = metadata
+        self.packed_metadata = packed_metadata
+        self.asm = asm
+        self.kernel = kernel
+        # device -> Future of the handles
+        self._handles: Dict[int, Future] = {}
+
+    def _claim(self, device):
+        """
+        Returns the future of the handles on `device`, and whether the caller
+        is the one that has to load them.
+        """
+        with _lock:
+            future = self._handles.get(device)
+            if future is not None:
+                return future, False
+            future = self._handles[device] = Future()
+            return future, True
+
+    def _load(self, future: Future, device: int, load: Callable[[int], Any]):
+        start = time.perf_counter()
+        try:
+            handles = load(device)
+        except BaseException as e:
+            # Let the next launch retry, as if nothing had been loaded.
+            with _lock:
+                del self._handles[device]
+            future.set_exception(e)
+            return
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _stats["loads"] += 1
+            _stats["load_time"] += elapsed
+            device_stats = _device_stats[device]
+            device_stats[0] += 1
+            device_stats[1] += elapsed
+        future.set_result(handles)
+
+    def handles(self, device: int, load: Callable[[int], Any]):
+        """
+        Returns the handles on `device`, calling `load(device)` to load them
+        unless they were loaded, or are being loaded, already.
+        """
+        future, owner = self._claim(device)
+        if owner:
+            self._load(future, device, load)
+        else:
+            with _lock:
+                _stats["load_hits"] += 1
+        return future.result()
+
+    def load_async(self, device: int, load: Callable[[int], Any]) -> Future:
+        """
+        Starts loading the handles on `device` in a background thread, unless
+        they were loaded, or are being loaded, already.
+        """
+        future, owner = self._claim(device)
+        if owner:
+            _get_executor().submit(self._load, future, device, load)
+        return future
+
+    def loaded_devices(self):
+        with _lock:
+            return [device for device, future in self._handles.items() if future.done()]
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="triton-load")
+        return _executor
+
+
+def get_binary(hash: str, create: Callable[[], KernelBinary]) -> KernelBinary:
+    """
+    Returns the binary registered for `hash`, or registers the one returned by
+    `create()`.
+    """
+    binary = _binaries.get(hash)
+    if binary is not None:
+        with _lock:
+            _stats["binary_hits"] += 1
+        return binary
+    created = create()
+    with _lock:
+        # Another thread may have registered the same binary in the meantime.
+        binary = _binaries.setdefault(hash, created)
+        _stats["binaries" if binary is created else "binary_hits"] += 1
+    return binary
+
+
+def get_load_stats() -> Dict[str, Any]:
+    """
+    Returns the statistics accumulated so far.
+
+    :return: a dict with the number of `binaries` read from the cache, of
+        `binary_hits` (kernels sharing an already registered binary), of
+        `loads` of handles and of `load_hits` (launches reusing the handles of
+        a device), the total `load_time` in seconds, and `devices`, mapping
+        devices to their number of loads and total load time.
+    """
+    with _lock:
+        stats = {name: _stats[name] for name in ("binaries", "binary_hits", "loads", "load_hits")}
+        stats["load_time"] = float(_stats["load_time"])
+        stats["devices"] = {device: tuple(device_stats) for device, device_stats in _device_stats.items()}
+        return stats
+
+
+def reset_load_stats():
+    with _lock:
+        _stats.clear()
+        _device_stats.clear()
@@ -22,10 +22,15 @@ def is_xpu():
 
 
 def _cc_cmd(cc, src, out, include_dirs, library_dirs, libraries):
+    # Several sources are compiled in a single invocation and linked into one shared object.
+    srcs = src if isinstance(src, list) else [src]
     if "cl.EXE" in cc or "clang-cl" in cc:
-        cc_cmd = [cc, "/Zc:__cplusplus", "/std:c++17", src, "/nologo", "/O2", "/LD", "/wd4996", "/MD", "/EHsc"]
+        cc_cmd = [cc, "/Zc:__cplusplus", "/std:c++17", *srcs, "/nologo", "/O2", "/LD", "/wd4996", "/MD", "/EHsc"]
         cc_cmd += [f"/I{dir}" for dir in include_dirs]
-        cc_cmd += [f"/Fo{os.path.join(os.path.dirname(out), 'main.obj')}"]
+        if len(srcs) == 1:
+            cc_cmd += [f"/Fo{os.path.join(os.path.dirname(out), 'main.obj')}"]
+        else:
+            cc_cmd += [f"/Fo{os.path.dirname(out)}{os.sep}"]
         cc_cmd += ["/link"]
         cc_cmd += [f"/OUT:{out}"]
         cc_cmd += [f"/IMPLIB:{os.path.join(os.path.dirname(out), 'main.lib')}"]
@@ -33,7 +38,7 @@ def _cc_cmd(cc, src, out, include_dirs, library_dirs, libraries):
         cc_cmd += [f"/LIBPATH:{dir}" for dir in library_dirs]
         cc_cmd += [f'{lib}.lib' for lib in libraries]
     else:
-        cc_cmd = [cc, src, "-O3", "-shared", "-Wno-psabi"]
+        cc_cmd = [cc, *srcs, "-O3", "-shared", "-Wno-psabi"]
         if os.name != "nt":
             cc_cmd += ["-fPIC"]
         else:
@@ -46,8 +51,8 @@ def _cc_cmd(cc, src, out, include_dirs, library_dirs, libraries):
     return cc_cmd
 
 
-def _build(name: str, src: str, srcdir: str, library_dirs: list[str], include_dirs: list[str], libraries: list[str],
-           extra_compile_args: list[str] = []) -> str:
+def _build(name: str, src: str | list[str], srcdir: str, library_dirs: list[str], include_dirs: list[str],
+           libraries: list[str], extra_compile_args: list[str] = []) -> str:
     if impl := knobs.build.impl:
         return impl(name, src, srcdir, library_dirs, include_dirs, libraries, extra_compile_args)
     suffix = sysconfig.get_config_var('EXT_SUFFIX')
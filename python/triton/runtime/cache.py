@@ -1,8 +1,15 @@
+import argparse
 import json
 import os
+import sqlite3
+import sys
+import threading
+import time
 import uuid
+import zlib
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 import base64
 import hashlib
 
@@ -30,6 +37,14 @@ class CacheManager(ABC):
     def put_group(self, filename: str, group: Dict[str, str]):
         pass
 
+    def begin_group(self, filename: str):
+        """
+        Tells the manager that the files put from now on are members of the
+        group `filename`, which is about to be stored with `put_group`.
+        Managers may buffer them until then.
+        """
+        pass
+
 
 class FileCacheManager(CacheManager):
 
@@ -128,6 +143,232 @@ class FileCacheManager(CacheManager):
         return filepath
 
 
+class ContentAddressedCacheIndex:
+    """
+    Book-keeping for `ContentAddressedCacheManager`, stored in a sqlite
+    database next to the blobs. It maps (key, filename) pairs to blobs, records
+    the groups written by the compiler, the size and last access time of every
+    blob, and hit/miss counters.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS blobs (blob TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL);
+    CREATE TABLE IF NOT EXISTS entries (key TEXT NOT NULL, filename TEXT NOT NULL, blob TEXT NOT NULL,
+                                        PRIMARY KEY (key, filename));
+    CREATE INDEX IF NOT EXISTS entries_blob ON entries (blob);
+    CREATE TABLE IF NOT EXISTS groups (key TEXT NOT NULL, filename TEXT NOT NULL, children TEXT NOT NULL,
+                                       PRIMARY KEY (key, filename));
+    CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    """
+
+    # Files in the blob directory that are not in the index and older than
+    # this (in seconds) are left over from interrupted writes.
+    ORPHAN_AGE = 3600
+
+    _instances: Dict[str, "ContentAddressedCacheIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.path = os.path.join(cache_dir, "index.sqlite")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._local = threading.local()
+
+    @classmethod
+    def for_dir(cls, cache_dir: str) -> "ContentAddressedCacheIndex":
+        with cls._instances_lock:
+            if cache_dir not in cls._instances:
+                cls._instances[cache_dir] = cls(cache_dir)
+            return cls._instances[cache_dir]
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite connections can be shared neither between threads nor across fork().
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def blob_path(self, blob: str) -> str:
+        return os.path.join(self.blob_dir, blob[:2], blob)
+
+    def put(self, key: str, filename: str, data: bytes) -> str:
+        blob = hashlib.sha256(data).hexdigest() + os.path.splitext(filename)[1]
+        path = self.blob_path(blob)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.tmp.pid_{os.getpid()}_{uuid.uuid4()}"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            # Identical blobs have identical contents, so it doesn't matter
+            # which of several concurrent writers wins.
+            os.replace(temp_path, path)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)", (blob, len(data), time.time()))
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, filename, blob))
+        return path
+
+    def put_group(self, key: str, filename: str, children: List[str]):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO groups VALUES (?, ?, ?)", (key, filename, json.dumps(children)))
+
+    def _lookup(self, conn: sqlite3.Connection, key: str, filenames: List[str]) -> Optional[Dict[str, str]]:
+        blobs = {}
+        for filename in filenames:
+            row = conn.execute("SELECT blob FROM entries WHERE key = ? AND filename = ?", (key, filename)).fetchone()
+            if row is None or not os.path.exists(self.blob_path(row[0])):
+                return None
+            blobs[filename] = row[0]
+        conn.executemany("UPDATE blobs SET last_access = ? WHERE blob = ?",
+                         [(time.time(), blob) for blob in blobs.values()])
+        return {filename: self.blob_path(blob) for filename, blob in blobs.items()}
+
+    def get(self, key: str, filename: str) -> Optional[str]:
+        with self._connect() as conn:
+            paths = self._lookup(conn, key, [filename])
+        return None if paths is None else paths[filename]
+
+    def get_group(self, key: str, filename: str) -> Optional[Dict[str, str]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT children FROM groups WHERE key = ? AND filename = ?", (key, filename)).fetchone()
+            paths = None if row is None else self._lookup(conn, key, json.loads(row[0]))
+            counter = "misses" if paths is None else "hits"
+            conn.execute("INSERT INTO stats VALUES (?, 1) ON CONFLICT (name) DO UPDATE SET value = value + 1",
+                         (counter, ))
+        return paths
+
+    def evict(self, max_size: int) -> Tuple[int, int]:
+        """
+        Removes the least recently used blobs until the total size of the
+        cache is at most `max_size` bytes.
+
+        :return: the number of removed blobs and the number of bytes freed.
+        """
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= max_size:
+                return 0, 0
+            victims = []
+            freed = 0
+            for blob, size in conn.execute("SELECT blob, size FROM blobs ORDER BY last_access"):
+                if total - freed <= max_size:
+                    break
+                victims.append(blob)
+                freed += size
+            conn.executemany("DELETE FROM blobs WHERE blob = ?", [(blob, ) for blob in victims])
+            conn.executemany("DELETE FROM entries WHERE blob = ?", [(blob, ) for blob in victims])
+        for blob in victims:
+            try:
+                os.remove(self.blob_path(blob))
+            except FileNotFoundError:
+                pass
+        return len(victims), freed
+
+    def gc(self, max_size: int) -> Dict[str, int]:
+        """
+        Evicts blobs down to `max_size` bytes (if positive), then drops
+        groups whose files are gone and blob files unknown to the index.
+        """
+        removed, freed = self.evict(max_size) if max_size > 0 else (0, 0)
+        with self._connect() as conn:
+            known = {blob for blob, in conn.execute("SELECT blob FROM blobs")}
+            missing = [(blob, ) for blob in known if not os.path.exists(self.blob_path(blob))]
+            conn.executemany("DELETE FROM blobs WHERE blob = ?", missing)
+            conn.executemany("DELETE FROM entries WHERE blob = ?", missing)
+            conn.execute("DELETE FROM entries WHERE blob NOT IN (SELECT blob FROM blobs)")
+            stale_groups = []
+            for key, filename, children in conn.execute("SELECT key, filename, children FROM groups").fetchall():
+                present = {f for f, in conn.execute("SELECT filename FROM entries WHERE key = ?", (key, ))}
+                if not present.issuperset(json.loads(children)):
+                    stale_groups.append((key, filename))
+            conn.executemany("DELETE FROM groups WHERE key = ? AND filename = ?", stale_groups)
+            known = {blob for blob, in conn.execute("SELECT blob FROM blobs")}
+        now = time.time()
+        for root, _, files in os.walk(self.blob_dir):
+            for file in files:
+                path = os.path.join(root, file)
+                if file not in known and now - os.path.getmtime(path) > self.ORPHAN_AGE:
+                    freed += os.path.getsize(path)
+                    removed += 1
+                    os.remove(path)
+        return {"removed_blobs": removed, "freed_bytes": freed, "removed_groups": len(stale_groups)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            logical_size = conn.execute(
+                "SELECT COALESCE(SUM(blobs.size), 0) FROM entries JOIN blobs ON entries.blob = blobs.blob").fetchone(
+                )[0]
+            kernels = conn.execute("SELECT COUNT(*) FROM groups").fetchone()[0]
+            counters = dict(conn.execute("SELECT name, value FROM stats"))
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "kernels": kernels,
+            "blobs": blobs,
+            "size": size,
+            "logical_size": logical_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+class ContentAddressedCacheManager(CacheManager):
+    """
+    A cache manager that stores files by the hash of their contents under
+    `knobs.cache.dir`/blobs, so identical files produced for different keys
+    (e.g. the same SPIR-V for two kernels) are stored once. The mapping from
+    keys to blobs and the access times live in a `ContentAddressedCacheIndex`;
+    when `knobs.cache.max_size` is set, the least recently used blobs are
+    evicted as new ones are written.
+
+    Enable it with `TRITON_CACHE_MANAGER=triton.runtime.cache:ContentAddressedCacheManager`.
+    """
+
+    def __init__(self, key, override=False, dump=False):
+        self.key = key
+        self._override = override
+        self._dump = dump
+        if dump or override:
+            # Dumped and overridden files are meant to be browsed by users,
+            # keep the usual layout for them.
+            self._file_cache_manager = FileCacheManager(key, override=override, dump=dump)
+            return
+        if not knobs.cache.dir:
+            raise RuntimeError("Could not create or locate cache dir")
+        self._index = ContentAddressedCacheIndex.for_dir(knobs.cache.dir)
+
+    def get_file(self, filename) -> Optional[str]:
+        if self._dump or self._override:
+            return self._file_cache_manager.get_file(filename)
+        return self._index.get(self.key, filename)
+
+    def put(self, data, filename, binary=True) -> str:
+        if self._dump or self._override:
+            return self._file_cache_manager.put(data, filename, binary=binary)
+        if not isinstance(data, bytes):
+            data = str(data).encode("utf-8")
+        path = self._index.put(self.key, filename, data)
+        if knobs.cache.max_size > 0:
+            self._index.evict(knobs.cache.max_size)
+        return path
+
+    def get_group(self, filename: str) -> Optional[Dict[str, str]]:
+        if self._dump or self._override:
+            return self._file_cache_manager.get_group(filename)
+        return self._index.get_group(self.key, filename)
+
+    def put_group(self, filename: str, group: Dict[str, str]):
+        if self._dump or self._override:
+            return self._file_cache_manager.put_group(filename, group)
+        self._index.put_group(self.key, filename, sorted(group.keys()))
+
+
 class RemoteCacheBackend:
     """
     A backend implementation for accessing a remote/distributed cache.
@@ -144,30 +385,141 @@ class RemoteCacheBackend:
     def put(self, filename: str, data: bytes):
         pass
 
+    def put_many(self, files: Dict[str, bytes]):
+        """
+        Stores several files at once. Backends should override this to send
+        all of them in a single round trip.
+        """
+        for filename, data in files.items():
+            self.put(filename, data)
+
 
 class RedisRemoteCacheBackend(RemoteCacheBackend):
 
+    # Connection pools shared by all backends of this process, keyed on (host, port).
+    _pools: Dict[Tuple[str, int], Any] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, key):
         import redis
         self._key = key
-        self._key_fmt = knobs.cache.redis.key_format
-        self._redis = redis.Redis(
-            host=knobs.cache.redis.host,
-            port=knobs.cache.redis.port,
-        )
+        self._key_fmt = knobs.redis.key_format
+        address = (knobs.redis.host, knobs.redis.port)
+        with self._pools_lock:
+            pool = self._pools.get(address)
+            if pool is None:
+                pool = self._pools[address] = redis.ConnectionPool(host=address[0], port=address[1])
+        self._redis = redis.Redis(connection_pool=pool)
 
     def _get_key(self, filename: str) -> str:
         return self._key_fmt.format(key=self._key, filename=filename)
 
-    def get(self, filenames: List[str]) -> Dict[str, str]:
+    def get(self, filenames: List[str]) -> Dict[str, bytes]:
         results = self._redis.mget([self._get_key(f) for f in filenames])
         return {filename: result for filename, result in zip(filenames, results) if result is not None}
 
-    def put(self, filename: str, data: bytes) -> Dict[str, bytes]:
+    def put(self, filename: str, data: bytes):
         self._redis.set(self._get_key(filename), data)
 
+    def put_many(self, files: Dict[str, bytes]):
+        self._redis.mset({self._get_key(filename): data for filename, data in files.items()})
+
+
+class InProcessRemoteCacheBackend(RemoteCacheBackend):
+    """
+    A stand-in for a remote cache that keeps files in a dictionary shared by
+    every instance in the process. It counts round trips and can simulate
+    network latency, to test and benchmark `RemoteCacheManager` without a
+    server.
+    """
+
+    store: Dict[Tuple[str, str], bytes] = {}
+    round_trips = 0
+    # Seconds to sleep on every round trip.
+    latency = 0.0
+
+    def __init__(self, key: str):
+        self._key = key
+
+    @classmethod
+    def _round_trip(cls):
+        cls.round_trips += 1
+        if cls.latency:
+            time.sleep(cls.latency)
+
+    def get(self, filenames: List[str]) -> Dict[str, bytes]:
+        self._round_trip()
+        return {f: self.store[(self._key, f)] for f in filenames if (self._key, f) in self.store}
+
+    def put(self, filename: str, data: bytes):
+        self.put_many({filename: data})
+
+    def put_many(self, files: Dict[str, bytes]):
+        self._round_trip()
+        for filename, data in files.items():
+            self.store[(self._key, filename)] = data
+
+
+class FileRemoteCacheBackend(RemoteCacheBackend):
+    """
+    A remote cache backed by a directory, `knobs.cache.remote_dir`, which can
+    live on a shared file system.
+    """
+
+    def __init__(self, key: str):
+        self._dir = os.path.join(knobs.cache.remote_dir, key)
+
+    def get(self, filenames: List[str]) -> Dict[str, bytes]:
+        results = {}
+        for filename in filenames:
+            try:
+                with open(os.path.join(self._dir, filename), "rb") as f:
+                    results[filename] = f.read()
+            except FileNotFoundError:
+                pass
+        return results
+
+    def put(self, filename: str, data: bytes):
+        os.makedirs(self._dir, exist_ok=True)
+        path = os.path.join(self._dir, filename)
+        temp_path = f"{path}.tmp.pid_{os.getpid()}_{uuid.uuid4()}"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+
+# Header of group files that embed the contents of their children, followed by
+# a JSON list of [filename, size] pairs, a newline and the concatenated contents.
+_GROUP_BUNDLE_MAGIC = b"TRITON_GROUP_BUNDLE\n"
+# Header of files compressed with zlib before being sent to the backend.
+_COMPRESSED_MAGIC = b"TRITON_ZLIB\n"
+
+
+def _pack_group(files: Dict[str, bytes]) -> bytes:
+    header = json.dumps([[filename, len(data)] for filename, data in files.items()]).encode("utf-8")
+    return b"".join([_GROUP_BUNDLE_MAGIC, header, b"\n", *files.values()])
+
+
+def _unpack_group(data: bytes) -> Dict[str, bytes]:
+    header_end = data.index(b"\n", len(_GROUP_BUNDLE_MAGIC))
+    offset = header_end + 1
+    files = {}
+    for filename, size in json.loads(data[len(_GROUP_BUNDLE_MAGIC):header_end]):
+        files[filename] = data[offset:offset + size]
+        offset += size
+    return files
+
 
 class RemoteCacheManager(CacheManager):
+    """
+    Stores files in the backend pointed to by `TRITON_REMOTE_CACHE_BACKEND`
+    and materializes them locally through a `FileCacheManager`.
+
+    Storing a group sends the group and the contents of all of its children
+    to the backend as a single bundle, so that fetching a group takes a single
+    round trip. Files put after `begin_group` are buffered until the group is
+    stored (and dropped if it never is); other files are sent right away.
+    """
 
     def __init__(self, key, override=False, dump=False):
         # Setup backend pointed too by `TRITON_REMOTE_CACHE_BACKEND`.
@@ -183,6 +535,21 @@ class RemoteCacheManager(CacheManager):
         # Use a `FileCacheManager` to materialize remote cache paths locally.
         self._file_cache_manager = FileCacheManager(key, override=override, dump=dump)
 
+        # Members of the group being written, since `begin_group`.
+        self._pending: Optional[Dict[str, bytes]] = None
+
+    @staticmethod
+    def _encode(data: bytes) -> bytes:
+        if knobs.cache.remote_compress:
+            return _COMPRESSED_MAGIC + zlib.compress(data)
+        return data
+
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        if data.startswith(_COMPRESSED_MAGIC):
+            return zlib.decompress(data[len(_COMPRESSED_MAGIC):])
+        return data
+
     def _materialize(self, filename: str, data: bytes):
         # We use a backing `FileCacheManager` to provide the materialized data.
         return self._file_cache_manager.put(data, filename, binary=True)
@@ -192,6 +559,9 @@ class RemoteCacheManager(CacheManager):
         if self._dump or self._override:
             return self._file_cache_manager.get_file(filename)
 
+        if self._pending is not None and filename in self._pending:
+            return self._file_cache_manager.get_file(filename)
+
         # We always check the remote cache backend -- even if our internal file-
         # based cache has the item -- to make sure LRU accounting works as
         # expected.
@@ -199,7 +569,7 @@ class RemoteCacheManager(CacheManager):
         if len(results) == 0:
             return None
         (_, data), = results.items()
-        return self._materialize(filename, data)
+        return self._materialize(filename, self._decode(data))
 
     def put(self, data, filename: str, binary=True) -> str:
         # We don't handle the dump/override cases.
@@ -208,7 +578,10 @@ class RemoteCacheManager(CacheManager):
 
         if not isinstance(data, bytes):
             data = str(data).encode("utf-8")
-        self._backend.put(filename, data)
+        if self._pending is not None:
+            self._pending[filename] = data
+        else:
+            self._backend.put(filename, self._encode(data))
         return self._materialize(filename, data)
 
     def get_group(self, filename: str) -> Optional[Dict[str, str]]:
@@ -217,12 +590,17 @@ class RemoteCacheManager(CacheManager):
             return self._file_cache_manager.get_group(filename)
 
         grp_filename = f"__grp__{filename}"
-        grp_filepath = self.get_file(grp_filename)
-        if grp_filepath is None:
+        results = self._backend.get([grp_filename])
+        if len(results) == 0:
             return None
-        with open(grp_filepath) as f:
-            grp_data = json.load(f)
-        child_paths = grp_data.get("child_paths", None)
+        (_, grp_data), = results.items()
+        grp_data = self._decode(grp_data)
+
+        if grp_data.startswith(_GROUP_BUNDLE_MAGIC):
+            return {child: self._materialize(child, data) for child, data in _unpack_group(grp_data).items()}
+
+        # Groups written before bundles were introduced only list their children.
+        child_paths = json.loads(grp_data).get("child_paths", None)
 
         result = None
 
@@ -230,7 +608,7 @@ class RemoteCacheManager(CacheManager):
         if child_paths is not None:
             result = {}
             for child_path, data in self._backend.get(child_paths).items():
-                result[child_path] = self._materialize(child_path, data)
+                result[child_path] = self._materialize(child_path, self._decode(data))
 
         return result
 
@@ -239,9 +617,63 @@ class RemoteCacheManager(CacheManager):
         if self._dump or self._override:
             return self._file_cache_manager.put_group(filename, group)
 
-        grp_contents = json.dumps({"child_paths": sorted(list(group.keys()))})
-        grp_filename = f"__grp__{filename}"
-        return self.put(grp_contents, grp_filename)
+        pending, self._pending = self._pending or {}, None
+        children = {}
+        for child in sorted(group.keys()):
+            if child in pending:
+                children[child] = pending.pop(child)
+            else:
+                with open(group[child], "rb") as f:
+                    children[child] = f.read()
+        # Buffered files that didn't end up in the group are sent along with it.
+        files = {f"__grp__{filename}": _pack_group(children), **pending}
+        self._backend.put_many({name: self._encode(data) for name, data in files.items()})
+        return self._file_cache_manager.put_group(filename, group)
+
+    def begin_group(self, filename: str):
+        if not (self._dump or self._override):
+            self._pending = {}
+
+
+class InMemoryCache:
+    """
+    A process-level, size-bounded LRU cache that sits in front of the cache
+    managers, so that repeated lookups of the same key don't have to go
+    through the file system. Its capacity is `knobs.cache.in_memory_size`.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key, None)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        capacity = knobs.cache.in_memory_size
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(capacity, 0):
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
 
 
 def _base32(key):
@@ -272,3 +704,76 @@ def make_so_cache_key(version_hash, signature, constants, ids, **kwargs):
         key = f"{key}-{kwargs.get(kw)}"
     key = hashlib.sha256(key.encode("utf-8")).hexdigest()
     return _base32(key)
+
+
+def _parse_size(size: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    size = size.strip().upper().rstrip("B")
+    if size and size[-1] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def _disk_usage(path: str) -> Tuple[int, int]:
+    files = 0
+    size = 0
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                size += os.path.getsize(os.path.join(root, filename))
+                files += 1
+            except OSError:
+                pass
+    return files, size
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m triton.runtime.cache",
+                                     description="Inspect and garbage-collect the Triton kernel cache.")
+    parser.add_argument("--cache-dir", default=None, help="cache directory, defaults to TRITON_CACHE_DIR")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="report the footprint and hit rate of the cache")
+    gc_parser = subparsers.add_parser("gc", help="evict least recently used blobs and remove stale files")
+    gc_parser.add_argument("--max-size", type=_parse_size, default=None,
+                           help="target size, e.g. 10G, defaults to TRITON_CACHE_MAX_SIZE")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.cache_dir or knobs.cache.dir
+    if not os.path.isdir(cache_dir):
+        print(f"No cache at {cache_dir}", file=sys.stderr)
+        return 1
+    has_index = os.path.exists(os.path.join(cache_dir, "index.sqlite"))
+
+    if args.command == "gc":
+        if not has_index:
+            print(f"{cache_dir} is not managed by ContentAddressedCacheManager", file=sys.stderr)
+            return 1
+        max_size = knobs.cache.max_size if args.max_size is None else args.max_size
+        result = ContentAddressedCacheIndex.for_dir(cache_dir).gc(max_size)
+        print(f"removed {result['removed_blobs']} blobs ({_format_size(result['freed_bytes'])}) "
+              f"and {result['removed_groups']} stale kernels")
+        return 0
+
+    files, size = _disk_usage(cache_dir)
+    print(f"cache dir:    {cache_dir}")
+    print(f"footprint:    {_format_size(size)} in {files} files")
+    if has_index:
+        stats = ContentAddressedCacheIndex.for_dir(cache_dir).stats()
+        print(f"kernels:      {stats['kernels']}")
+        print(f"blobs:        {stats['blobs']} ({_format_size(stats['size'])}, "
+              f"{_format_size(stats['logical_size'])} before deduplication)")
+        print(f"lookups:      {stats['hits']} hits, {stats['misses']} misses "
+              f"(hit rate {stats['hit_rate']:.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,12 @@
 from __future__ import annotations
 import ast
+import contextlib
+import multiprocessing
+import os
+import sys
 import textwrap
 import inspect
+import weakref
 from typing import Tuple, List, Dict
 
 import math
@@ -48,6 +53,12 @@ class TensorHandle:
         self.attr[key] = value
 
 
+def _expand_scalar(data, ndim):
+    # Scalars are stored as (1, ), or (num_programs, 1) when programs run in
+    # batches; reshape them to broadcast against blocks of `ndim` dimensions.
+    return data.reshape(data.shape[:-1] + (1, ) * ndim)
+
+
 class BlockPointerHandle:
 
     def __init__(self, base, shape, strides, offsets, block_shape, order):
@@ -61,15 +72,16 @@ class BlockPointerHandle:
     def materialize_pointers(self, boundary_check):
         dtype_tt = self.base.get_element_ty()
         n_bytes = dtype_tt.primitive_bitwidth // 8
-        ptrs = np.broadcast_to(self.base.data, self.block_shape)
+        ndim = len(self.block_shape)
+        ptrs = _expand_scalar(self.base.data, ndim)
         masks = np.ones(self.block_shape, dtype=bool)
-        for dim in range(len(self.block_shape)):
-            bcast_dims = [1] * len(self.block_shape)
+        for dim in range(ndim):
+            bcast_dims = [1] * ndim
             bcast_dims[dim] = self.block_shape[dim]
-            off = (self.offsets[dim].data + np.arange(self.block_shape[dim])).reshape(bcast_dims)
-            ptrs = ptrs + (n_bytes * off * self.strides[dim].data).astype(np.uint64)
+            off = _expand_scalar(self.offsets[dim].data, ndim) + np.arange(self.block_shape[dim]).reshape(bcast_dims)
+            ptrs = ptrs + (n_bytes * off * _expand_scalar(self.strides[dim].data, ndim)).astype(np.uint64)
             if dim in boundary_check:
-                masks = masks & (off < self.shape[dim].data) & (off >= 0)
+                masks = masks & (off < _expand_scalar(self.shape[dim].data, ndim)) & (off >= 0)
         ptrs = TensorHandle(ptrs, self.base.dtype.scalar)
         return ptrs, masks
 
@@ -97,16 +109,17 @@ class TensorDescHandle:
         assert len(offsets) == self.ndim
         scalar_ty = self.base.dtype.element_ty
         itemsize = scalar_ty.primitive_bitwidth // 8
-        assert (offsets[-1].data * itemsize) % 16 == 0, "block offset start must be 16-byte aligned"
+        assert np.all((offsets[-1].data * itemsize) % 16 == 0), "block offset start must be 16-byte aligned"
 
-        ptrs = np.broadcast_to(self.base.data, self.block_shape)
+        ndim = len(self.block_shape)
+        ptrs = _expand_scalar(self.base.data, ndim)
         masks = np.ones(self.block_shape, dtype=bool)
-        for dim in range(len(self.block_shape)):
-            bcast_dims = [1] * len(self.block_shape)
+        for dim in range(ndim):
+            bcast_dims = [1] * ndim
             bcast_dims[dim] = self.block_shape[dim]
-            off = (offsets[dim].data + np.arange(self.block_shape[dim])).reshape(bcast_dims)
-            ptrs = ptrs + (itemsize * off * self.strides[dim].data).astype(np.uint64)
-            masks = masks & (0 <= off) & (off < self.shape[dim].data)
+            off = _expand_scalar(offsets[dim].data, ndim) + np.arange(self.block_shape[dim]).reshape(bcast_dims)
+            ptrs = ptrs + (itemsize * off * _expand_scalar(self.strides[dim].data, ndim)).astype(np.uint64)
+            masks = masks & (0 <= off) & (off < _expand_scalar(self.shape[dim].data, ndim))
         assert ptrs.dtype == np.uint64
         ptrs = TensorHandle(ptrs, self.base.dtype.scalar)
         return ptrs, masks
@@ -250,6 +263,30 @@ np_erf_fp64 = np.vectorize(_erf, otypes=[np.float64])
 np_umulhi_u64 = np.vectorize(_umulhi_64, otypes=[np.uint64])
 
 
+def _histogram(data, bins, mask):
+    # force all masked elements to zero
+    data = np.where(mask, data, np.zeros_like(data))
+    histogram = np.histogram(data, bins=bins, range=(0, bins))[0]
+    # remove overcounted elements
+    histogram[0] -= np.logical_not(mask).sum()
+    return histogram
+
+
+class _GridFallback(Exception):
+    """
+    Raised when the programs of a batch can't run at once, e.g. on atomics or
+    on control flow that differs between programs (see `GridExecutor`).
+    """
+
+
+def _uniform_value(data):
+    # Returns the value of a scalar that must be the same in every program.
+    values = data.reshape(-1)
+    if (values != values[0]).any():
+        raise _GridFallback("control flow differs between programs")
+    return values[0]
+
+
 class ExtraFunctions:
 
     @staticmethod
@@ -284,6 +321,17 @@ class InterpreterBuilder:
         self.codegen_fns = {}
         self.codegen_fns["convert_custom_types"] = ExtraFunctions._convert_custom_types
         self.codegen_fns["min_dot_size"] = lambda lhsType, rhsType: (1, 1, 1)
+        # (x, y, z) indices of the programs that run at once, along a leading
+        # axis of every tensor, or None when running one program at a time.
+        self.grid_programs = None
+        # (ptrs, values, mask) overwritten by the stores of the current batch
+        self.undo_log = []
+        # Lock serializing the atomics of the processes running a grid together, if any.
+        self.atomic_lock = None
+        # (start, end) address ranges of the host copies of the arguments, and
+        # the ones written to so far, see `track_stores`.
+        self.tracked_ranges = []
+        self.stored_ranges = set()
 
     def set_grid_idx(self, x, y, z):
         if not x < self.grid_dim[0]:
@@ -297,6 +345,40 @@ class InterpreterBuilder:
     def set_grid_dim(self, nx, ny, nz):
         self.grid_dim = (nx, ny, nz)
 
+    def set_grid_programs(self, programs):
+        self.grid_programs = programs
+        self.undo_log = []
+
+    def track_stores(self, ranges):
+        self.tracked_ranges = ranges
+        self.stored_ranges = set()
+
+    def _record_stores(self, ptrs, mask=None):
+        # Records the tracked ranges overlapping the addresses written to.
+        if len(self.stored_ranges) == len(self.tracked_ranges):
+            return
+        if mask is not None:
+            ptrs, mask = np.broadcast_arrays(ptrs, mask)
+            ptrs = ptrs[mask.astype(bool)]
+        if ptrs.size == 0:
+            return
+        low, high = int(ptrs.min()), int(ptrs.max())
+        for start, end in self.tracked_ranges:
+            if start <= high and low < end:
+                self.stored_ranges.add((start, end))
+
+    def undo_stores(self):
+        for ptrs, values, mask in reversed(self.undo_log):
+            _interpreter.store(ptrs, values, mask)
+        self.undo_log = []
+
+    def _atomic_guard(self):
+        return contextlib.nullcontext() if self.atomic_lock is None else self.atomic_lock
+
+    def _uniform(self, data):
+        # Values that are the same in every program of a batch have a leading axis of size 1.
+        return data if self.grid_programs is None else data[np.newaxis]
+
     # constants
 
     def get_half_ty(self):
@@ -360,52 +442,54 @@ class InterpreterBuilder:
         return tl.block_type(dtype, shape)
 
     def get_int1(self, value):
-        return TensorHandle(np.array([value], dtype=np.bool_), tl.int1)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.bool_)), tl.int1)
 
     def get_uint8(self, value):
-        return TensorHandle(np.array([value], dtype=np.uint8), tl.uint8)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.uint8)), tl.uint8)
 
     def get_int8(self, value):
-        return TensorHandle(np.array([value], dtype=np.int8), tl.int8)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.int8)), tl.int8)
 
     def get_uint16(self, value):
-        return TensorHandle(np.array([value], dtype=np.uint16), tl.uint16)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.uint16)), tl.uint16)
 
     def get_int16(self, value):
-        return TensorHandle(np.array([value], dtype=np.int16), tl.int16)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.int16)), tl.int16)
 
     def get_uint32(self, value):
-        return TensorHandle(np.array([value], dtype=np.uint32), tl.uint32)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.uint32)), tl.uint32)
 
     def get_int32(self, value):
-        return TensorHandle(np.array([value], dtype=np.int32), tl.int32)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.int32)), tl.int32)
 
     def get_uint64(self, value):
-        return TensorHandle(np.array([value], dtype=np.uint64), tl.uint64)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.uint64)), tl.uint64)
 
     def get_int64(self, value):
-        return TensorHandle(np.array([value], dtype=np.int64), tl.int64)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.int64)), tl.int64)
 
     def get_fp16(self, value):
-        return TensorHandle(np.array([value], dtype=np.float16), tl.float16)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.float16)), tl.float16)
 
     def get_fp32(self, value):
-        return TensorHandle(np.array([value], dtype=np.float32), tl.float32)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.float32)), tl.float32)
 
     def get_fp64(self, value):
-        return TensorHandle(np.array([value], dtype=np.float64), tl.float64)
+        return TensorHandle(self._uniform(np.array([value], dtype=np.float64)), tl.float64)
 
     def get_null_value(self, type):
-        return TensorHandle(np.array([0], dtype=_get_np_dtype(type)), type)
+        return TensorHandle(self._uniform(np.array([0], dtype=_get_np_dtype(type))), type)
 
     # programming model
     def create_get_program_id(self, axis):
+        if self.grid_programs is not None:
+            return TensorHandle(self.grid_programs[axis].astype(np.int32).reshape(-1, 1), tl.int32)
         if self.grid_idx is None:
             raise ValueError("grid_idx is None")
         return TensorHandle(np.array([self.grid_idx[axis]], dtype=np.int32), tl.int32)
 
     def create_get_num_programs(self, axis):
-        return TensorHandle(np.array([self.grid_dim[axis]], dtype=np.int32), tl.int32)
+        return TensorHandle(self._uniform(np.array([self.grid_dim[axis]], dtype=np.int32)), tl.int32)
 
     # memory ops
     def create_load(self, ptr, _0, _1, is_volatile):
@@ -422,10 +506,21 @@ class InterpreterBuilder:
         dtype_np = _get_np_dtype(dtype_tt)
         if other is None:
             other = TensorHandle(np.zeros_like(ptrs.data, dtype=dtype_np), dtype_tt)
+        if self.grid_programs is not None:
+            ptrs_data, mask_data, other_data = np.broadcast_arrays(ptrs.data, mask.data, other.data)
+            return TensorHandle(_interpreter.load(ptrs_data, mask_data, other_data, dtype_np), dtype_tt)
         ret = _interpreter.load(ptrs.data, mask.data, other.data, dtype_np)
         return TensorHandle(ret, dtype_tt)
 
     def create_masked_store(self, ptrs, value, mask, cache_modifier, eviction_policy):
+        self._record_stores(ptrs.data, mask.data)
+        if self.grid_programs is not None:
+            # Stores of programs of the batch run in program order, so the last
+            # program writing to an address wins, as when running them one at a time.
+            ptrs_data, value_data, mask_data = np.broadcast_arrays(ptrs.data, value.data, mask.data)
+            old = _interpreter.load(ptrs_data, mask_data, np.zeros_like(value_data), value_data.dtype)
+            self.undo_log.append((ptrs_data, old, mask_data))
+            return _interpreter.store(ptrs_data, value_data, mask_data)
         return _interpreter.store(ptrs.data, value.data, mask.data)
 
     # casting ops
@@ -581,9 +676,14 @@ class InterpreterBuilder:
         return TensorHandle(1 / np.sqrt(arg.data), arg.dtype.scalar)
 
     # tensor operators
-    create_reshape = lambda self, arg, shape, allow_reorder: TensorHandle(arg.data.reshape(shape), arg.dtype.scalar)
+    def create_reshape(self, arg, shape, allow_reorder):
+        if self.grid_programs is not None:
+            shape = arg.data.shape[:1] + tuple(shape)
+        return TensorHandle(arg.data.reshape(shape), arg.dtype.scalar)
 
     def create_trans(self, arg, perm):
+        if self.grid_programs is not None:
+            perm = (0, ) + tuple(axis + 1 for axis in perm)
         return TensorHandle(np.transpose(arg.data, perm), arg.dtype.scalar)
 
     def create_dot(self, a, b, d, input_precision, max_num_imprecise_acc):
@@ -596,19 +696,19 @@ class InterpreterBuilder:
         return TensorHandle(np.matmul(a_data, b_data, dtype=d.data.dtype) + d.data, d.dtype.scalar)
 
     def create_make_range(self, ret_ty, start, stop):
-        return TensorHandle(np.arange(start, stop, dtype=np.int32), tl.int32)
+        return TensorHandle(self._uniform(np.arange(start, stop, dtype=np.int32)), tl.int32)
 
     def create_histogram(self, data, bins, mask):
         if mask is None:
             mask = TensorHandle(np.ones_like(data.data, dtype=bool), tl.int1)
-        # force all masked elements to zero
-        data = np.where(mask.data, data.data, np.zeros_like(data.data))
-        histogram = np.histogram(data, bins=bins, range=(0, bins))[0]
-        # remove overcounted elements
-        histogram[0] -= np.logical_not(mask.data).sum()
-        return TensorHandle(histogram, tl.int32)
+        if self.grid_programs is not None:
+            data, mask = np.broadcast_arrays(data.data, mask.data)
+            return TensorHandle(np.stack([_histogram(d, bins, m) for d, m in zip(data, mask)]), tl.int32)
+        return TensorHandle(_histogram(data.data, bins, mask.data), tl.int32)
 
     def create_gather(self, src, indices, axis):
+        if self.grid_programs is not None:
+            axis += 1
         return TensorHandle(np.take_along_axis(src.data, indices.data, axis=axis), src.dtype.scalar)
 
     # pointer arithmetic
@@ -640,16 +740,27 @@ class InterpreterBuilder:
         return self.create_masked_store(ptrs, value, masks, cache_modifier, eviction_policy)
 
     def create_expand_dims(self, arg, axis):
+        if self.grid_programs is not None and axis >= 0:
+            axis += 1
         return TensorHandle(np.expand_dims(arg.data, axis), arg.dtype.scalar)
 
     def create_broadcast(self, arg, shape):
+        if self.grid_programs is not None:
+            shape = arg.data.shape[:1] + tuple(shape)
         return TensorHandle(np.broadcast_to(arg.data, shape), arg.dtype.scalar)
 
     def create_cat(self, lhs, rhs):
+        if self.grid_programs is not None:
+            lead = max(lhs.data.shape[0], rhs.data.shape[0])
+            lhs_data = np.broadcast_to(lhs.data, (lead, ) + lhs.data.shape[1:])
+            rhs_data = np.broadcast_to(rhs.data, (lead, ) + rhs.data.shape[1:])
+            return TensorHandle(np.concatenate([lhs_data, rhs_data], axis=1), lhs.dtype.scalar)
         return TensorHandle(np.concatenate([lhs.data, rhs.data]), lhs.dtype.scalar)
 
     def create_join(self, lhs, rhs):
         # Triton only supports joining two original tensors into a new one along the last axis
+        if self.grid_programs is not None:
+            return TensorHandle(np.stack(np.broadcast_arrays(lhs.data, rhs.data), axis=-1), lhs.dtype.scalar)
         return TensorHandle(np.stack([lhs.data, rhs.data], axis=-1), lhs.dtype.scalar)
 
     def create_split(self, val):
@@ -658,25 +769,38 @@ class InterpreterBuilder:
 
     def create_splat(self, ret_ty, arg):
         shape = ret_ty.shape
+        if self.grid_programs is not None:
+            # The first element of each program
+            data = arg.data.reshape(arg.data.shape[0], -1)[:, 0]
+            data = data.reshape(data.shape + (1, ) * len(shape))
+            return TensorHandle(np.broadcast_to(data, data.shape[:1] + tuple(shape)).copy(), arg.dtype.scalar)
         if isinstance(arg.dtype, tl.block_type):
             return TensorHandle(np.full(shape, arg.data[0], dtype=_get_np_dtype(arg.dtype)), arg.dtype.scalar)
         else:  # scalar
             return TensorHandle(np.full(shape, arg.data, dtype=_get_np_dtype(arg.dtype)), arg.dtype.scalar)
 
     def create_atomic_cas(self, ptr, cmp, val, sem, scope):
+        if self.grid_programs is not None:
+            raise _GridFallback("atomics")
         if sem not in self.ir_sem_to_interpreter_sem:
             raise ValueError(f"unsupported semantic {sem}")
         sem = self.ir_sem_to_interpreter_sem[sem]
-        return TensorHandle(_interpreter.atomic_cas(ptr.data, cmp.data, val.data, sem), cmp.dtype.scalar)
+        self._record_stores(ptr.data)
+        with self._atomic_guard():
+            return TensorHandle(_interpreter.atomic_cas(ptr.data, cmp.data, val.data, sem), cmp.dtype.scalar)
 
     def create_atomic_rmw(self, rmwOp, ptr, val, mask, sem, scope):
+        if self.grid_programs is not None:
+            raise _GridFallback("atomics")
         if rmwOp not in self.ir_rmw_op_to_interpreter_rmw_op:
             raise ValueError(f"unsupported rmwOp {rmwOp}")
         if sem not in self.ir_sem_to_interpreter_sem:
             raise ValueError(f"unsupported semantic {sem}")
         rmwOp = self.ir_rmw_op_to_interpreter_rmw_op[rmwOp]
         sem = self.ir_sem_to_interpreter_sem[sem]
-        return TensorHandle(_interpreter.atomic_rmw(rmwOp, ptr.data, val.data, mask.data, sem), val.dtype.scalar)
+        self._record_stores(ptr.data, mask.data)
+        with self._atomic_guard():
+            return TensorHandle(_interpreter.atomic_rmw(rmwOp, ptr.data, val.data, mask.data, sem), val.dtype.scalar)
 
     def create_extern_elementwise(self, libName, libPath, symbol, argList, retType, isPure):
         raise NotImplementedError("extern_elementwise not supported in interpreter mode")
@@ -689,6 +813,8 @@ class InterpreterBuilder:
         # by `values` themselves in python interpreter, thus not really needed here;
         # it is only used for triton PrintOpToLLVM to correctly construct the format specifier.
         # Interpreter's device_print function has a different format than Triton's device_print
+        if self.grid_programs is not None:
+            raise _GridFallback("device_print")
         msg = f"({self.grid_idx[0]}, {self.grid_idx[1]}, {self.grid_idx[2]})"
         if prefix:
             msg += f" {prefix}"
@@ -719,11 +845,11 @@ class InterpreterBuilder:
         if len(ptr.offsets) != len(offsets):
             raise ValueError("len(ptr.offsets) != len(offsets)")
         # Create new offsets to avoid modifying the original
-        new_offsets = [offset.clone() for offset in ptr.offsets]
-        ret = BlockPointerHandle(ptr.base, ptr.shape, ptr.strides, new_offsets, ptr.block_shape, ptr.order)
-        for i in range(len(offsets)):
-            ret.offsets[i].data += offsets[i].data
-        return ret
+        new_offsets = [
+            TensorHandle((offset.data + delta.data).astype(offset.data.dtype), offset.dtype)
+            for offset, delta in zip(ptr.offsets, offsets)
+        ]
+        return BlockPointerHandle(ptr.base, ptr.shape, ptr.strides, new_offsets, ptr.block_shape, ptr.order)
 
     def create_make_tensor_descriptor(
         self,
@@ -749,6 +875,8 @@ class InterpreterBuilder:
         return self.create_masked_store(ptrs, value, mask, None, None)
 
     def create_descriptor_gather(self, desc: TensorDescHandle, x_offsets: TensorHandle, y_offset: TensorHandle, type):
+        if self.grid_programs is not None:
+            raise _GridFallback("descriptor gather")
         dtype = desc.base.dtype.element_ty
         np_dtype = _get_np_dtype(dtype)
         result = np.zeros([x_offsets.data.shape[0], desc.block_shape[-1]], dtype=np_dtype)
@@ -761,6 +889,8 @@ class InterpreterBuilder:
 
     def create_descriptor_scatter(self, desc: TensorDescHandle, value: TensorHandle, x_offsets: TensorHandle,
                                   y_offset: TensorHandle):
+        if self.grid_programs is not None:
+            raise _GridFallback("descriptor scatter")
         for i, x_offset in enumerate(x_offsets.data):
             slice = TensorHandle(value.data[i], value.dtype)
             indices = [TensorHandle(x_offset, tl.int32), y_offset]
@@ -769,9 +899,9 @@ class InterpreterBuilder:
     def get_all_ones_value(self, type):
         np_type = _get_np_dtype(type)
         if "int" in np_type.name:
-            return TensorHandle(np.full(1, -1, dtype=np_type), type.scalar)
+            return TensorHandle(self._uniform(np.full(1, -1, dtype=np_type)), type.scalar)
         elif np_type == np.bool_:
-            return TensorHandle(np.full(1, True, dtype=np_type), type.scalar)
+            return TensorHandle(self._uniform(np.full(1, True, dtype=np_type)), type.scalar)
         else:
             raise TypeError(f"unsupported type {type}")
 
@@ -797,17 +927,29 @@ def _patch_lang_tensor(tensor):
         data = self.handle.data
         # in triton, only scalars can be converted to booleans
         # here we need this hack because all scalars are tensors
+        if interpreter_builder.grid_programs is not None:
+            data = data.reshape(data.shape[0], -1)
+            return bool(_uniform_value(data)) if data.shape[1] == 1 else True
         return bool(data) if data.size == 1 else True
 
+    def _get_index(self):
+        if interpreter_builder.grid_programs is not None:
+            return int(_uniform_value(self.handle.data))
+        return int(self.handle.data)
+
     def _get_transpose(self):
-        handle = TensorHandle(np.transpose(self.handle.data), self.handle.dtype)
+        data = self.handle.data
+        # Keep the leading program axis of batched programs in place
+        lead = data.ndim - len(self.type.shape)
+        axes = tuple(range(lead)) + tuple(reversed(range(lead, data.ndim)))
+        handle = TensorHandle(np.transpose(data, axes), self.handle.dtype)
         assert self.type.is_block()
         block_shape = list(self.type.shape)
         block_shape[-1], block_shape[-2] = block_shape[-2], block_shape[-1]
         res_ty = tl.core.block_type(self.dtype, block_shape)
         return tl.core.tensor(handle, res_ty)
 
-    tensor.__index__ = lambda self: int(self.handle.data)
+    tensor.__index__ = lambda self: _get_index(self)
     tensor.__bool__ = lambda self: _get_bool(self)
     tensor.__repr__ = lambda self: repr(self.handle.data)
     tensor.__str__ = lambda self: str(self.handle.data)
@@ -819,6 +961,8 @@ class ReduceScanOpInterface:
     def __init__(self, axis, combine_fn):
         self.axis = axis
         self.combine_fn = combine_fn
+        # 1 when programs run in batches, with a leading program axis
+        self.program_axes = 0 if interpreter_builder.grid_programs is None else 1
 
     def check_axis(self, shape, axis):
         if axis is not None and axis >= len(shape):
@@ -830,13 +974,67 @@ class ReduceScanOpInterface:
                 raise ValueError(f"input must be a tensor, got {type(arg)}")
             self.check_axis(arg.shape, self.axis)
 
+    def np_axis(self):
+        # The axis of the data of batched programs, after the program axis
+        return self.axis if self.axis < 0 else self.axis + self.program_axes
+
+    def combine_last_axis(self, input, data_fn):
+        """
+        Applies `data_fn` to the data of the tensors in `input`, with the axis
+        to reduce or scan moved last (all axes are flattened into one when
+        `self.axis` is None), and returns the data it returns in the original
+        layout, without the last axis if it dropped it.
+        """
+        data = [arg.handle.data for arg in input]
+        if self.program_axes:
+            # Every program may run a different branch of the combine function.
+            num_programs = len(interpreter_builder.grid_programs[0])
+            data = [np.broadcast_to(d, (num_programs, ) + d.shape[1:]) for d in data]
+        if self.axis is None:
+            lead = data[0].shape[:self.program_axes]
+            return data_fn([d.reshape(lead + (-1, )) for d in data])
+        ret = data_fn([np.moveaxis(d, self.np_axis(), -1) for d in data])
+        if ret[0].ndim == data[0].ndim:
+            return [np.moveaxis(r, -1, self.np_axis()) for r in ret]
+        return ret
+
+    def combine(self, lhs, rhs, dtypes):
+        """
+        Applies the combine function to the arrays in `lhs` and `rhs`, the
+        operands of the same shape, all at once: every element runs as a
+        program of a batch, on scalar tensors. Raises `_GridFallback` if
+        control flow in the combine function differs between elements.
+        """
+        shape = lhs[0].shape
+        size = lhs[0].size
+        programs = interpreter_builder.grid_programs
+        if programs is None:
+            element_programs = tuple(np.full(size, idx) for idx in interpreter_builder.grid_idx)
+        else:
+            element_programs = tuple(np.repeat(p, size // len(p)) for p in programs)
+
+        def to_tensor(data, dtype):
+            return tl.core.tensor(TensorHandle(np.reshape(data, (-1, 1)), dtype.scalar), dtype)
+
+        interpreter_builder.grid_programs = element_programs
+        try:
+            ret = self.combine_fn.fn(*map(to_tensor, lhs, dtypes), *map(to_tensor, rhs, dtypes))
+        finally:
+            interpreter_builder.grid_programs = programs
+        ret = ret if isinstance(ret, tuple) else (ret, )
+        return [
+            np.broadcast_to(r.handle.data if isinstance(r, tl.core.tensor) else r,
+                            (size, 1)).reshape(shape).astype(l.dtype) for r, l in zip(ret, lhs)
+        ]
+
     def to_tensor(self, ret, dtype):
         np_dtype = _get_np_dtype(dtype)
-        if hasattr(ret, "shape") and ret.shape:
+        shape = np.shape(ret)[self.program_axes:]
+        if shape:
             ret = ret.astype(np_dtype)
-            ret_type = tl.block_type(dtype, list(ret.shape))
+            ret_type = tl.block_type(dtype, list(shape))
         else:
-            ret = np.array([ret], dtype=np_dtype)
+            ret = np.array(ret, dtype=np_dtype).reshape(np.shape(ret) + (1, ))
             ret_type = dtype
         return tl.core.tensor(TensorHandle(ret, dtype.scalar), ret_type)
 
@@ -855,16 +1053,39 @@ class ReduceOps(ReduceScanOpInterface):
         self.keep_dims = keep_dims
 
     def unravel(self, input, axis):
-        ret = []
-        for data in input:
-            if axis is not None:
-                ret.append(data)
-            else:
-                axis = 0
-                ret.append(self.to_tensor(data.handle.data.flatten(), data.dtype))
-        return tuple(ret), axis
+        if axis is not None:
+            return input, axis
+        return tuple(self.to_tensor(data.handle.data.flatten(), data.dtype) for data in input), 0
+
+    def tree_reduce(self, data, dtypes):
+        # Combines adjacent pairs of elements of the last axis, halving it at
+        # every step, and keeps an odd last element for the next step.
+        while data[0].shape[-1] > 1:
+            even = data[0].shape[-1] // 2 * 2
+            combined = self.combine([d[..., 0:even:2] for d in data], [d[..., 1:even:2] for d in data], dtypes)
+            data = [np.concatenate([c, d[..., even:]], axis=-1) for c, d in zip(combined, data)]
+        return [d[..., 0] for d in data]
 
     def generic_reduce(self, input):
+        dtypes = [arg.dtype for arg in input]
+        try:
+            output_data = self.combine_last_axis(input, partial(self.tree_reduce, dtypes=dtypes))
+        except _GridFallback:
+            if self.program_axes:
+                raise
+            # The combine function branches on its operands: one element at a time.
+            return self.generic_reduce_elements(input)
+        ret = []
+        for data, dtype in zip(output_data, dtypes):
+            if self.keep_dims:
+                if self.axis is not None:
+                    data = np.expand_dims(data, self.np_axis())
+                else:
+                    data = data.reshape(data.shape + (1, ) * (input[0].handle.data.ndim - self.program_axes))
+            ret.append(self.to_tensor(data, dtype))
+        return ret
+
+    def generic_reduce_elements(self, input):
         original_axis = self.axis
         input, axis = self.unravel(input, self.axis)
         input_data = []
@@ -913,9 +1134,9 @@ class ReduceOps(ReduceScanOpInterface):
         val = None
         idx = None
         if val_reduce_op:
-            val = self.to_tensor(val_reduce_op(input.handle.data, axis=self.axis, keepdims=self.keep_dims), input.dtype)
+            val = self.to_tensor(self.reduce_data(input.handle.data, val_reduce_op), input.dtype)
         if idx_reduce_op:
-            idx = self.to_tensor(idx_reduce_op(input.handle.data, axis=self.axis, keepdims=self.keep_dims), tl.int32)
+            idx = self.to_tensor(self.reduce_data(input.handle.data, idx_reduce_op), tl.int32)
         if val is not None and idx is not None:
             return val, idx
         elif val is not None:
@@ -926,7 +1147,15 @@ class ReduceOps(ReduceScanOpInterface):
             raise ValueError("val_reduce_op and idx_reduce_op are both None")
 
     def sum(self, input):
-        return self.to_tensor(np.sum(input.handle.data, axis=self.axis, keepdims=self.keep_dims), input.dtype)
+        return self.to_tensor(self.reduce_data(input.handle.data, np.sum), input.dtype)
+
+    def reduce_data(self, data, op):
+        # Applies the NumPy reduction `op` to the data of each program
+        if self.axis is not None:
+            return op(data, axis=self.np_axis(), keepdims=self.keep_dims)
+        lead = data.shape[:self.program_axes]
+        ret = op(data.reshape(lead + (-1, )), axis=self.program_axes)
+        return ret.reshape(lead + (1, ) * (data.ndim - self.program_axes)) if self.keep_dims else ret
 
     def apply_impl(self, input):
         if self.combine_fn == tl.standard._argmin_combine_tie_break_left:
@@ -951,12 +1180,34 @@ class ScanOps(ReduceScanOpInterface):
         self.reverse = reverse
 
     def cumsum(self, input):
-        return [self.to_tensor(np.cumsum(input.handle.data, axis=self.axis), dtype=input.dtype)]
+        return [self.to_tensor(np.cumsum(input.handle.data, axis=self.np_axis()), dtype=input.dtype)]
 
     def cumprod(self, input):
-        return [self.to_tensor(np.cumprod(input.handle.data, axis=self.axis), dtype=input.dtype)]
+        return [self.to_tensor(np.cumprod(input.handle.data, axis=self.np_axis()), dtype=input.dtype)]
+
+    def hillis_steele_scan(self, data, dtypes):
+        # Combines every element of the last axis with the one `offset` before
+        # it, doubling `offset` at every step.
+        size = data[0].shape[-1]
+        offset = 1
+        while offset < size:
+            combined = self.combine([d[..., :size - offset] for d in data], [d[..., offset:] for d in data], dtypes)
+            data = [np.concatenate([d[..., :offset], c], axis=-1) for c, d in zip(combined, data)]
+            offset *= 2
+        return data
 
     def generic_scan(self, input):
+        dtypes = [arg.dtype for arg in input]
+        try:
+            output_data = self.combine_last_axis(input, partial(self.hillis_steele_scan, dtypes=dtypes))
+        except _GridFallback:
+            if self.program_axes:
+                raise
+            # The combine function branches on its operands: one element at a time.
+            return self.generic_scan_elements(input)
+        return [self.to_tensor(data, dtype) for data, dtype in zip(output_data, dtypes)]
+
+    def generic_scan_elements(self, input):
         input_data = []
         output_data = []
         shape = input[0].handle.data.shape
@@ -990,7 +1241,7 @@ class ScanOps(ReduceScanOpInterface):
         new_input = []
         if self.reverse:
             for arg in input:
-                new_input.append(self.to_tensor(np.flip(arg.handle.data, axis=self.axis), arg.dtype))
+                new_input.append(self.to_tensor(np.flip(arg.handle.data, axis=self.np_axis()), arg.dtype))
         else:
             new_input = input
         if self.combine_fn == tl.standard._sum_combine:
@@ -1002,7 +1253,7 @@ class ScanOps(ReduceScanOpInterface):
             ret = self.generic_scan(new_input)
         if self.reverse:
             for arg in ret:
-                arg.handle.data = np.flip(arg.handle.data, axis=self.axis)
+                arg.handle.data = np.flip(arg.handle.data, axis=self.np_axis())
         return ret
 
 
@@ -1100,7 +1351,13 @@ def _patch_lang_core(lang):
     _patch_reduce_scan()
 
 
+# Functions the language modules visible from have been patched for already
+_patched_fns = weakref.WeakSet()
+
+
 def _patch_lang(fn):
+    if fn in _patched_fns:
+        return
     langs = [value for _, value in fn.__globals__.items() if inspect.ismodule(value) and value in [tl, tl.core]]
     assert len(langs) >= 1, "triton.language must be visible from within jit'd function"
     for lang in langs:
@@ -1111,6 +1368,7 @@ def _patch_lang(fn):
         _patch_lang_tensor(lang.tensor)
         _patch_lang_core(lang)
     _patch_builtin(tl.core.tensor_descriptor_base, interpreter_builder)
+    _patched_fns.add(fn)
 
 
 def _tuple_create(arg, contents):
@@ -1137,11 +1395,11 @@ def _implicit_cvt(arg):
             dtype = np.uint64
         else:
             raise ValueError(f"Unsupported integer value {arg}")
-        handle = TensorHandle(np.array([arg], dtype=dtype), ty)
+        handle = TensorHandle(interpreter_builder._uniform(np.array([arg], dtype=dtype)), ty)
         return tl.tensor(handle, ty)
     if hasattr(arg, "data_ptr"):
         ty = tl.str_to_ty(triton.runtime.jit.mangle_type(arg))
-        handle = TensorHandle(np.array([arg.data_ptr()], dtype=np.uint64), ty)
+        handle = TensorHandle(interpreter_builder._uniform(np.array([arg.data_ptr()], dtype=np.uint64)), ty)
         return tl.tensor(handle, ty)
     elif isinstance(arg, tuple):
         return _tuple_create(arg, map(_implicit_cvt, arg))
@@ -1175,18 +1433,53 @@ def _rewrap_tensor(t, original_tensor):
     return t
 
 
+def _shared_host_storage(storage):
+    # A host copy of the storage in shared memory, written to by forked processes.
+    shared = type(storage)(storage.nbytes())
+    if storage.nbytes() > 0:
+        shared.share_memory_()
+    return shared.copy_(storage)
+
+
+def _storage_range(storage):
+    return (storage.data_ptr(), storage.data_ptr() + storage.nbytes())
+
+
 class GridExecutor:
+    """
+    Runs the programs of a grid, one at a time or, with
+    `knobs.runtime.interpret_grid_batch`, up to that many at once: every tensor
+    then gets a leading program axis and each operation runs once for the
+    whole batch. A batch that can't run at once, e.g. because of atomics or
+    control flow that differs between programs, has its stores undone and runs
+    again one program at a time, along with the rest of the grid. Programs of
+    a batch must not depend on each other's stores.
+
+    With `knobs.runtime.interpret_workers`, the grid is split into contiguous
+    ranges of programs that run in as many forked processes. The host copies of
+    the arguments are then allocated in shared memory, and atomics are
+    serialized across the processes.
+
+    Tensors on the CPU are used as they are. The others are copied to the host
+    before running the grid, and back only if the kernel stored to them.
+    """
+
+    # rewritten function -> (its signature, the names of its constexpr arguments)
+    fn_info = weakref.WeakKeyDictionary()
 
     def __init__(self, fn, arg_names, grid):
-        from .jit import _normalize_ty  # TODO: modularize
-
         self.fn = fn
         self.arg_names = arg_names
         self.grid = grid
-        __annotations__ = {name: _normalize_ty(ty) for name, ty in fn.__annotations__.items()}
-        self.constexprs = [name for name in arg_names if __annotations__.get(name) == "constexpr"]
+        if fn not in self.fn_info:
+            from .jit import _normalize_ty  # TODO: modularize
+
+            __annotations__ = {name: _normalize_ty(ty) for name, ty in fn.__annotations__.items()}
+            constexprs = [name for name in arg_names if __annotations__.get(name) == "constexpr"]
+            self.fn_info[fn] = (inspect.signature(fn), constexprs)
+        self.signature, self.constexprs = self.fn_info[fn]
 
-    def _init_args_hst(self, args_dev, kwargs):
+    def _init_args_hst(self, args_dev, kwargs, shared=False):
         storages = {}
 
         def _to_cpu(arg):
@@ -1205,7 +1498,8 @@ class GridExecutor:
             unwrapped_arg = _unwrap_tensor(arg)
             if unwrapped_arg.untyped_storage().data_ptr() not in storages:
                 storage = unwrapped_arg.untyped_storage()
-                storages[storage.data_ptr()] = storage.cpu()
+                # CPU storages are used as they are, unless they have to be shared
+                storages[storage.data_ptr()] = _shared_host_storage(storage) if shared else storage.cpu()
 
             storage = storages[unwrapped_arg.untyped_storage().data_ptr()]
             cpu_arg = unwrapped_arg.new_empty(0, device='cpu')
@@ -1221,14 +1515,20 @@ class GridExecutor:
             kwargs_hst[key] = _to_cpu(value)
         return args_hst, kwargs_hst
 
-    def _restore_args_dev(self, args_dev, args_hst, kwargs, kwargs_hst):
+    def _copied_storages(self, args_dev, args_hst, kwargs, kwargs_hst):
+        """
+        Returns the (device, host) pairs of the storages of the arguments that
+        were copied to the host.
+        """
         storages = {}
 
         def _from_cpu(arg_dev, arg_hst):
             if hasattr(arg_dev, "data_ptr"):
                 # No need to rewrap because this just modifies internal
                 arg_dev, arg_hst = _unwrap_tensor(arg_dev), _unwrap_tensor(arg_hst)
-                storages[arg_dev.untyped_storage().data_ptr()] = (arg_dev.untyped_storage(), arg_hst.untyped_storage())
+                if arg_dev.untyped_storage().data_ptr() != arg_hst.untyped_storage().data_ptr():
+                    storages[arg_dev.untyped_storage().data_ptr()] = (arg_dev.untyped_storage(),
+                                                                      arg_hst.untyped_storage())
             elif isinstance(arg_dev, tuple):
                 for (arg_dev, arg_hst) in zip(arg_dev, arg_hst):
                     _from_cpu(arg_dev, arg_hst)
@@ -1242,43 +1542,135 @@ class GridExecutor:
         for key, kwarg_dev in kwargs.items():
             kwarg_hst = kwargs_hst[key]
             _from_cpu(kwarg_dev, kwarg_hst)
+        return list(storages.values())
 
-        for (arg_dev, arg_hst) in storages.values():
-            arg_dev.copy_(arg_hst)
+    def _restore_args_dev(self, storages, stored_ranges):
+        # Only the storages the kernel stored to have changed.
+        for (arg_dev, arg_hst) in storages:
+            if _storage_range(arg_hst) in stored_ranges:
+                arg_dev.copy_(arg_hst)
 
     def __call__(self, *args_dev, **kwargs):
         if kwargs.pop("warmup", False):
             return
         # Removes not used reserved keywords from kwargs
         # Triton doesn't support keyword-only, variable positional or variable keyword arguments
-        # It's safe to inspect only positional or keyword arguments (i.e., argspec.args)
-        argspec = inspect.getfullargspec(self.fn)
-        kwargs = {k: v for k, v in kwargs.items() if k in argspec.args}
+        # It's safe to inspect only positional or keyword arguments (i.e., the signature's parameters)
+        kwargs = {k: v for k, v in kwargs.items() if k in self.signature.parameters}
+        num_workers = triton.knobs.runtime.interpret_workers
+        if "fork" not in multiprocessing.get_all_start_methods():
+            num_workers = 0
         # copy arguments to the host
-        args_hst, kwargs_hst = self._init_args_hst(args_dev, kwargs)
+        args_hst, kwargs_hst = self._init_args_hst(args_dev, kwargs, shared=num_workers > 1)
+        storages = self._copied_storages(args_dev, args_hst, kwargs, kwargs_hst)
+        interpreter_builder.track_stores([_storage_range(arg_hst) for _, arg_hst in storages])
         # remaps core language functions to interpreted ones
         _patch_lang(self.fn)
         # we need to copy arguments to the host for the interpreter
         # implicitly convert tensor arguments to their base pointers
-        args = inspect.getcallargs(self.fn, *args_hst, **kwargs_hst)
-        args = {name: arg if name in self.constexprs else _implicit_cvt(arg) for name, arg in args.items()}
+        bound_args = self.signature.bind(*args_hst, **kwargs_hst)
+        bound_args.apply_defaults()
+        call_args = bound_args.arguments
+        args = self._convert_args(call_args)
         # iterate through grid
         grid = self.grid(args) if callable(self.grid) else self.grid
         assert len(grid) <= 3, "grid must have at most 3 dimensions"
         grid = grid + (1, ) * (3 - len(grid))
         interpreter_builder.set_grid_dim(*grid)
+        num_workers = min(num_workers, math.prod(grid))
         try:
-            for x in range(grid[0]):
-                for y in range(grid[1]):
-                    for z in range(grid[2]):
-                        interpreter_builder.set_grid_idx(x, y, z)
-                        self.fn(**args)
+            if num_workers > 1:
+                self._run_workers(call_args, args, grid, num_workers)
+            else:
+                self._run_programs(call_args, args, grid, 0, math.prod(grid))
         except Exception as e:
             if triton.knobs.compilation.front_end_debugging:
                 raise
             raise InterpreterError(repr(e)) from e
         # copy arguments back to propagate side-effects
-        self._restore_args_dev(args_dev, args_hst, kwargs, kwargs_hst)
+        self._restore_args_dev(storages, interpreter_builder.stored_ranges)
+
+    def _convert_args(self, call_args):
+        return {name: arg if name in self.constexprs else _implicit_cvt(arg) for name, arg in call_args.items()}
+
+    def _run_programs(self, call_args, args, grid, start, stop):
+        if triton.knobs.runtime.interpret_grid_batch > 1:
+            start = self._run_batches(call_args, grid, start, stop, triton.knobs.runtime.interpret_grid_batch)
+        for program in range(start, stop):
+            interpreter_builder.set_grid_idx(*map(int, np.unravel_index(program, grid)))
+            self.fn(**args)
+
+    def _run_batches(self, call_args, grid, start, stop, batch_size):
+        """
+        Runs the programs `start` to `stop` of the grid in batches of
+        `batch_size`, in order. Returns the first program that didn't run, the
+        ones from there on have to run one at a time.
+        """
+        for start in range(start, stop, batch_size):
+            interpreter_builder.set_grid_programs(
+                np.unravel_index(np.arange(start, min(start + batch_size, stop)), grid))
+            try:
+                self.fn(**self._convert_args(call_args))
+            except Exception:
+                # Unsupported in batches, or a genuine error that running the
+                # programs one at a time reports with the right program.
+                interpreter_builder.undo_stores()
+                return start
+            finally:
+                interpreter_builder.set_grid_programs(None)
+        return stop
+
+    def _run_workers(self, call_args, args, grid, num_workers):
+        """
+        Runs the programs of the grid in `num_workers` forked processes, and
+        raises the error of the first process that failed, if any.
+        """
+        ctx = multiprocessing.get_context("fork")
+        bounds = np.linspace(0, math.prod(grid), num_workers + 1).astype(int)
+        workers = []
+        interpreter_builder.atomic_lock = ctx.Lock()
+        try:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                conn, child_conn = ctx.Pipe(duplex=False)
+                process = ctx.Process(target=self._run_worker,
+                                      args=(child_conn, call_args, args, grid, int(start), int(stop)), daemon=True)
+                process.start()
+                child_conn.close()
+                workers.append((process, conn))
+            errors = []
+            for process, conn in workers:
+                try:
+                    error, stored_ranges = conn.recv()
+                    errors.append(error)
+                    interpreter_builder.stored_ranges |= stored_ranges
+                except EOFError:
+                    process.join()
+                    errors.append(RuntimeError(f"interpreter worker exited with code {process.exitcode}"))
+                process.join()
+        finally:
+            interpreter_builder.atomic_lock = None
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _run_worker(self, conn, call_args, args, grid, start, stop):
+        # Runs in a forked process: report the outcome and exit without
+        # running the parent's exit handlers.
+        error = None
+        try:
+            try:
+                self._run_programs(call_args, args, grid, start, stop)
+            except Exception as e:
+                error = e
+            try:
+                conn.send((error, interpreter_builder.stored_ranges))
+            except Exception:
+                # The exception can't be pickled.
+                conn.send((RuntimeError(repr(error)), interpreter_builder.stored_ranges))
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(0)
 
 
 class ASTTransformer(ast.NodeTransformer):
@@ -1367,8 +1759,8 @@ class FunctionRewriter:
 
 
 class InterpretedFunction:
-    # Cache all rewritten functions
-    rewritten_fn = {}
+    # Cache all rewritten functions, along with the code they were rewritten from
+    rewritten_fn = weakref.WeakKeyDictionary()
 
     def __init__(self, fn, **kwargs) -> None:
         self.fn = fn
@@ -1384,9 +1776,12 @@ class InterpretedFunction:
         self.arg_names = [v.name for v in signature.parameters.values()]
 
     def rewrite(self):
-        if self.fn not in self.rewritten_fn:
-            self.rewritten_fn[self.fn] = self.rewriter.rewrite_ast()
-        return self.rewritten_fn[self.fn]
+        code, fn = self.rewritten_fn.get(self.fn, (None, None))
+        # Rewrite again if the function's code was replaced since
+        if code is not self.fn.__code__:
+            fn = self.rewriter.rewrite_ast()
+            self.rewritten_fn[self.fn] = (self.fn.__code__, fn)
+        return fn
 
     @property
     def __name__(self):
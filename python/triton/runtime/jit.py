@@ -5,6 +5,7 @@ import inspect
 import itertools
 import re
 import textwrap
+import time
 from collections import defaultdict
 from dataclasses import dataclass
 from functools import cached_property
@@ -14,6 +15,8 @@ from triton.tools.tensor_descriptor import TensorDescriptor
 from types import ModuleType
 from .. import knobs
 from ..runtime.driver import driver
+from . import async_compile
+from . import launch_counters
 from .._utils import find_paths_if, get_iterable_path, type_canonicalisation_dict, canonicalize_dtype
 
 TRITON_MODULE = __name__[:-len(".runtime.jit")]
@@ -449,6 +452,63 @@ def get_full_name(fn):
     return f"{fn.__module__}.{fn.__qualname__}"
 
 
+class LaunchPlan(KernelInterface[T]):
+    """
+    A launch of a kernel with a fixed specialization, returned by
+    :code:`JITFunction.bind`.
+
+    The compiled kernel and its launcher are resolved once, when binding, so
+    launching through the plan skips argument binding, specialization,
+    cache-key construction and the global variable checks done by
+    :code:`JITFunction.run`. Arguments passed to the plan must specialize
+    exactly like the ones it was bound with (same dtypes, alignment and
+    constexpr values), which is not checked. Trailing arguments that are
+    omitted, typically constexprs and defaulted parameters, take the value
+    they had when binding.
+    """
+
+    def __init__(self, fn, kernel, bound_args):
+        self.fn = fn
+        self.kernel = kernel
+        self.arg_names = list(bound_args.keys())
+        self.bound_values = tuple(bound_args.values())
+        self.device = driver.active.get_current_device()
+        self.get_current_stream = driver.active.get_current_stream
+        # `CompiledKernel.__getattribute__` initializes the handles on every
+        # access to `run`, so cache everything the launch needs.
+        self.launcher = kernel.run
+        self.function = kernel.function
+        self.packed_metadata = kernel.packed_metadata
+        # Launchers may expose an entry point taking the packed arguments as a
+        # single tuple, which avoids going through their `__call__`.
+        self.launch = getattr(self.launcher, "launch", None)
+
+    def run(self, *args, grid, warmup=False):
+        if warmup:
+            return self.kernel
+        num_args = len(args)
+        if num_args < len(self.bound_values):
+            args = args + self.bound_values[num_args:]
+        if callable(grid):
+            grid = grid(dict(zip(self.arg_names, args)))
+        grid_size = len(grid)
+        grid_0 = grid[0]
+        grid_1 = grid[1] if grid_size > 1 else 1
+        grid_2 = grid[2] if grid_size > 2 else 1
+        stream = self.get_current_stream(self.device)
+        launch_enter_hook = knobs.runtime.launch_enter_hook
+        launch_metadata = None
+        if launch_enter_hook is not None:
+            launch_metadata = self.kernel.launch_metadata(grid, stream, *args)
+        launch_args = (grid_0, grid_1, grid_2, stream, self.function, self.packed_metadata, launch_metadata,
+                       launch_enter_hook, knobs.runtime.launch_exit_hook, *args)
+        if self.launch is not None:
+            self.launch(launch_args)
+        else:
+            self.launcher(*launch_args)
+        return self.kernel
+
+
 @dataclass
 class JitFunctionInfo:
     module: ModuleType
@@ -528,7 +588,67 @@ class JITFunction(KernelInterface[T]):
         binder = create_function_from_signature(self.signature, self.params, backend)
         return {}, target, backend, binder
 
+    def _get_compile_args(self, backend, bound_args, specialization, kwargs):
+        """
+        Derives the signature, constexprs, attributes and backend options
+        needed to compile the specialization produced by the binder.
+        """
+        # options
+        options = backend.parse_options(kwargs)
+        # signature
+        sigkeys = [x.name for x in self.params]
+        sigvals = [x[0] for x in specialization]
+        signature = {k: v for (k, v) in zip(sigkeys, sigvals)}
+        # check arguments
+        assert "device_type" not in kwargs, "device_type option is deprecated; current target will be used"
+        assert "device" not in kwargs, "device option is deprecated; current device will be used"
+        assert "stream" not in kwargs, "stream option is deprecated; current stream will be used"
+        for k in kwargs:
+            if k not in options.__dict__ and k not in sigkeys:
+                raise KeyError("Keyword argument %s was specified but unrecognised" % k)
+        # constexprs
+        constexprs = find_paths_if(sigvals, lambda _, val: val == "constexpr")
+        constexprs = {path: get_iterable_path(list(bound_args.values()), path) for path in constexprs}
+        # attributes
+        attrvals = [x[1] for x in specialization]
+        attrs = find_paths_if(attrvals, lambda _, x: isinstance(x, str))
+        attrs = {k: backend.parse_attr(get_iterable_path(attrvals, k)) for k in attrs}
+        return signature, constexprs, attrs, options
+
+    def _do_compile(self, device, key, bound_args, specialization, kwargs, warmup, async_mode):
+        kernel_cache, target, backend, _ = self.device_caches[device]
+        signature, constexprs, attrs, options = self._get_compile_args(backend, bound_args, specialization, kwargs)
+        if self._call_hook(knobs.runtime.jit_cache_hook, key, signature, device, constexprs, options, [attrs], warmup):
+            return None
+        src = self.ASTSource(self, signature, constexprs, attrs)
+
+        def finalize_compile(kernel):
+            kernel_cache[key] = kernel
+            self._call_hook(knobs.runtime.jit_post_compile_hook, key, signature, device, constexprs, options, [attrs],
+                            warmup)
+
+        if async_mode is not None:
+            return async_mode.submit((self.cache_key, device, key),
+                                     lambda: self.compile(src, target=target, options=options.__dict__),
+                                     finalize_compile)
+        # compile the kernel
+        kernel = self.compile(src, target=target, options=options.__dict__)
+        finalize_compile(kernel)
+        return kernel
+
+    def _resolve_future_kernel(self, kernel, bound_args):
+        if not kernel.done():
+            async_mode = async_compile.active_mode.get()
+            fallback = async_mode.fallback if async_mode is not None else None
+            fallback_kernel = fallback(self, bound_args) if fallback is not None else None
+            if fallback_kernel is not None:
+                return fallback_kernel
+        return kernel.result()
+
     def run(self, *args, grid, warmup, **kwargs):
+        counters = launch_counters.enabled
+        if counters:
+            start = time.perf_counter_ns()
         kwargs["debug"] = kwargs.get("debug", self.debug) or knobs.runtime.debug
 
         # parse options
@@ -550,35 +670,15 @@ class JITFunction(KernelInterface[T]):
 
         # Kernel is not cached; we have to compile.
         if kernel is None:
-            # options
-            options = backend.parse_options(kwargs)
-            # signature
-            sigkeys = [x.name for x in self.params]
-            sigvals = [x[0] for x in specialization]
-            signature = {k: v for (k, v) in zip(sigkeys, sigvals)}
-            # check arguments
-            assert "device_type" not in kwargs, "device_type option is deprecated; current target will be used"
-            assert "device" not in kwargs, "device option is deprecated; current device will be used"
-            assert "stream" not in kwargs, "stream option is deprecated; current stream will be used"
-            for k in kwargs:
-                if k not in options.__dict__ and k not in sigkeys:
-                    raise KeyError("Keyword argument %s was specified but unrecognised" % k)
-            # constexprs
-            constexprs = find_paths_if(sigvals, lambda _, val: val == "constexpr")
-            constexprs = {path: get_iterable_path(list(bound_args.values()), path) for path in constexprs}
-            # attributes
-            attrvals = [x[1] for x in specialization]
-            attrs = find_paths_if(attrvals, lambda _, x: isinstance(x, str))
-            attrs = {k: backend.parse_attr(get_iterable_path(attrvals, k)) for k in attrs}
-            if self._call_hook(knobs.runtime.jit_cache_hook, key, signature, device, constexprs, options, [attrs],
-                               warmup):
-                return None
-            # compile the kernel
-            src = self.ASTSource(self, signature, constexprs, attrs)
-            kernel = self.compile(src, target=target, options=options.__dict__)
-            kernel_cache[key] = kernel
-            self._call_hook(knobs.runtime.jit_post_compile_hook, key, signature, device, constexprs, options, [attrs],
-                            warmup)
+            # Launches that compile the kernel aren't counted.
+            counters = False
+            async_mode = async_compile.active_mode.get()
+            if async_mode is not None:
+                kernel = async_mode.get((self.cache_key, device, key))
+            if kernel is None:
+                kernel = self._do_compile(device, key, bound_args, specialization, kwargs, warmup, async_mode)
+                if kernel is None:
+                    return None
 
         # Check that used global values have not changed.
         not_present = object()
@@ -588,6 +688,10 @@ class JITFunction(KernelInterface[T]):
                     f"Global variable {name} has changed since we compiled this kernel, from {val} to {newVal}")
 
         if not warmup:
+            if isinstance(kernel, async_compile.FutureKernel):
+                kernel = self._resolve_future_kernel(kernel, bound_args)
+            if counters:
+                bound = time.perf_counter_ns()
             # canonicalize grid
             assert grid is not None
             if callable(grid):
@@ -598,8 +702,17 @@ class JITFunction(KernelInterface[T]):
             grid_2 = grid[2] if grid_size > 2 else 1
             # launch kernel
             launch_metadata = kernel.launch_metadata(grid, stream, *bound_args.values())
+            if counters:
+                launch_start = time.perf_counter_ns()
             kernel.run(grid_0, grid_1, grid_2, stream, kernel.function, kernel.packed_metadata, launch_metadata,
                        knobs.runtime.launch_enter_hook, knobs.runtime.launch_exit_hook, *bound_args.values())
+            if counters:
+                launch_counters.record(
+                    kernel.name, {
+                        "bind": bound - start,
+                        "launch_metadata": launch_start - bound,
+                        "launch": time.perf_counter_ns() - launch_start,
+                    })
         return kernel
 
     def repr(self, _):
@@ -685,6 +798,30 @@ class JITFunction(KernelInterface[T]):
     def warmup(self, *args, grid, **kwargs):
         return self.run(grid=grid, warmup=True, *map(MockTensor.wrap_dtype, args), **kwargs)
 
+    def bind(self, *args, **kwargs):
+        """
+        Compiles the kernel for the specialization of the given arguments and
+        returns a :code:`LaunchPlan` that launches it with minimal host overhead:
+
+        .. code-block:: python
+
+            plan = kernel.bind(x, y, out, n, BLOCK_SIZE=1024)
+            for _ in range(steps):
+                plan[grid](x, y, out, n)
+        """
+        args = tuple(map(MockTensor.wrap_dtype, args))
+        kernel = self.run(*args, grid=None, warmup=True, **kwargs)
+        if kernel is None:
+            raise RuntimeError(f"Compilation of {self._fn_name} was skipped by the JIT cache hook")
+        if isinstance(kernel, async_compile.FutureKernel):
+            kernel = kernel.result()
+        _, _, _, binder = self.device_caches[driver.active.get_current_device()]
+        bound_args, _, _ = binder(*args, **kwargs)
+        return LaunchPlan(self, kernel, bound_args)
+
+    def _warmup_specs(self, args, kwargs):
+        return [(self, args, kwargs)]
+
     def preload(self, specialization_data):
         from ..compiler import compile, ASTSource
         import json
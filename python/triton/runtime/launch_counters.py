@@ -0,0 +1,179 @@
+"""
+Per-phase timings of kernel launches.
+
+When `TRITON_LAUNCH_COUNTERS=1` (`knobs.runtime.launch_counters`) is set,
+`JITFunction.run` and the launchers that support it accumulate the host time
+spent in each phase of a launch, in nanoseconds, per kernel name:
+
+- `bind`: binding and specializing the arguments, and looking up the kernel cache,
+- `launch_metadata`: computing the grid and the metadata passed to the launch hooks,
+- `launch`: the call to the launcher, which includes the phases below.
+
+Launches that compile the kernel are not counted. Launchers may report finer
+grained phases of their own; the generic XPU launcher reports `enter_hook`,
+`args` (converting and validating the kernel arguments), `submit` and
+`exit_hook`.
+
+Counters are read with `get_counters()`, or per region of code with `scope`,
+which also attaches them to the matching proton scope while profiling.
+
+Launches don't read the knob: they check `enabled`, which is refreshed from it
+when the knob is set, when kernels are loaded, and by `reset_counters()` and
+`scope`. Launchers only wrap their launches to time them while it is set.
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .. import knobs
+
+# Whether launches are counted, i.e. `knobs.runtime.launch_counters` as of the last `refresh()`.
+enabled: bool = knobs.runtime.launch_counters
+# Called with the new value of `enabled` whenever it changes.
+_listeners: List[Callable[[bool], None]] = []
+# kernel name -> phase -> [total ns, count]
+_counters: Dict[str, Dict[str, list]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+_lock = threading.Lock()
+
+
+def refresh() -> bool:
+    """
+    Re-reads `knobs.runtime.launch_counters` into `enabled`, and returns it.
+    """
+    global enabled
+    value = knobs.runtime.launch_counters
+    if value != enabled:
+        enabled = value
+        for listener in _listeners:
+            listener(value)
+    return value
+
+
+def add_listener(listener: Callable[[bool], None]):
+    """
+    Registers `listener` to be called with the new value of `enabled` whenever
+    it changes, e.g. to switch timers of a launcher on or off.
+    """
+    _listeners.append(listener)
+    listener(enabled)
+
+
+def record(kernel_name: str, phases_ns: Dict[str, int]):
+    """
+    Adds the durations in `phases_ns`, keyed on phase name, to the counters of
+    `kernel_name`.
+    """
+    with _lock:
+        counters = _counters[kernel_name]
+        for phase, ns in phases_ns.items():
+            counter = counters[phase]
+            counter[0] += ns
+            counter[1] += 1
+
+
+def get_counters() -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """
+    Returns the counters accumulated so far.
+
+    :return: a dict mapping kernel names to dicts mapping phase names to the
+        total time spent in the phase, in nanoseconds, and the number of
+        launches it was recorded for.
+    """
+    with _lock:
+        return {
+            name: {phase: tuple(counter)
+                   for phase, counter in phases.items()}
+            for name, phases in _counters.items()
+        }
+
+
+def reset_counters():
+    refresh()
+    with _lock:
+        _counters.clear()
+
+
+def _delta(before, after):
+    delta = {}
+    for name, phases in after.items():
+        previous = before.get(name, {})
+        for phase, (ns, count) in phases.items():
+            prev_ns, prev_count = previous.get(phase, (0, 0))
+            if count != prev_count:
+                delta.setdefault(name, {})[phase] = (ns - prev_ns, count - prev_count)
+    return delta
+
+
+class scope:
+    """
+    A context manager and decorator collecting the launch counters recorded
+    while it is active, with the same interface as `proton.scope`. While
+    proton is profiling, a proton scope is entered as well, and the total time
+    of each phase is added to its metrics as `launch_<phase> (ns)(exc)`.
+
+    Usage:
+        ```python
+        with launch_counters.scope("step") as s:
+            foo[grid](x, y)
+        print(s.counters)
+        ```
+
+    Args:
+        name (str): The name of the scope.
+        metrics (dict[str, float], optional): Additional metrics of the proton scope. Default is None.
+    """
+
+    def __init__(self, name: str, metrics: Optional[dict] = None) -> None:
+        self.name = name
+        self.metrics = metrics
+        self.counters: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._start = None
+        self._proton_scope = None
+
+    def _enter_scope(self):
+        refresh()
+        try:
+            from triton.profiler.flags import get_profiling_on
+            from triton.profiler.scope import scope as proton_scope
+        except ImportError:
+            get_profiling_on = None
+        if get_profiling_on is not None and get_profiling_on():
+            self._proton_scope = proton_scope(self.name, self.metrics)
+            self._proton_scope._enter_scope()
+        self._start = get_counters()
+
+    def _exit_scope(self):
+        self.counters = _delta(self._start, get_counters())
+        if self._proton_scope is None:
+            return
+        from triton.profiler.scope import libproton
+        totals = defaultdict(int)
+        for phases in self.counters.values():
+            for phase, (ns, _) in phases.items():
+                totals[f"launch_{phase} (ns)(exc)"] += ns
+        if totals and self._proton_scope.id is not None:
+            libproton.add_metrics(self._proton_scope.id, dict(totals))
+        self._proton_scope._exit_scope()
+        self._proton_scope = None
+
+    def __enter__(self):
+        self._enter_scope()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._exit_scope()
+
+    def __call__(self, func):
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter_scope()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit_scope()
+
+        return wrapper
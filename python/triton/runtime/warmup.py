@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Sequence
+
+from .. import knobs
+from .driver import driver
+from .jit import MockTensor
+
+
+def _resolve_fn(module, qualname):
+    """
+    Looks up the :code:`JITFunction` named :code:`qualname` in :code:`module`,
+    unwrapping :code:`triton.autotune` / :code:`triton.heuristics` decorators.
+    """
+    from .jit import JITFunction
+    fn = importlib.import_module(module)
+    for name in qualname.split("."):
+        fn = getattr(fn, name)
+    while not isinstance(fn, JITFunction):
+        fn = fn.fn
+    return fn
+
+
+def _compile_pending(module, qualname, cache_key, signature, constexprs, attrs, target, options):
+    """
+    Compiles one specialization in a spawned worker process. The kernel is
+    imported by name rather than sent to the worker, and the target and options
+    are resolved by the parent, so that the worker never touches the driver.
+    """
+    from ..compiler import ASTSource, compile
+    start = time.perf_counter()
+    fn = _resolve_fn(module, qualname)
+    if fn.cache_key != cache_key:
+        raise RuntimeError(f"{module}.{qualname} does not resolve to the kernel being compiled")
+    compile(ASTSource(fn, signature, constexprs, attrs), target=target, options=options)
+    return time.perf_counter() - start
+
+
+def _unpack_spec(spec):
+    if len(spec) == 2:
+        kernel, args = spec
+        kwargs = {}
+    else:
+        kernel, args, kwargs = spec
+    return kernel, tuple(map(MockTensor.wrap_dtype, args)), dict(kwargs)
+
+
+def warmup_kernels(specs: Sequence[tuple], max_workers: Optional[int] = None,
+                   devices: Optional[Sequence[int]] = None) -> list[Any]:
+    """
+    Compiles many kernel specializations ahead of time, in parallel.
+
+    Each spec is a tuple :code:`(kernel, args)` or :code:`(kernel, args, kwargs)`
+    where :code:`kernel` is a :code:`triton.jit`'d function, optionally wrapped by
+    :code:`triton.autotune` / :code:`triton.heuristics`, and :code:`args`/:code:`kwargs`
+    are what would be passed to :code:`kernel.warmup` (torch dtypes may be used in
+    place of tensors). Autotuned kernels are expanded into one specialization per
+    pruned config.
+
+    Missing specializations are compiled by a pool of spawned worker processes,
+    which populate the on-disk kernel cache. Workers import each kernel by its
+    module and qualified name, so scripts calling this must guard their entry
+    point with :code:`if __name__ == "__main__"`; kernels that cannot be imported
+    this way are compiled in the calling process. The resulting kernels are then
+    loaded from the cache into the :code:`device_caches` of the current device, so
+    that the first launch of each specialization is a cache hit.
+
+    When :code:`devices` is given, the kernels are added to the :code:`device_caches`
+    of each of these devices as well, and their binaries are loaded on every device
+    in background threads. Devices of the same target share the compiled binary, so
+    only the per-device module build by the driver is repeated, concurrently.
+
+    :param specs: the kernel specializations to compile.
+    :param max_workers: maximum number of worker processes. Defaults to the number of CPUs.
+        Compilation happens in the calling process if this is 1.
+    :param devices: devices to load the kernels on ahead of their first launch.
+    :return: the compiled kernels of the current device, one per expanded specialization, in order.
+        Entries are :code:`None` for specializations that were skipped by
+        :code:`knobs.runtime.jit_cache_hook`.
+    """
+    current_device = driver.active.get_current_device()
+    kernels = []
+    for device in [current_device] + [device for device in devices or () if device != current_device]:
+        if device != current_device:
+            driver.active.set_current_device(device)
+        try:
+            spec_results = _compile_specs(specs, max_workers)
+        finally:
+            if device != current_device:
+                driver.active.set_current_device(current_device)
+        for spec_kernels, _ in spec_results:
+            for kernel in spec_kernels:
+                if isinstance(kernel, Exception):
+                    raise kernel
+                if kernel is not None and devices is not None and device in devices:
+                    kernel.load_async(device)
+                if device == current_device:
+                    kernels.append(kernel)
+    return kernels
+
+
+def _compile_specs(specs: Sequence[tuple], max_workers: Optional[int]) -> list[tuple[list[Any], float]]:
+    """
+    Implements :code:`warmup_kernels`. Returns, for each spec, the kernels (or
+    the exceptions raised while compiling them) of its expanded specializations,
+    and the time in seconds spent compiling them.
+    """
+    device = driver.active.get_current_device()
+
+    # Resolve every spec to (JITFunction, cache key) pairs and collect the
+    # specializations that still need to be compiled.
+    keys = []
+    pending = {}
+    for spec in specs:
+        kernel, args, kwargs = _unpack_spec(spec)
+        spec_keys = []
+        for fn, fn_args, fn_kwargs in kernel._warmup_specs(args, kwargs):
+            fn_kwargs["debug"] = fn_kwargs.get("debug", fn.debug) or knobs.runtime.debug
+            kernel_cache, target, backend, binder = fn.device_caches[device]
+            bound_args, specialization, options = binder(*fn_args, **fn_kwargs)
+            key = str(specialization) + str(options)
+            spec_keys.append((fn, key))
+            if key in kernel_cache or (fn, key) in pending:
+                continue
+            signature, constexprs, attrs, options = fn._get_compile_args(backend, bound_args, specialization, fn_kwargs)
+            hook_args = (key, signature, device, constexprs, options, [attrs], True)
+            if fn._call_hook(knobs.runtime.jit_cache_hook, *hook_args):
+                continue
+            src = fn.ASTSource(fn, signature, constexprs, attrs)
+            pending[(fn, key)] = (src, target, options, hook_args)
+        keys.append(spec_keys)
+
+    compile_times = dict.fromkeys(pending, 0.0)
+    errors = {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+    # With `always_compile` the workers' results could not be reused, so
+    # there is no point in compiling everything twice.
+    use_pool = max_workers > 1 and not knobs.compilation.always_compile
+    if use_pool:
+        # Workers are spawned rather than forked: the driver has been
+        # initialized in this process already, and its runtime does not survive
+        # a fork.
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as pool:
+            futures = {}
+            for (fn, key), (src, target, options, _) in pending.items():
+                if "<locals>" in fn.__qualname__:
+                    continue
+                futures[(fn, key)] = pool.submit(_compile_pending, fn.__module__, fn.__qualname__, fn.cache_key,
+                                                 src.signature, src.constants, src.attrs, target, options.__dict__)
+            for fn_key, future in futures.items():
+                try:
+                    compile_times[fn_key] += future.result()
+                except Exception:
+                    # Compiled, and any error reported, in this process below.
+                    pass
+
+    # Specializations compiled by the pool are in the on-disk cache now, so
+    # this only loads them.
+    for (fn, key), (src, target, options, hook_args) in pending.items():
+        start = time.perf_counter()
+        try:
+            fn.device_caches[device][0][key] = fn.compile(src, target=target, options=options.__dict__)
+        except Exception as e:
+            errors[(fn, key)] = e
+            continue
+        finally:
+            compile_times[(fn, key)] += time.perf_counter() - start
+        fn._call_hook(knobs.runtime.jit_post_compile_hook, *hook_args)
+
+    results = []
+    for spec_keys in keys:
+        spec_kernels = [errors.get((fn, key)) or fn.device_caches[device][0].get(key, None) for fn, key in spec_keys]
+        results.append((spec_kernels, sum(compile_times.get(fn_key, 0.0) for fn_key in spec_keys)))
+    return results
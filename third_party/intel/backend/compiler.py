@@ -1,8 +1,10 @@
 from triton.backends.compiler import BaseBackend, Language
 from triton._C.libtriton import ir, passes, llvm, intel
-from triton.backends.intel.driver import compile_module_from_src
+from triton.backends.intel.driver import compile_runtime_module
 from triton import knobs
+from triton.runtime.cache import get_cache_manager
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import functools
 from typing import Any, Dict, Tuple
@@ -11,10 +13,15 @@ import hashlib
 import tempfile
 import signal
 import os
+import re
 import shutil
 import subprocess
 from pathlib import Path
 
+# Values accepted by the `grf_mode` option. Its default keeps listing the
+# original ones only, so that adding modes doesn't change every options hash.
+GRF_MODES = ('small', 'large', 'auto', 'pressure', 'default')
+
 
 @dataclass
 class XPUOptions:
@@ -55,6 +62,8 @@ class XPUOptions:
         object.__setattr__(self, 'extern_libs', tuple(extern_libs.items()))
         if self.num_warps <= 0 or (self.num_warps & (self.num_warps - 1)) != 0:
             raise AssertionError("num_warps must be a power of 2")
+        if isinstance(self.grf_mode, str) and self.grf_mode not in GRF_MODES:
+            raise AssertionError(f"grf_mode must be one of {GRF_MODES}")
         self.generate_native_code = knobs.intel.gen_native_code or self.generate_native_code
 
     def hash(self):
@@ -82,6 +91,221 @@ def min_dot_size(device_props: dict):
     return lambda lhs_type, rhs_type: (repeat_count, exec_size, sdepth * get_ops_per_channel(lhs_type, rhs_type))
 
 
+LARGE_GRF_FLAG = "-cl-intel-256-GRF-per-thread"
+
+# Size of a general register file (GRF) register, in bytes, and number of GRF
+# registers per hardware thread in the small and large GRF modes.
+GRF_REGISTER_BYTES = 64
+SMALL_GRF_REGISTERS = 128
+LARGE_GRF_REGISTERS = 256
+
+_LLVM_DEFINE = re.compile(r"^define .*\{$")
+_LLVM_ASSIGNMENT = re.compile(r"^\s*(%[-\w.$]+) = (.*)$")
+_LLVM_VALUE = re.compile(r"%[-\w.$]+")
+_LLVM_TYPE = re.compile(r"<(\d+) x (\w+)>|\b(i\d+|half|bfloat|float|double|ptr)\b")
+_LLVM_SCALAR_BYTES = {"half": 2, "bfloat": 2, "float": 4, "double": 8, "ptr": 8}
+_LLVM_CASTS = ("trunc", "zext", "sext", "fptrunc", "fpext", "fptoui", "fptosi", "uitofp", "sitofp", "ptrtoint",
+               "inttoptr", "bitcast", "addrspacecast")
+
+
+def _llvm_scalar_bytes(ty: str) -> int:
+    if ty in _LLVM_SCALAR_BYTES:
+        return _LLVM_SCALAR_BYTES[ty]
+    # Booleans live in flag registers.
+    bits = int(ty[1:]) if ty[0] == "i" and ty[1:].isdigit() else 0
+    return 0 if bits == 1 else (bits + 7) // 8
+
+
+def _llvm_result_bytes(rhs: str) -> int:
+    """
+    Approximates the size, in bytes, of the value assigned by an instruction
+    (the right hand side of an LLVM IR assignment).
+    """
+    opcode, _, operands = rhs.partition(" ")
+    if opcode in ("icmp", "fcmp"):
+        return 0
+    if opcode in ("getelementptr", "alloca"):
+        return 8
+    if opcode in _LLVM_CASTS and " to " in operands:
+        operands = operands.rsplit(" to ", 1)[1]
+    elif opcode == "select":
+        operands = operands.partition(",")[2]
+    match = _LLVM_TYPE.search(operands)
+    if match is None:
+        return 0
+    count, element, scalar = match.groups()
+    if scalar is not None:
+        return _llvm_scalar_bytes(scalar)
+    if opcode == "extractelement":
+        return _llvm_scalar_bytes(element)
+    if opcode == "shufflevector":
+        mask = _LLVM_TYPE.findall(operands)[-1]
+        count = mask[0] or 1
+    return int(count) * _llvm_scalar_bytes(element)
+
+
+def estimate_register_pressure(llir: str, threads_per_warp: int) -> int:
+    """
+    Estimates the number of GRF registers per hardware thread needed by the
+    kernel in `llir`, from the peak size of the values live at the same time
+    in a work-item, each work-item of a sub-group using its own lanes.
+
+    Live ranges span from the definition of a value to its last use in program
+    order, or the other way around for loop-carried values, which ignores
+    control flow otherwise. This is only meant to tell kernels that clearly fit
+    in, or clearly exceed, the small GRF mode apart.
+    """
+    peak = 0
+    function = None
+    for line in llir.splitlines():
+        if function is None:
+            if _LLVM_DEFINE.match(line):
+                function = []
+            continue
+        if line == "}":
+            peak = max(peak, _peak_live_bytes(function))
+            function = None
+        else:
+            function.append(line)
+    return -(-peak * threads_per_warp // GRF_REGISTER_BYTES)
+
+
+def _peak_live_bytes(lines) -> int:
+    defs = {}
+    ranges = {}
+    for idx, line in enumerate(lines):
+        if (assignment := _LLVM_ASSIGNMENT.match(line)) is not None:
+            name, rhs = assignment.groups()
+            defs[name] = (idx, _llvm_result_bytes(rhs))
+            ranges.setdefault(name, [idx, idx])
+        else:
+            rhs = line
+        for value in _LLVM_VALUE.findall(rhs):
+            if value in ranges:
+                ranges[value][1] = max(ranges[value][1], idx)
+            else:
+                # Used before being defined, i.e. by a phi of a loop header.
+                ranges[value] = [idx, idx]
+    events = []
+    for name, (start, end) in ranges.items():
+        if name not in defs or defs[name][1] == 0:
+            continue
+        end = max(end, defs[name][0])
+        events.append((start, defs[name][1]))
+        events.append((end + 1, -defs[name][1]))
+    peak = live = 0
+    for _, size in sorted(events, key=lambda event: (event[0], event[1])):
+        live += size
+        peak = max(peak, live)
+    return peak
+
+
+_SPILLS = re.compile(r"spilled around (\d+)")
+
+
+def ocloc_spills(log: str) -> int:
+    """
+    Returns the spill size reported in an `ocloc` log. The exact message is
+    something like:
+        warning: kernel matmul_kernel  compiled SIMD16 allocated 128 regs and spilled around 217
+    """
+    if "spilled" not in log:
+        return 0
+    return sum(map(int, _SPILLS.findall(log))) or 1
+
+
+def run_ocloc(spirv: bytes, build_flags: str) -> Tuple[bytes, str]:
+    """
+    Compiles `spirv` to a native binary with `ocloc`, returns the binary and
+    the compilation log.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fsrc = os.path.join(tmpdir, "kernel.spv")
+        fbin = fsrc + '.o'
+        with open(fsrc, 'wb') as f:
+            f.write(spirv)
+        ocloc_cmd = [
+            knobs.intel.ocloc, 'compile', '-file', fsrc, '-o', fbin, '-spirv_input', '-device', 'pvc', '-options',
+            build_flags
+        ]
+        try:
+            result = subprocess.run(ocloc_cmd, check=True, close_fds=False, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT)
+        except subprocess.CalledProcessError as e:
+            if e.returncode == 255:
+                error = 'Internal Triton ZEBIN codegen error'
+            elif e.returncode == 128 + signal.SIGSEGV:
+                error = '`ocloc` raised SIGSEGV'
+            else:
+                error = f'`ocloc` failed with error code {e.returncode}'
+
+            raise RuntimeError(f'{error}\n'
+                               f'`ocloc` stderr:\n{e.stdout.decode(errors="replace")}\n'
+                               f'Repro command: {ocloc_cmd}\n')
+        with open(fbin, 'rb') as f:
+            return f.read(), result.stdout.decode(errors="replace").strip()
+
+
+@functools.lru_cache
+def _ocloc_id(ocloc: str) -> str:
+    path = shutil.which(ocloc) or ocloc
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ocloc
+    return f"{os.path.realpath(path)}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def compile_native_code(spirv: bytes, build_flags: str) -> Tuple[bytes, str]:
+    """
+    Same as `run_ocloc`, but the results are cached, keyed on the SPIR-V, the
+    build flags and the `ocloc` binary.
+    """
+    if knobs.compilation.always_compile:
+        return run_ocloc(spirv, build_flags)
+    hasher = hashlib.sha256(spirv)
+    hasher.update(f"{build_flags}-{_ocloc_id(knobs.intel.ocloc)}".encode("utf-8"))
+    cache = get_cache_manager(hasher.hexdigest())
+    bin_path = cache.get_file("kernel.zebin")
+    log_path = cache.get_file("kernel.log")
+    if bin_path is not None and log_path is not None:
+        with open(bin_path, 'rb') as f:
+            zebin = f.read()
+        with open(log_path) as f:
+            return zebin, f.read()
+    zebin, log = run_ocloc(spirv, build_flags)
+    cache.put(log, "kernel.log", binary=False)
+    cache.put(zebin, "kernel.zebin", binary=True)
+    return zebin, log
+
+
+@functools.lru_cache
+def _ocloc_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(thread_name_prefix="triton-ocloc")
+
+
+def generate_native_code(spirv: bytes, build_flags: str) -> Tuple[bytes, str, int]:
+    """
+    Compiles `spirv` with `build_flags`, or with 256 GRF per thread if that
+    spills registers. With `knobs.intel.speculative_large_grf`, both variants
+    are compiled in parallel. Returns the binary, the flags it was compiled
+    with, and its spill size.
+    """
+    if LARGE_GRF_FLAG in build_flags:
+        zebin, log = compile_native_code(spirv, build_flags)
+        return zebin, build_flags, ocloc_spills(log)
+    large_flags = f"{build_flags} {LARGE_GRF_FLAG}"
+    large = None
+    if knobs.intel.speculative_large_grf:
+        # If it isn't needed, the large GRF variant finishes in the background and is cached.
+        large = _ocloc_executor().submit(compile_native_code, spirv, large_flags)
+    zebin, log = compile_native_code(spirv, build_flags)
+    if ocloc_spills(log) == 0:
+        return zebin, build_flags, 0
+    zebin, log = large.result() if large is not None else compile_native_code(spirv, large_flags)
+    return zebin, large_flags, ocloc_spills(log)
+
+
 class XPUBackend(BaseBackend):
     device_props: dict = {}
 
@@ -115,8 +339,7 @@ class XPUBackend(BaseBackend):
         super().__init__(target)
         if not isinstance(target.arch, dict):
             raise TypeError("target.arch is not a dict")
-        dirname = os.path.dirname(os.path.realpath(__file__))
-        mod = compile_module_from_src(Path(os.path.join(dirname, "arch_parser.c")).read_text(), "arch_utils")
+        mod = compile_runtime_module("arch_utils")
         self.device_arch = mod.parse_device_arch(target.arch.get('architecture', 0))
         self.properties = self.parse_target(target.arch)
         self.binary_ext = "spv"
@@ -169,6 +392,8 @@ class XPUBackend(BaseBackend):
         args = {k: opts[k] for k in XPUOptions.__dataclass_fields__.keys() if k in opts}
         args["allow_fp8e4nv"] = True
         args["enable_tile_load_linear_layout"] = knobs.intel.tile_load_ll
+        if "grf_mode" not in args and knobs.intel.grf_mode_from_pressure:
+            args["grf_mode"] = 'pressure'
         return XPUOptions(**args)
 
     def pack_metadata(self, metadata):
@@ -387,13 +612,14 @@ class XPUBackend(BaseBackend):
     def make_spv(src, metadata, options):
         spirv, name = intel.translate_to_spirv(src)
         metadata["name"] = name
-        if options.grf_mode == 'small':
+        grf_mode, metadata["grf_mode_reason"] = XPUBackend.select_grf_mode(src, metadata, options)
+        if grf_mode == 'small':
             metadata["build_flags"] = "-cl-intel-128-GRF-per-thread"
-        elif options.grf_mode == 'large':
+        elif grf_mode == 'large':
             if options.num_warps > 32:
                 raise RuntimeError("grf_mode = large cannot be used with num_warps > 32")
             metadata["build_flags"] = "-cl-intel-256-GRF-per-thread"
-        elif options.grf_mode == 'auto':
+        elif grf_mode == 'auto':
             metadata["build_flags"] = "-cl-intel-enable-auto-large-GRF-mode"
         else:
             metadata["build_flags"] = ""
@@ -402,61 +628,44 @@ class XPUBackend(BaseBackend):
             metadata["build_flags"] += " -cl-opt-disable"
 
         metadata["generate_native_code"] = options.generate_native_code
+        # Only known when generating native code, otherwise see `CompiledKernel.n_spills`.
+        metadata["spills"] = None
 
+        binary = spirv
         if options.generate_native_code:
-            with tempfile.NamedTemporaryFile(delete=False, mode='wb', suffix='.spv') as fsrc, \
-                tempfile.NamedTemporaryFile(delete=False, mode='r', suffix='.log') as flog:
-                fsrc.write(spirv)
-                fsrc.flush()
-                fbin = fsrc.name + '.o'
-
-                ocloc_cmd = [
-                    'ocloc', 'compile', '-file', fsrc.name, '-o', fbin, '-spirv_input', '-device', 'pvc', '-options',
-                    metadata["build_flags"]
-                ]
-
-                try:
-                    subprocess.run(ocloc_cmd, check=True, close_fds=False, stdout=flog, stderr=subprocess.STDOUT)
-                    if os.path.exists(flog.name):
-                        with open(flog.name) as log_file:
-                            log = log_file.read().strip()
-                            if 'spilled' in log and metadata["build_flags"].find("-cl-intel-256-GRF-per-thread") == -1:
-                                """
-                                The exact message is something like:
-                                    warning: kernel matmul_kernel  compiled SIMD16 allocated 128 regs and spilled around 217
-                                is "spilled" enough for now?
-                                """
-                                metadata["build_flags"] += " -cl-intel-256-GRF-per-thread"
-                                # re-run with new build flags
-                                ocloc_cmd[-1] = metadata["build_flags"]
-                                subprocess.run(ocloc_cmd, check=True, close_fds=False, stdout=flog,
-                                               stderr=subprocess.STDOUT)
-                        os.remove(flog.name)
-                    if os.path.exists(fsrc.name):
-                        os.remove(fsrc.name)
-                except subprocess.CalledProcessError as e:
-                    with open(flog.name) as log_file:
-                        log = log_file.read()
-                    if os.path.exists(flog.name):
-                        os.remove(flog.name)
-
-                    if e.returncode == 255:
-                        error = 'Internal Triton ZEBIN codegen error'
-                    elif e.returncode == 128 + signal.SIGSEGV:
-                        error = '`ocloc` raised SIGSEGV'
-                    else:
-                        error = f'`ocloc` failed with error code {e.returncode}'
-
-                    raise RuntimeError(f'{error}\n'
-                                       f'`ocloc` stderr:\n{log}\n'
-                                       f'Repro command: {ocloc_cmd}\n')
-
-                with open(fbin, 'rb') as f:
-                    zebin = f.read()
-                if os.path.exists(fbin):
-                    os.remove(fbin)
-            return zebin
-        return spirv
+            build_flags = metadata["build_flags"]
+            binary, metadata["build_flags"], metadata["spills"] = generate_native_code(spirv, build_flags)
+            if metadata["build_flags"] != build_flags:
+                metadata["grf_mode_reason"] = f"spilled with the {grf_mode} GRF mode"
+                grf_mode = 'large'
+        metadata["selected_grf_mode"] = grf_mode
+        return binary
+
+    @staticmethod
+    def select_grf_mode(llir, metadata, options):
+        """
+        Returns the GRF mode to compile the kernel with, and why. With
+        `grf_mode='pressure'`, the large GRF mode is selected for kernels whose
+        estimated register pressure (recorded in the metadata) exceeds the
+        small GRF mode.
+        """
+        metadata["register_pressure"] = None
+        if options.grf_mode in ('small', 'large', 'auto'):
+            return options.grf_mode, "grf_mode option"
+        if options.grf_mode != 'pressure':
+            return 'default', "default"
+        pressure = estimate_register_pressure(llir, metadata["threads_per_warp"])
+        metadata["register_pressure"] = pressure
+        reason = f"estimated register pressure of {pressure} GRF registers"
+        if pressure > SMALL_GRF_REGISTERS and options.num_warps <= 32:
+            return 'large', reason
+        # The default mode still switches to the large GRF mode when loading a kernel that spills.
+        return 'default', reason
+
+    def get_late_options(self):
+        # Only the SPIR-V/zebin generation depends on these, so sweeping over
+        # them reuses the cached LLVM IR.
+        return {"spv": ("grf_mode", "generate_native_code")}
 
     def add_stages(self, stages, options, language):
         if language == Language.TRITON:
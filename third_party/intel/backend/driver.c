@@ -101,12 +101,21 @@ void freeKernelBundle(PyObject *p) {
 
 using Spills = int32_t;
 
+// Releases the GIL for the lifetime of the object.
+struct GILRelease {
+  PyThreadState *state = PyEval_SaveThread();
+  ~GILRelease() { PyEval_RestoreThread(state); }
+};
+
 template <typename L0_DEVICE, typename L0_CONTEXT>
 std::tuple<ze_module_handle_t, ze_kernel_handle_t, Spills>
 compileLevelZeroObjects(uint8_t *binary_ptr, const size_t binary_size,
                         const std::string &kernel_name, L0_DEVICE l0_device,
                         L0_CONTEXT l0_context, const std::string &build_flags,
                         const bool is_spv) {
+  // Building the module is the expensive part of loading a kernel, let other
+  // threads (e.g. loading the kernel on other devices) run in the meantime.
+  GILRelease release;
   auto l0_module =
       checkSyclErrors(create_module(l0_context, l0_device, binary_ptr,
                                     binary_size, build_flags.data(), is_spv));
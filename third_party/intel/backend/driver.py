@@ -1,14 +1,21 @@
 import importlib.metadata
+import json
 import os
 import hashlib
+import re
 import shutil
 import ctypes
 import sysconfig
 import tempfile
+import threading
+from collections import defaultdict
 from pathlib import Path
-from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import cached_property, lru_cache, partial
 
 from triton import knobs
+from triton.runtime import launch_counters
 from triton.runtime.build import _build, platform_key
 from triton.runtime.cache import get_cache_manager
 from triton.backends.compiler import GPUTarget
@@ -224,10 +231,10 @@ class SpirvUtils:
 
 class TritonLauncher:
 
-    def __init__(self, cache_path: str):
+    def __init__(self, cache_path: str, num_args: int = 1):
         self.shared_library = ctypes.PyDLL(cache_path)
         self.shared_library.launch.restype = ctypes.py_object
-        self.shared_library.launch.argtypes = (ctypes.py_object, )
+        self.shared_library.launch.argtypes = (ctypes.py_object, ) * num_args
 
     def __getattribute__(self, name):
         if name == "launch":
@@ -250,11 +257,84 @@ class TritonLauncher:
             ctypes.windll.kernel32.FreeLibrary(handle)
 
 
-def compile_module_from_src(src, name):
+class GenericLauncher(TritonLauncher):
+    """
+    The launcher shared by all kernel signatures, which can also report the
+    time spent in each phase of its last launch, and record launch graphs.
+    """
+
+    PHASES = ("enter_hook", "args", "submit", "exit_hook")
+    # Functions exported by launcher.cpp besides `launch`, with their number of arguments.
+    FUNCTIONS = {
+        "set_launch_counters": 1,
+        "last_launch_counters": 0,
+        "set_recording": 1,
+        "make_graph": 1,
+        "replay_graph": 1,
+        "update_graph": 2,
+    }
+
+    def __init__(self, cache_path: str):
+        super().__init__(cache_path, num_args=2)
+        for name, num_args in self.FUNCTIONS.items():
+            function = getattr(self.shared_library, name)
+            function.restype = ctypes.py_object
+            function.argtypes = (ctypes.py_object, ) * num_args
+            setattr(self, name, function)
+        # Whether the calling thread is recording a launch graph.
+        self.capturing = threading.local()
+        # The timers of the launcher are shared by all kernels: switch them when the knob changes.
+        launch_counters.add_listener(self.set_launch_counters)
+
+
+def _module_cache(src):
     hasher = hashlib.sha256(__CACHE_VERSION.encode("utf-8"))
     hasher.update((src + platform_key()).encode("utf-8"))
-    key = hasher.hexdigest()
-    cache = get_cache_manager(key)
+    return get_cache_manager(hasher.hexdigest())
+
+
+def _build_so(name, src_paths, tmpdir):
+    extra_compiler_args = []
+    if COMPILATION_HELPER.libsycl_dir:
+        if os.name == "nt":
+            extra_compiler_args += ["/LIBPATH:" + dir for dir in COMPILATION_HELPER.libsycl_dir]
+        else:
+            extra_compiler_args += ["-Wl,-rpath," + dir for dir in COMPILATION_HELPER.libsycl_dir]
+
+    so = _build(name, src_paths, tmpdir, COMPILATION_HELPER.library_dir, COMPILATION_HELPER.include_dir,
+                COMPILATION_HELPER.libraries, extra_compile_args=extra_compiler_args)
+    with open(so, "rb") as f:
+        return f.read()
+
+
+def build_modules_from_src(sources):
+    """
+    Builds the modules in `sources` (a dict of module names to sources) that
+    are not cached yet into a single shared object, with one compiler
+    invocation, and caches it as each of them; `compile_module_from_src` then
+    finds them in the cache. The exported symbols of the modules must differ.
+    Nothing is built if `knobs.build.impl` is set, as it builds one source at
+    a time: `compile_module_from_src` calls it for each module instead.
+    """
+    if knobs.build.impl is not None:
+        return
+    suffix = sysconfig.get_config_var("EXT_SUFFIX")
+    missing = {name: src for name, src in sources.items() if _module_cache(src).get_file(f"{name}{suffix}") is None}
+    if len(missing) < 2:
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src_paths = []
+        for name, src in missing.items():
+            src_paths.append(os.path.join(tmpdir, f"{name}.cpp"))
+            with open(src_paths[-1], "w") as f:
+                f.write(src)
+        so = _build_so("__triton_modules", src_paths, tmpdir)
+    for name, src in missing.items():
+        _module_cache(src).put(so, f"{name}{suffix}", binary=True)
+
+
+def compile_module_from_src(src, name):
+    cache = _module_cache(src)
     suffix = sysconfig.get_config_var("EXT_SUFFIX")
     cache_path = cache.get_file(f"{name}{suffix}")
     if cache_path is None:
@@ -262,17 +342,7 @@ def compile_module_from_src(src, name):
             src_path = os.path.join(tmpdir, "main.cpp")
             with open(src_path, "w") as f:
                 f.write(src)
-            extra_compiler_args = []
-            if COMPILATION_HELPER.libsycl_dir:
-                if os.name == "nt":
-                    extra_compiler_args += ["/LIBPATH:" + dir for dir in COMPILATION_HELPER.libsycl_dir]
-                else:
-                    extra_compiler_args += ["-Wl,-rpath," + dir for dir in COMPILATION_HELPER.libsycl_dir]
-
-            so = _build(name, src_path, tmpdir, COMPILATION_HELPER.library_dir, COMPILATION_HELPER.include_dir,
-                        COMPILATION_HELPER.libraries, extra_compile_args=extra_compiler_args)
-            with open(so, "rb") as f:
-                cache_path = cache.put(f.read(), f"{name}{suffix}", binary=True)
+            cache_path = cache.put(_build_so(name, src_path, tmpdir), f"{name}{suffix}", binary=True)
 
     if name == 'arch_utils':
         return ArchParser(cache_path)
@@ -280,6 +350,8 @@ def compile_module_from_src(src, name):
         return SpirvUtils(cache_path)
     elif name == '__triton_launcher':
         return TritonLauncher(cache_path)
+    elif name == '__triton_generic_launcher':
+        return GenericLauncher(cache_path)
     elif name == 'proton_utils':
         return cache_path
 
@@ -290,6 +362,35 @@ def compile_module_from_src(src, name):
     return mod
 
 
+@lru_cache
+def runtime_module_sources():
+    """
+    Sources of the modules every process needs: the driver utilities, the
+    architecture parser and the generic launcher.
+    """
+    dirname = os.path.dirname(os.path.realpath(__file__))
+    launcher_src = Path(os.path.join(dirname, "launcher.cpp")).read_text()
+    if COMPILATION_HELPER.inject_pytorch_dep:
+        launcher_src = "#define TRITON_XPU_RECORD_FUNCTION\n" + launcher_src
+    return {
+        "spirv_utils": Path(os.path.join(dirname, "driver.c")).read_text(),
+        "arch_utils": Path(os.path.join(dirname, "arch_parser.c")).read_text(),
+        "__triton_generic_launcher": launcher_src,
+    }
+
+
+def compile_runtime_module(name):
+    """
+    Returns one of the modules of `runtime_module_sources`. Unless
+    `knobs.intel.batch_build` is disabled, the first one to be built triggers
+    the build of all of them at once.
+    """
+    sources = runtime_module_sources()
+    if knobs.intel.batch_build:
+        build_modules_from_src(sources)
+    return compile_module_from_src(sources[name], name)
+
+
 # ------------------------
 # Utils
 # ------------------------
@@ -303,14 +404,20 @@ class XPUUtils(object):
         return cls.instance
 
     def __init__(self):
-        dirname = os.path.dirname(os.path.realpath(__file__))
         # we save `spirv_utils` module so that the destructor is not called prematurely, which will unload the dll
         # and can cause `Fatal Python error: Segmentation fault`
-        self.mod = compile_module_from_src(Path(os.path.join(dirname, "driver.c")).read_text(), "spirv_utils")
+        self.mod = compile_runtime_module("spirv_utils")
         self.load_binary = self.mod.load_binary
-        self.get_device_properties = self.mod.get_device_properties
         self.device_count = self.mod.init_devices(self.get_sycl_queue())
         self.wait_on_sycl_queue = self.mod.wait_on_sycl_queue
+        self._device_properties = {}
+
+    def get_device_properties(self, device):
+        # Properties don't change for a given device, query them once.
+        properties = self._device_properties.get(device)
+        if properties is None:
+            properties = self._device_properties[device] = self.mod.get_device_properties(device)
+        return properties
 
     def get_current_device(self):
         import torch
@@ -351,6 +458,158 @@ def ty_to_cpp(ty):
     }[ty]
 
 
+# `PyArg_ParseTuple` format units of the scalar kernel argument types.
+FORMAT_UNITS = {
+    "float": "f",
+    "double": "d",
+    "long": "l",
+    "int8_t": "b",
+    "int16_t": "h",
+    "int32_t": "i",
+    "int64_t": "L",
+    "uint8_t": "B",
+    "uint16_t": "H",
+    "uint32_t": "I",
+    "uint64_t": "K",
+}
+
+
+def arg_descriptor(signature):
+    """
+    Describes the kernel arguments to the generic launcher (see launcher.cpp):
+    'P' for pointers, '-' for constexprs, '(...)' for tuples and the
+    `PyArg_ParseTuple` format unit of scalars.
+    """
+
+    def descriptor_of(ty):
+        if isinstance(ty, tuple):
+            return f"({''.join(map(descriptor_of, ty))})"
+        if ty[0] == '*':
+            return "P"
+        if ty == "constexpr":
+            return "-"
+        return FORMAT_UNITS[ty_to_cpp(ty)]
+
+    return ''.join(map(descriptor_of, signature.values())).encode("ascii")
+
+
+@lru_cache
+def generic_launcher():
+    """
+    Returns the launcher shared by all kernel signatures. It is compiled once
+    per environment instead of once per signature like `make_launcher`'s.
+    """
+    return compile_runtime_module("__triton_generic_launcher")
+
+
+def _pointer_key(value):
+    return value if isinstance(value, int) else ("id", id(value))
+
+
+def _replace_pointers(descriptor, values, replacements, updates, pos=0, param=0):
+    """
+    Replaces the pointer arguments in `values` that are keys of `replacements`,
+    walking `descriptor` like `extractArgs` in launcher.cpp, and appends the
+    (kernel parameter index, new value) pairs to `updates`.
+
+    :return: the new values, and the positions in the descriptor and in the
+        kernel parameters following them.
+    """
+    new_values = []
+    for value in values:
+        kind = descriptor[pos:pos + 1]
+        pos += 1
+        if kind == b"(":
+            value, pos, param = _replace_pointers(descriptor, value, replacements, updates, pos, param)
+            value = tuple(value)
+            pos += 1
+        elif kind == b"P":
+            new_value = replacements.get(_pointer_key(value), value)
+            if new_value is not value:
+                updates.append((param, new_value))
+                value = new_value
+            param += 1
+        elif kind != b"-":
+            param += 1
+        new_values.append(value)
+    return new_values, pos, param
+
+
+class LaunchGraph:
+    """
+    A sequence of kernel launches, recorded once and replayed with a single
+    host call. The arguments of the launches are converted when recording, so
+    replays only submit the kernels, to the streams they were recorded on.
+
+    Usage:
+        ```python
+        graph = LaunchGraph()
+        with graph.capture():
+            kernel_a[grid](x, y)
+            kernel_b[grid](y, z)
+        graph.replay()
+        graph.update({x: x2})
+        graph.replay()
+        ```
+
+    Launches are recorded instead of being submitted while capturing, on the
+    capturing thread only; other operations, like PyTorch's, still run. The
+    launch hooks are not called by replays. Recording requires the generic
+    launcher, i.e. TRITON_XPU_SPECIALIZED_LAUNCHER must not be set.
+    """
+
+    def __init__(self):
+        self._launches = []
+        self._graph = None
+
+    @contextmanager
+    def capture(self):
+        """
+        Records the kernel launches of the block, after the ones recorded
+        by previous captures.
+        """
+        if knobs.intel.specialized_launcher:
+            raise RuntimeError("Launch graphs require the generic launcher, unset TRITON_XPU_SPECIALIZED_LAUNCHER")
+        mod = generic_launcher()
+        launches = []
+        mod.set_recording(launches)
+        mod.capturing.active = True
+        try:
+            yield self
+        finally:
+            mod.set_recording(None)
+            mod.capturing.active = False
+        self._launches.extend(launches)
+        self._graph = mod.make_graph(self._launches)
+
+    def __len__(self):
+        return len(self._launches)
+
+    def replay(self):
+        if self._graph is None:
+            raise RuntimeError("No launches were captured")
+        generic_launcher().replay_graph(self._graph)
+
+    def update(self, pointers):
+        """
+        Replaces pointer arguments of the recorded launches.
+
+        :param pointers: a dict mapping arguments that were passed to the
+            recorded launches (tensors or ints, tensors are matched by
+            identity) to their replacements.
+        """
+        replacements = {_pointer_key(old): new for old, new in pointers.items()}
+        updates = []
+        for i, (descriptor, args) in enumerate(self._launches):
+            launch_updates = []
+            values, _, _ = _replace_pointers(descriptor, args[9:], replacements, launch_updates)
+            if launch_updates:
+                self._launches[i] = (descriptor, args[:9] + tuple(values))
+                updates.extend((i, param, value) for param, value in launch_updates)
+        if updates:
+            generic_launcher().update_graph(self._graph, updates)
+
+
 def make_launcher(constants, signature):
 
     def _serialize_signature(sig):
@@ -378,19 +637,7 @@ def make_launcher(constants, signature):
             return "O"
         if ty == "void*":
             return "O"
-        return {
-            "float": "f",
-            "double": "d",
-            "long": "l",
-            "int8_t": "b",
-            "int16_t": "h",
-            "int32_t": "i",
-            "int64_t": "L",
-            "uint8_t": "B",
-            "uint16_t": "H",
-            "uint32_t": "I",
-            "uint64_t": "K",
-        }[ty_to_cpp(ty)]
+        return FORMAT_UNITS[ty_to_cpp(ty)]
 
     args_format = ''.join([format_of(ty) for ty in signature.values()])
     format = "iiiOOOOOO" + args_format
@@ -652,37 +899,86 @@ def serialize_kernel_metadata(arg, args_dict):
     args_dict['build_flags'] = arg.build_flags
 
 
+@lru_cache
+def _dump_executor():
+    # A single thread, so that captures are written in launch order.
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="triton-dump-args")
+
+
+# kernel name -> number of launches considered for dumping so far
+_dumped_launches = defaultdict(int)
+_dumped_launches_lock = threading.Lock()
+
+
+def _write_args(dir_path, args_dict, tensors, event):
+    import torch
+    try:
+        if event is not None:
+            event.synchronize()
+        for file_name, tensor in tensors:
+            # Raw bytes, which can be memory-mapped with the dtype, shape and strides of the manifest.
+            tensor.view(torch.uint8).numpy().tofile(os.path.join(dir_path, file_name))
+        with open(os.path.join(dir_path, 'args_data.json'), 'w') as json_file:
+            json.dump(args_dict, json_file, indent=4)
+    except Exception as e:
+        print(f"Failed to dump the kernel arguments to {dir_path}: {e}")
+
+
 def serialize_args(args, constants, signature):
+    """
+    Captures the arguments of a launch for the SPIR-V Runner: a JSON manifest
+    (args_data.json) and the raw bytes of each tensor argument
+    (tensor_<i>.bin). Only launches of kernels whose name matches
+    `knobs.intel.dump_spirv_kernel_args_filter` are considered, and only the
+    `knobs.intel.dump_spirv_kernel_args_launch`-th launch of each of them is
+    captured (all of them if negative, each overwriting the previous one). Tensors are copied to
+    the host asynchronously and the files are written by a background thread.
+    """
     import torch
     import numbers
-    dir_path = knobs.intel.dump_spirv_kernel_args
-    if not os.path.exists(dir_path):
-        os.makedirs(dir_path)
-        print(f"Path to directory consisting of SPIR-V Runner data: {dir_path}")
 
     cnt = 0
-    args_dict = {"gridX": int(args[cnt]), "gridY": int(args[cnt + 1]), "gridZ": int(args[cnt + 2])}
     # 3: stream
     # 4: function
     # 5: packed kernel metadata
     assert type(args[cnt + 5]).__name__ == "KernelMetadata"
+    name = args[cnt + 5].name
+    name_filter = knobs.intel.dump_spirv_kernel_args_filter
+    if name_filter and not re.search(name_filter, name):
+        return
+    with _dumped_launches_lock:
+        launch = _dumped_launches[name]
+        _dumped_launches[name] += 1
+    if knobs.intel.dump_spirv_kernel_args_launch not in (-1, launch):
+        return
+
+    dir_path = knobs.intel.dump_spirv_kernel_args
+    if not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+        print(f"Path to directory consisting of SPIR-V Runner data: {dir_path}")
+
+    args_dict = {"gridX": int(args[cnt]), "gridY": int(args[cnt + 1]), "gridZ": int(args[cnt + 2]), "launch": launch}
     serialize_kernel_metadata(args[cnt + 5], args_dict)
     # 6: launch_metadata
     # 7: launch_enter_hook
     # 8: launch_exit_hook
     args_dict['argument_list'] = []
+    tensors = []
     counts = {"tensors": 0, "scalars": 0, "karg_cnt": 0}
     cnt += 9
     for arg in args[cnt:]:
         sig_name = list(signature.keys())[counts['karg_cnt']]
         if isinstance(arg, torch.Tensor):
-            cpu_tensor = arg.cpu()
-            tensor_path = os.path.join(dir_path, f"tensor_{counts['tensors']}.pt")
-            with open(tensor_path, 'wb') as f:
-                torch.save(cpu_tensor, f)
+            file_name = f"tensor_{counts['tensors']}.bin"
+            # The memory the tensor spans from its first element, in its actual layout, since the
+            # kernel is passed its strides. Enqueued on the current stream, before the kernel runs.
+            span = 1 + sum((size - 1) * stride for size, stride in zip(arg.shape, arg.stride())) if arg.numel() else 0
+            memory = arg.detach().as_strided((span, ), (1, ))
+            tensors.append((file_name, memory.to("cpu", non_blocking=True, copy=True)))
             new_arg = {
                 "name": f"tensor_{counts['tensors']}", "type": "tensor", "dtype": str(arg.dtype), "ctype":
-                signature[sig_name]
+                signature[sig_name], "file": file_name, "shape": list(arg.shape), "strides": list(arg.stride()),
+                "storage_size": span
             }
             args_dict['argument_list'].append(new_arg)
             counts['tensors'] += 1
@@ -696,11 +992,11 @@ def serialize_args(args, constants, signature):
             counts['scalars'] += 1
         counts['karg_cnt'] += 1
 
-    # Dump argument info as a JSON file
-    json_path = os.path.join(dir_path, 'args_data.json')
-    with open(json_path, 'w') as json_file:
-        import json
-        json.dump(args_dict, json_file, indent=4)
+    event = None
+    if tensors:
+        event = torch.xpu.Event()
+        event.record()
+    _dump_executor().submit(_write_args, dir_path, args_dict, tensors, event)
 
 
 class XPULauncher(object):
@@ -710,21 +1006,50 @@ class XPULauncher(object):
         arg_idx = lambda x: (src.fn.arg_names.index(x), ) if isinstance(x, str) else x
         self.constants = {arg_idx(idx): value for idx, value in constants.items()}
         self.signature = {idx: value for idx, value in src.signature.items()}
-        src = make_launcher(self.constants, self.signature)
-        self.mod = compile_module_from_src(src, "__triton_launcher")
+        self._counted_launch = None
+        if knobs.intel.specialized_launcher:
+            src = make_launcher(self.constants, self.signature)
+            self.mod = compile_module_from_src(src, "__triton_launcher")
+            launch = self.mod.launch
+        else:
+            self.mod = generic_launcher()
+            launch = partial(self.mod.launch, arg_descriptor(self.signature))
+            self._counted_launch = self._counted(launch, metadata.name)
         # Serialize KernelArguments for SPIR-V Runner
         self.serialize_kernel_args = knobs.intel.dump_spirv_kernel_args
+        self._launch = launch
+        # Entry point taking the packed launch arguments as a single tuple, used by
+        # `LaunchPlan` to bypass `__call__`. Dumping the arguments requires `__call__`.
+        # Launches are only timed through it if counters are enabled when the kernel is loaded.
+        if self._counted_launch is not None and launch_counters.refresh():
+            launch = self._counted_launch
+        self.launch = None if self.serialize_kernel_args else launch
+
+    def _counted(self, launch, name):
+        mod = self.mod
+
+        def counted_launch(args):
+            launch(args)
+            # Launches recorded into a launch graph aren't submitted, so there is nothing to count.
+            if launch_counters.enabled and not getattr(mod.capturing, "active", False):
+                launch_counters.record(name, dict(zip(GenericLauncher.PHASES, mod.last_launch_counters())))
+
+        return counted_launch
 
     def __call__(self, *args, **kwargs):
         if self.serialize_kernel_args:
             serialize_args(args, self.constants, self.signature)
-        self.mod.launch(args)
+        if launch_counters.enabled and self._counted_launch is not None:
+            self._counted_launch(args)
+        else:
+            self._launch(args)
 
 
 class XPUDriver(DriverBase):
 
     def __init__(self):
         self.launcher_cls = XPULauncher
+        self._targets = {}
 
     def __getattr__(self, name):
         # Lazily initialize utils to avoid unnecessary XPU runtime invocations.
@@ -738,16 +1063,24 @@ class XPUDriver(DriverBase):
     def get_current_device(self):
         return self.utils.get_current_device()
 
+    def set_current_device(self, device):
+        import torch
+        torch.xpu.set_device(device)
+
     def get_current_stream(self, device):
         import torch
         return torch.xpu.current_stream().sycl_queue
 
     def get_current_target(self):
-        import torch
         device = self.get_current_device()
-        dev_property = torch.xpu.get_device_capability(device)
-        warp_size = 32
-        return GPUTarget("xpu", dev_property, warp_size)
+        # The target is built from the device capabilities, query them once per device.
+        target = self._targets.get(device)
+        if target is None:
+            import torch
+            dev_property = torch.xpu.get_device_capability(device)
+            warp_size = 32
+            target = self._targets[device] = GPUTarget("xpu", dev_property, warp_size)
+        return target
 
     def build_proton_help_lib(self):
         from triton.backends.intel.driver import compile_module_from_src
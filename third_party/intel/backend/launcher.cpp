@@ -0,0 +1,562 @@
+//===- launcher.cpp -------------------------------------------------------===//
+//
+// Part of the LLVM Project, under the Apache License v2.0 with LLVM Exceptions.
+// See https://llvm.org/LICENSE.txt for license information.
+// SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+//
+//===----------------------------------------------------------------------===//
+//
+// Launcher shared by all kernel signatures. The kernel arguments are described
+// by a descriptor string computed once per kernel by `arg_descriptor` in
+// driver.py, with one character per (flattened) argument:
+//
+//   'P'      pointer (an int, None, or an object with a data_ptr() method)
+//   '-'      constexpr, not passed to the kernel
+//   '(...)'  tuple, whose items are described between the parentheses
+//
+// and the PyArg_ParseTuple format units for scalars ('b', 'h', 'i', 'L', 'B',
+// 'H', 'I', 'K', 'f', 'd').
+//
+// When enabled with `set_launch_counters`, the launcher also records the time
+// spent in each phase of a launch, returned by `last_launch_counters` for the
+// last launch of the calling thread.
+//
+// Launches can also be recorded (`set_recording`) into graphs (`make_graph`)
+// whose arguments are converted once, and which are submitted with a single
+// call (`replay_graph`). Their pointer arguments can be replaced between
+// replays (`update_graph`).
+//
+//===----------------------------------------------------------------------===//
+
+#include <cassert>
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <limits>
+#include <memory>
+#include <optional>
+#include <string>
+#include <vector>
+
+#include <level_zero/ze_api.h>
+#include <sycl/sycl.hpp>
+#ifdef TRITON_XPU_RECORD_FUNCTION
+#include <ATen/record_function.h>
+#endif
+
+#if defined(_WIN32)
+#define EXPORT_FUNC __declspec(dllexport)
+#else
+#define EXPORT_FUNC __attribute__((visibility("default")))
+#endif
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+namespace {
+
+struct KernelArg {
+  char kind;
+  union {
+    void *ptr;
+    int8_t i8;
+    int16_t i16;
+    int32_t i32;
+    int64_t i64;
+    uint8_t u8;
+    uint16_t u16;
+    uint32_t u32;
+    uint64_t u64;
+    float f32;
+    double f64;
+  };
+};
+
+bool checkDevicePointer(void *ptr, int idx, const sycl::queue &queue) {
+  auto context = queue.get_context();
+  auto handle = sycl::get_native<sycl::backend::ext_oneapi_level_zero>(context);
+  ze_memory_allocation_properties_t prop;
+  prop.stype = ZE_STRUCTURE_TYPE_MEMORY_ALLOCATION_PROPERTIES;
+  prop.pNext = nullptr;
+  ze_device_handle_t device;
+  auto res = zeMemGetAllocProperties((ze_context_handle_t)handle, ptr, &prop,
+                                     &device);
+  if (res != ZE_RESULT_SUCCESS) {
+    PyErr_Format(
+        PyExc_ValueError,
+        "Cannot get memory properties for pointer argument (at %d, err=%d)",
+        idx, res);
+    return false;
+  }
+  if (prop.type != ZE_MEMORY_TYPE_DEVICE) {
+    PyErr_Format(PyExc_ValueError,
+                 "Pointer argument (at %d) doesn't reference XPU device memory "
+                 "(cpu tensor?)",
+                 idx);
+    return false;
+  }
+  return true;
+}
+
+bool getPointer(PyObject *obj, int idx, const sycl::queue &queue,
+                void **dev_ptr) {
+  *dev_ptr = nullptr;
+  if (obj == Py_None)
+    return true;
+  if (PyLong_Check(obj)) {
+    *dev_ptr = PyLong_AsVoidPtr(obj);
+  } else {
+    PyObject *ret = PyObject_CallMethod(obj, "data_ptr", NULL);
+    if (!ret) {
+      PyErr_Clear();
+      PyErr_SetString(
+          PyExc_TypeError,
+          "Pointer argument must be either uint64 or have data_ptr method");
+      return false;
+    }
+    if (!PyLong_Check(ret)) {
+      Py_DECREF(ret);
+      PyErr_SetString(PyExc_TypeError,
+                      "data_ptr method of Pointer object must return 64-bit int");
+      return false;
+    }
+    *dev_ptr = PyLong_AsVoidPtr(ret);
+    Py_DECREF(ret);
+  }
+  if (PyErr_Occurred())
+    return false;
+  return !*dev_ptr || checkDevicePointer(*dev_ptr, idx, queue);
+}
+
+// Converts `obj` to a signed integer of type T, raising an OverflowError if it
+// doesn't fit in T.
+template <typename T> bool getSigned(PyObject *obj, int idx, T *value) {
+  long long v = PyLong_AsLongLong(obj);
+  if (v == -1 && PyErr_Occurred())
+    return false;
+  if (v < std::numeric_limits<T>::min() || v > std::numeric_limits<T>::max()) {
+    PyErr_Format(PyExc_OverflowError,
+                 "Argument (at %d) does not fit in a %d-bit integer", idx,
+                 static_cast<int>(sizeof(T) * 8));
+    return false;
+  }
+  *value = static_cast<T>(v);
+  return true;
+}
+
+// Converts the items of `values`, starting at `start`, as described by `desc`
+// (up to the end of the string or the closing parenthesis of a tuple).
+bool extractArgs(const char *&desc, PyObject *values, Py_ssize_t start,
+                 int &idx, const sycl::queue &queue,
+                 std::vector<KernelArg> &args) {
+  Py_ssize_t pos = start;
+  for (; *desc && *desc != ')'; ++desc, ++idx) {
+    if (pos >= PyTuple_GET_SIZE(values)) {
+      PyErr_SetString(PyExc_TypeError,
+                      "Too few arguments for the kernel signature");
+      return false;
+    }
+    PyObject *obj = PyTuple_GET_ITEM(values, pos++);
+    KernelArg arg;
+    arg.kind = *desc;
+    switch (arg.kind) {
+    case '(':
+      if (!PyTuple_Check(obj)) {
+        PyErr_Format(PyExc_TypeError, "Argument (at %d) must be a tuple", idx);
+        return false;
+      }
+      ++desc;
+      if (!extractArgs(desc, obj, 0, idx, queue, args))
+        return false;
+      --idx;
+      continue;
+    case '-':
+      continue;
+    case 'P':
+      if (!getPointer(obj, idx, queue, &arg.ptr))
+        return false;
+      break;
+    case 'b':
+      if (!getSigned(obj, idx, &arg.i8))
+        return false;
+      break;
+    case 'h':
+      if (!getSigned(obj, idx, &arg.i16))
+        return false;
+      break;
+    case 'i':
+      if (!getSigned(obj, idx, &arg.i32))
+        return false;
+      break;
+    case 'L':
+      arg.i64 = PyLong_AsLongLong(obj);
+      break;
+    case 'B':
+      arg.u8 = static_cast<uint8_t>(PyLong_AsUnsignedLongMask(obj));
+      break;
+    case 'H':
+      arg.u16 = static_cast<uint16_t>(PyLong_AsUnsignedLongMask(obj));
+      break;
+    case 'I':
+      arg.u32 = static_cast<uint32_t>(PyLong_AsUnsignedLongMask(obj));
+      break;
+    case 'K':
+      arg.u64 = PyLong_AsUnsignedLongLongMask(obj);
+      break;
+    case 'f':
+      arg.f32 = static_cast<float>(PyFloat_AsDouble(obj));
+      break;
+    case 'd':
+      arg.f64 = PyFloat_AsDouble(obj);
+      break;
+    default:
+      PyErr_Format(PyExc_ValueError, "Invalid argument descriptor '%c'",
+                   arg.kind);
+      return false;
+    }
+    if (PyErr_Occurred())
+      return false;
+    args.push_back(arg);
+  }
+  return true;
+}
+
+void setArg(sycl::handler &cgh, int index, const KernelArg &arg) {
+  switch (arg.kind) {
+  case 'P':
+    cgh.set_arg(index, arg.ptr);
+    break;
+  case 'b':
+    cgh.set_arg(index, arg.i8);
+    break;
+  case 'h':
+    cgh.set_arg(index, arg.i16);
+    break;
+  case 'i':
+    cgh.set_arg(index, arg.i32);
+    break;
+  case 'L':
+    cgh.set_arg(index, arg.i64);
+    break;
+  case 'B':
+    cgh.set_arg(index, arg.u8);
+    break;
+  case 'H':
+    cgh.set_arg(index, arg.u16);
+    break;
+  case 'I':
+    cgh.set_arg(index, arg.u32);
+    break;
+  case 'K':
+    cgh.set_arg(index, arg.u64);
+    break;
+  case 'f':
+    cgh.set_arg(index, arg.f32);
+    break;
+  case 'd':
+    cgh.set_arg(index, arg.f64);
+    break;
+  }
+}
+
+// Phases reported by `last_launch_counters`, in this order.
+enum Phase { EnterHook, Args, Submit, ExitHook, NumPhases };
+
+bool countersEnabled = false;
+thread_local int64_t lastLaunchNs[NumPhases] = {};
+
+// Records the durations of consecutive phases when counters are enabled.
+class PhaseTimer {
+public:
+  PhaseTimer() : enabled(countersEnabled), last(enabled ? now() : 0) {}
+
+  void end(Phase phase) {
+    if (!enabled)
+      return;
+    int64_t current = now();
+    lastLaunchNs[phase] = current - last;
+    last = current;
+  }
+
+private:
+  static int64_t now() {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+               std::chrono::steady_clock::now().time_since_epoch())
+        .count();
+  }
+
+  bool enabled;
+  int64_t last;
+};
+
+int getIntAttr(PyObject *obj, const char *name) {
+  PyObject *attr = PyObject_GetAttrString(obj, name);
+  if (!attr)
+    return 0;
+  int value = PyLong_AsLong(attr);
+  Py_DECREF(attr);
+  return value;
+}
+
+bool callHook(PyObject *hook, PyObject *launch_metadata) {
+  if (hook == Py_None)
+    return true;
+  PyObject *ret = PyObject_CallOneArg(hook, launch_metadata);
+  if (!ret)
+    return false;
+  Py_DECREF(ret);
+  return true;
+}
+
+// A launch with converted arguments, ready to be submitted.
+struct PreparedLaunch {
+  sycl::queue queue;
+  sycl::kernel kernel;
+  sycl::nd_range<3> range;
+  int shared_memory;
+  std::vector<KernelArg> args;
+};
+
+using LaunchGraph = std::vector<PreparedLaunch>;
+
+constexpr Py_ssize_t numLaunchArgs = 9;
+
+// List the launches of the calling thread are appended to instead of being
+// submitted, set by `set_recording`.
+thread_local PyObject *recording = nullptr;
+
+bool checkLaunchArgs(PyObject *descriptor, PyObject *args) {
+  if (!PyBytes_Check(descriptor) || !PyTuple_Check(args) ||
+      PyTuple_GET_SIZE(args) < numLaunchArgs) {
+    PyErr_SetString(PyExc_TypeError, "Invalid launch arguments");
+    return false;
+  }
+  return true;
+}
+
+std::optional<PreparedLaunch> prepareLaunch(PyObject *descriptor,
+                                            PyObject *args) {
+  int gridX = PyLong_AsLong(PyTuple_GET_ITEM(args, 0));
+  int gridY = PyLong_AsLong(PyTuple_GET_ITEM(args, 1));
+  int gridZ = PyLong_AsLong(PyTuple_GET_ITEM(args, 2));
+  void *pStream = PyLong_AsVoidPtr(PyTuple_GET_ITEM(args, 3));
+  PyObject *py_kernel = PyTuple_GET_ITEM(args, 4);
+  PyObject *kernel_metadata = PyTuple_GET_ITEM(args, 5);
+  if (PyErr_Occurred())
+    return std::nullopt;
+
+  int num_warps = getIntAttr(kernel_metadata, "num_warps");
+  int shared_memory = getIntAttr(kernel_metadata, "shared");
+  int threads_per_warp = getIntAttr(kernel_metadata, "threads_per_warp");
+  if (PyErr_Occurred())
+    return std::nullopt;
+
+  if (pStream == nullptr)
+    return std::nullopt;
+  sycl::queue stream = *(static_cast<sycl::queue *>(pStream));
+  sycl::kernel *kernel_ptr = reinterpret_cast<sycl::kernel *>(
+      PyCapsule_GetPointer(py_kernel, "kernel"));
+  if (kernel_ptr == nullptr)
+    return std::nullopt;
+  sycl::kernel kernel = *kernel_ptr;
+
+  const char *desc = PyBytes_AS_STRING(descriptor);
+  int idx = 0;
+  std::vector<KernelArg> kernel_args;
+  if (!extractArgs(desc, args, numLaunchArgs, idx, stream, kernel_args))
+    return std::nullopt;
+
+  uint32_t num_params = kernel_args.size();
+  uint32_t expected_num_params =
+      kernel.get_info<sycl::info::kernel::num_args>();
+  if (shared_memory)
+    expected_num_params -= 1;
+  assert(num_params == expected_num_params &&
+         "number of kernel param not matched");
+  size_t local_range_x = num_warps * threads_per_warp;
+  sycl::range<3> global_range(gridZ, gridY, gridX * local_range_x);
+  sycl::range<3> local_range(1, 1, local_range_x);
+  return PreparedLaunch{stream, kernel,
+                        sycl::nd_range<3>(global_range, local_range),
+                        shared_memory, std::move(kernel_args)};
+}
+
+void submitLaunch(PreparedLaunch &launch) {
+  uint32_t num_params = launch.args.size();
+  auto cgf = [&](sycl::handler &cgh) {
+    for (uint32_t i = 0; i < num_params; ++i)
+      setArg(cgh, i, launch.args[i]);
+    if (launch.shared_memory) {
+      using share_mem_t = sycl::local_accessor<int8_t, 1>;
+      share_mem_t local_buffer = share_mem_t(launch.shared_memory, cgh);
+      cgh.set_arg(num_params, local_buffer);
+    }
+    cgh.parallel_for(launch.range, launch.kernel);
+  };
+  launch.queue.submit(cgf);
+}
+
+LaunchGraph *getGraph(PyObject *capsule) {
+  return static_cast<LaunchGraph *>(
+      PyCapsule_GetPointer(capsule, "launch_graph"));
+}
+
+void destroyGraph(PyObject *capsule) { delete getGraph(capsule); }
+
+} // namespace
+
+// `args` holds the same values as the tuple taken by the launchers generated
+// by `make_launcher`: gridX, gridY, gridZ, stream, kernel, kernel metadata,
+// launch metadata, launch enter and exit hooks, then the kernel arguments.
+extern "C" EXPORT_FUNC PyObject *launch(PyObject *descriptor, PyObject *args) {
+  if (!checkLaunchArgs(descriptor, args))
+    return NULL;
+
+  if (recording) {
+    PyObject *item = PyTuple_Pack(2, descriptor, args);
+    if (!item)
+      return NULL;
+    int ret = PyList_Append(recording, item);
+    Py_DECREF(item);
+    if (ret < 0)
+      return NULL;
+    Py_RETURN_NONE;
+  }
+
+  PyObject *launch_metadata = PyTuple_GET_ITEM(args, 6);
+  PyObject *launch_enter_hook = PyTuple_GET_ITEM(args, 7);
+  PyObject *launch_exit_hook = PyTuple_GET_ITEM(args, 8);
+
+  PhaseTimer timer;
+  if (!callHook(launch_enter_hook, launch_metadata))
+    return NULL;
+  timer.end(EnterHook);
+
+  std::optional<PreparedLaunch> prepared = prepareLaunch(descriptor, args);
+  if (!prepared)
+    return NULL;
+  timer.end(Args);
+
+#ifdef TRITON_XPU_RECORD_FUNCTION
+  std::string kernel_name =
+      prepared->kernel.get_info<sycl::info::kernel::function_name>();
+  RECORD_FUNCTION("XPU Triton kernel:" + kernel_name, {});
+#endif
+
+  submitLaunch(*prepared);
+  if (PyErr_Occurred())
+    return NULL;
+  timer.end(Submit);
+
+  if (!callHook(launch_exit_hook, launch_metadata))
+    return NULL;
+  timer.end(ExitHook);
+
+  Py_RETURN_NONE;
+}
+
+extern "C" EXPORT_FUNC PyObject *set_launch_counters(PyObject *enabled) {
+  int value = PyObject_IsTrue(enabled);
+  if (value < 0)
+    return NULL;
+  countersEnabled = value;
+  Py_RETURN_NONE;
+}
+
+// Returns the durations of the phases of the last launch, in nanoseconds.
+extern "C" EXPORT_FUNC PyObject *last_launch_counters() {
+  return Py_BuildValue("(LLLL)", lastLaunchNs[EnterHook], lastLaunchNs[Args],
+                       lastLaunchNs[Submit], lastLaunchNs[ExitHook]);
+}
+
+// Starts appending the (descriptor, args) of the launches of the calling
+// thread to the list `launches` instead of submitting them, or stops when
+// `launches` is None.
+extern "C" EXPORT_FUNC PyObject *set_recording(PyObject *launches) {
+  if (launches != Py_None && !PyList_Check(launches)) {
+    PyErr_SetString(PyExc_TypeError, "Expected a list or None");
+    return NULL;
+  }
+  Py_XDECREF(recording);
+  recording = nullptr;
+  if (launches != Py_None) {
+    Py_INCREF(launches);
+    recording = launches;
+  }
+  Py_RETURN_NONE;
+}
+
+// Converts a list of recorded launches into a graph replayed by
+// `replay_graph`. Launch hooks are not called by replays.
+extern "C" EXPORT_FUNC PyObject *make_graph(PyObject *launches) {
+  if (!PyList_Check(launches)) {
+    PyErr_SetString(PyExc_TypeError, "Expected a list of launches");
+    return NULL;
+  }
+  auto graph = std::make_unique<LaunchGraph>();
+  for (Py_ssize_t i = 0; i < PyList_GET_SIZE(launches); ++i) {
+    PyObject *item = PyList_GET_ITEM(launches, i);
+    if (!PyTuple_Check(item) || PyTuple_GET_SIZE(item) != 2) {
+      PyErr_SetString(PyExc_TypeError, "Invalid recorded launch");
+      return NULL;
+    }
+    PyObject *descriptor = PyTuple_GET_ITEM(item, 0);
+    PyObject *args = PyTuple_GET_ITEM(item, 1);
+    if (!checkLaunchArgs(descriptor, args))
+      return NULL;
+    std::optional<PreparedLaunch> prepared = prepareLaunch(descriptor, args);
+    if (!prepared)
+      return NULL;
+    graph->push_back(std::move(*prepared));
+  }
+  PyObject *capsule = PyCapsule_New(graph.get(), "launch_graph", destroyGraph);
+  if (!capsule)
+    return NULL;
+  graph.release();
+  return capsule;
+}
+
+extern "C" EXPORT_FUNC PyObject *replay_graph(PyObject *capsule) {
+  LaunchGraph *graph = getGraph(capsule);
+  if (!graph)
+    return NULL;
+  for (PreparedLaunch &launch : *graph)
+    submitLaunch(launch);
+  Py_RETURN_NONE;
+}
+
+// `updates` is a list of (launch index, kernel parameter index, pointer)
+// tuples, replacing pointer parameters of the launches of a graph.
+extern "C" EXPORT_FUNC PyObject *update_graph(PyObject *capsule,
+                                              PyObject *updates) {
+  LaunchGraph *graph = getGraph(capsule);
+  if (!graph)
+    return NULL;
+  if (!PyList_Check(updates)) {
+    PyErr_SetString(PyExc_TypeError, "Expected a list of updates");
+    return NULL;
+  }
+  for (Py_ssize_t i = 0; i < PyList_GET_SIZE(updates); ++i) {
+    Py_ssize_t launch_idx, param_idx;
+    PyObject *value;
+    if (!PyArg_ParseTuple(PyList_GET_ITEM(updates, i), "nnO", &launch_idx,
+                          &param_idx, &value))
+      return NULL;
+    if (launch_idx < 0 || launch_idx >= (Py_ssize_t)graph->size()) {
+      PyErr_SetString(PyExc_IndexError, "Launch index out of range");
+      return NULL;
+    }
+    PreparedLaunch &launch = (*graph)[launch_idx];
+    if (param_idx < 0 || param_idx >= (Py_ssize_t)launch.args.size() ||
+        launch.args[param_idx].kind != 'P') {
+      PyErr_SetString(PyExc_IndexError,
+                      "Kernel parameter index out of range or not a pointer");
+      return NULL;
+    }
+    void *ptr;
+    if (!getPointer(value, static_cast<int>(param_idx), launch.queue, &ptr))
+      return NULL;
+    launch.args[param_idx].ptr = ptr;
+  }
+  Py_RETURN_NONE;
+}
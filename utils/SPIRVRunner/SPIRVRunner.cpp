@@ -49,6 +49,8 @@ auto read_spirv(const std::string &filename) {
 struct TensorBuffer {
   torch::Tensor buffer_ptr;
   size_t index;
+  // Size of the device buffer, i.e. of the memory spanned by the tensor.
+  size_t nbytes;
 };
 
 // Structure that contains Triton kernel arguments
@@ -370,9 +372,34 @@ std::vector<TensorBuffer> launchKernel(sycl::queue stream, sycl::kernel kernel,
   for (auto &item : triton_args.jsonData["argument_list"]) {
     if (item.contains("type")) {
       if (item.at("type").get<std::string>() == "tensor") {
-        auto tensor_name = triton_args.spirv_dump_dir + "/" +
-                           item.at("name").get<std::string>() + ".pt";
-        auto tensor = load_tensor(tensor_name);
+        torch::Tensor tensor;
+        std::vector<int64_t> sizes;
+        std::vector<int64_t> strides;
+        auto options = getTensorOptions(item.at("dtype"));
+        if (item.contains("file")) {
+          // Raw bytes of the memory spanned by the tensor, with its layout
+          // recorded in the manifest.
+          auto bytes = read_file_as_bytes(triton_args.spirv_dump_dir + "/" +
+                                          item.at("file").get<std::string>());
+          auto storage_size = item.at("storage_size").get<int64_t>();
+          if (static_cast<int64_t>(bytes.size()) !=
+              storage_size * options.dtype().itemsize())
+            throw std::runtime_error("Tensor file " +
+                                     item.at("file").get<std::string>() +
+                                     " does not match its storage size");
+          tensor = torch::from_blob(bytes.data(),
+                                    {static_cast<int64_t>(bytes.size())},
+                                    torch::kUInt8)
+                       .clone();
+          sizes = item.at("shape").get<std::vector<int64_t>>();
+          strides = item.at("strides").get<std::vector<int64_t>>();
+        } else {
+          auto tensor_name = triton_args.spirv_dump_dir + "/" +
+                             item.at("name").get<std::string>() + ".pt";
+          tensor = load_tensor(tensor_name);
+          sizes = tensor.sizes().vec();
+          strides = tensor.strides().vec();
+        }
         auto nbytes = tensor.nbytes();
         char *dev = nullptr;
         if (nbytes) {
@@ -390,9 +417,14 @@ std::vector<TensorBuffer> launchKernel(sycl::queue stream, sycl::kernel kernel,
                       item.at("name").get<std::string>()) !=
             triton_args.out_tensor_names.end()) {
           TensorBuffer tb;
-          tb.buffer_ptr = torch::zeros({tensor.sizes()},
-                                       getTensorOptions(item.at("dtype")));
+          // Same layout as on the device, so that the whole device buffer
+          // can be copied back into the storage of the tensor.
+          tb.buffer_ptr = torch::empty_strided(sizes, strides, options);
           tb.index = triton_args.dev_buffers.size() - 1;
+          tb.nbytes = nbytes;
+          if (tb.buffer_ptr.storage().nbytes() < nbytes)
+            throw std::runtime_error(
+                "Output tensor storage is smaller than its device buffer");
           triton_args.host_outbuffers.push_back(tb);
           std::cout
               << "Tensor output[" << triton_args.host_outbuffers.back().index
@@ -415,8 +447,7 @@ std::vector<TensorBuffer> launchKernel(sycl::queue stream, sycl::kernel kernel,
   for (const auto &item : triton_args.host_outbuffers) {
     stream
         .memcpy(tensor_ptr(item.buffer_ptr),
-                triton_args.dev_buffers.at(item.index),
-                item.buffer_ptr.nbytes())
+                triton_args.dev_buffers.at(item.index), item.nbytes)
         .wait_and_throw();
   }
 